@@ -0,0 +1,139 @@
+### 여러 position을 NumPy 배열로 한 번에 계산하는 batch board ###
+
+## batch board를 사용하는 이유
+# 분석, 학습 데이터, rule 검사처럼 많은 position을 계산할 때 Board object를 하나씩 만들면 Python loop가 대부분의 시간을 차지한다
+# -> N개의 position을 uint64 배열(posOX, mask)로 저장하고, Board와 같은 bit 연산을 배열 전체에 한 번에 적용한다
+
+## position 형식 (Board class와 같음)
+# posOX : 마지막에 stone을 둔 player의 stone들, mask : 모든 stone의 위치 (= Board.mask)
+# moves는 mask의 1인 bit 수로 계산한다
+# 7x6 board는 56bit이므로 uint64 하나에 들어간다 (width * (height + 1) <= 64인 board만 사용할 수 있다)
+
+## NumPy
+# NumPy가 설치되어 있지 않으면 np = None이 되고, BatchBoard를 만들 때 ImportError가 발생한다
+# (나머지 파일들은 NumPy 없이도 사용할 수 있다)
+
+from heuristic import Heuristic, windowTable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# uint64 배열의 각 원소에서 1인 bit의 수 (NumPy 2.0 이상은 np.bitwise_count, 그 외에는 SWAR 방식)
+def popcount64(pos):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(pos).astype(np.int64)
+    pos = pos - ((pos >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    pos = (pos & np.uint64(0x3333333333333333)) + ((pos >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    pos = (pos + (pos >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((pos * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+class BatchBoard:
+
+    # Initialization
+    # input : posOX들, mask들 (uint64로 바꿀 수 있는 배열 또는 list), width, height
+    def __init__(self, posOX, mask, width = 7, height = 6):
+        if np is None:
+            raise ImportError('BatchBoard를 사용하려면 NumPy가 필요합니다.')
+        if width * (height + 1) > 64:
+            raise ValueError('width * (height + 1)이 64보다 큰 board는 사용할 수 없습니다.')
+        self.width = width
+        self.height = height
+        self.posOX = np.asarray(posOX, dtype = np.uint64)
+        self.mask = np.asarray(mask, dtype = np.uint64)
+        self.moves = popcount64(self.mask)
+
+        # Board class와 같은 값들 (column별 가장 아래칸, 가장 위칸, column 전체)
+        self.posBottom = [np.uint64(1 << (col * (height + 1))) for col in range(width)]
+        self.posTop = [np.uint64(1 << (col * (height + 1) + height - 1)) for col in range(width)]
+        self.colMask = [np.uint64(((1 << height) - 1) << (col * (height + 1))) for col in range(width)]
+        self.bottom = np.uint64(sum(1 << (col * (height + 1)) for col in range(width)))
+        self.boardMask = np.uint64(sum(((1 << height) - 1) << (col * (height + 1)) for col in range(width)))
+
+    # Board object들로 BatchBoard를 만든다
+    # input : Board object의 list (모두 같은 크기)
+    # output : BatchBoard object
+    @classmethod
+    def fromBoards(cls, boards):
+        width, height = (boards[0].width, boards[0].height) if boards else (7, 6)
+        return cls([board.posOX for board in boards], [board.mask for board in boards], width, height)
+
+    # output : position의 수
+    def __len__(self):
+        return len(self.mask)
+
+    # output : 각 position의 posCurrent (= posOX + mask + bottom, Board.posCurrent와 같은 값)
+    def keys(self):
+        return self.posOX + self.mask + self.bottom
+
+    # 마지막에 stone을 둔 player가 4줄을 완성했는지 확인 (Board.win과 같은 방법)
+    # output : position별 bool 배열
+    def win(self):
+        pos = self.posOX
+        result = np.zeros(len(pos), dtype = bool)
+        for shift in (1, self.height, self.height + 1, self.height + 2):
+            check = pos & (pos >> np.uint64(shift))
+            result |= (check & (check >> np.uint64(2 * shift))) != 0
+        return result
+
+    # input : column number
+    # output : position별로 column에 stone을 놓을 수 있는지 나타내는 bool 배열
+    def possible(self, col):
+        return (self.mask & self.posTop[col]) == 0
+
+    # output : (position 수, width) 크기의 bool 배열, [i, col]은 i번째 position에서 col에 stone을 놓을 수 있는지
+    def legalMoves(self):
+        return np.stack([self.possible(col) for col in range(self.width)], axis = 1)
+
+    # output : position별로 stone을 놓을 수 있는 칸들의 mask (Board.playableCells와 같은 값)
+    def playableCells(self):
+        return (self.mask + self.bottom) & self.boardMask
+
+    # 각 position의 heuristic value (Heuristic.evaluate와 같은 값)
+    # input : AI의 player (0 또는 1, position별로 다르다면 배열)
+    # output : position별 heuristic value 배열 (int64)
+    def evaluate(self, player):
+        player = np.asarray(player, dtype = np.int64)
+        aiMoved = (self.moves % 2) != player            # 마지막에 둔 player가 AI인지
+        posAI = np.where(aiMoved, self.posOX, self.mask ^ self.posOX)
+        posHuman = self.mask ^ posAI
+
+        # 1. 칸마다 상태(AI stone이면 5, Human stone이면 1, 빈칸이면 0)를 uint8 배열로 만든다
+        #    window의 상태 = 4칸의 상태의 합 = (AI stone 수) * 5 + (Human stone 수) (Heuristic.scoreSetting 참고)
+        one = np.uint64(1)
+        cellState = dict()
+        for cell in range(self.width * (self.height + 1)):
+            shift = np.uint64(cell)
+            cellState[cell] = ((posAI >> shift) & one).astype(np.uint8) * np.uint8(5) + ((posHuman >> shift) & one).astype(np.uint8)
+
+        # 2. AI가 선공인지 후공인지에 따라 window의 점수가 다르므로, 두 경우의 windowScore를 이어 붙여 (player * 25 + 상태)로 찾는다
+        windowScore = np.array(Heuristic(0, self.width, self.height).windowScore + Heuristic(1, self.width, self.height).windowScore, dtype = np.int32)
+        offset = (player * 25).astype(np.uint8)
+
+        # 3. 모든 window의 점수를 더한다
+        score = np.zeros(len(posAI), dtype = np.int32)
+        for window in windowTable(self.width, self.height)[0]:
+            cells = [cell for cell in range(self.width * (self.height + 1)) if (window >> cell) & 1]
+            state = cellState[cells[0]] + cellState[cells[1]] + cellState[cells[2]] + cellState[cells[3]] + offset
+            score += windowScore[state]
+        return score.astype(np.int64)
+
+    # 모든 position에서 stone을 놓을 수 있는 모든 column에 하나씩 두어 다음 position들을 만든다 (one-ply expansion)
+    # output : (다음 position들의 BatchBoard, 각 position의 부모 position 번호 배열, 둔 column number 배열)
+    #          부모 position 번호 순서대로, 같은 부모에서는 column number 순서대로 정렬되어 있다
+    def expand(self):
+        posOX, mask, parents, cols = [], [], [], []
+        for col in range(self.width):
+            index = np.nonzero(self.possible(col))[0]
+            childMask = self.mask[index]
+            stone = (childMask + self.posBottom[col]) & self.colMask[col]
+            posOX.append((childMask ^ self.posOX[index]) | stone)   # put 후의 posOX = 새 mask - 이전 posOX
+            mask.append(childMask | stone)
+            parents.append(index)
+            cols.append(np.full(len(index), col, dtype = np.int8))
+
+        posOX, mask = np.concatenate(posOX), np.concatenate(mask)
+        parents, cols = np.concatenate(parents), np.concatenate(cols)
+        order = np.lexsort((cols, parents))
+        return BatchBoard(posOX[order], mask[order], self.width, self.height), parents[order], cols[order]
@@ -0,0 +1,239 @@
+### 탐색 속도를 측정하기 위한 micro-benchmark ###
+
+## 측정 항목
+# 1. put/undo/posCurrent를 반복했을 때의 초당 실행 횟수
+# 2. 고정된 position들에서 GameTree.miniMax가 초당 탐색하는 node 수 (nodes per second)
+# 3. ParallelGameTree.search, LazySmpGameTree.search가 GameTree.search보다 몇 배 빠른지 (speedup)
+# 4. put/undo에서 갱신한 heuristic value(evaluate)가 board 전체를 다시 계산한 값(evaluateFull)과 같은지
+# 5. BatchBoard로 많은 position의 win, evaluate를 한 번에 계산하는 속도 (NumPy가 설치된 경우)
+# 6. random한 position들에서 GameTree.rootTactics로 탐색 없이 둔 비율과, 사용하지 않았을 때와의 search 시간 비교
+# 실행 방법 : python benchmark.py
+
+from gameTree import GameTree
+from parallelSearch import ParallelGameTree, LazySmpGameTree
+from batchBoard import BatchBoard, np
+from contextlib import redirect_stdout
+from time import time
+import io
+import random
+
+# benchmark에 사용할 position들 (column number list)
+POSITIONS = [
+    [],
+    [3, 3, 2, 4],
+    [3, 2, 3, 3, 4, 2, 2, 4],
+    [3, 3, 3, 3, 2, 4, 1, 5, 4, 2],
+]
+
+# GameTree 생성 시 출력되는 안내문을 출력하지 않는다
+def quietGameTree(player, treeClass = GameTree, **kwargs):
+    with redirect_stdout(io.StringIO()):
+        return treeClass(player, **kwargs)
+
+# put/undo/posCurrent를 반복 실행하는 속도를 측정
+# input : 반복 횟수
+# output : 초당 반복 횟수
+def benchPutUndo(repeat = 200000):
+    tree = quietGameTree(0)
+    tree.puts([3, 2, 3, 4])
+    startTime = time()
+    for i in range(repeat):
+        col = i % tree.width
+        tree.put(col)
+        tree.posCurrent()
+        tree.undo()
+    return repeat / (time() - startTime)
+
+# random하게 두고 되돌리는 게임들에서 evaluate와 evaluateFull의 값이 같은지 확인하고, 각각의 속도를 측정
+# input : 게임 수, random seed
+# output : (확인한 position 수, 값이 다른 position 수, evaluate의 초당 실행 횟수, evaluateFull의 초당 실행 횟수)
+def benchEvaluate(games = 200, seed = 0):
+    rand = random.Random(seed)
+    checks, mismatches = 0, 0
+    fastTime, fullTime = 0.0, 0.0
+    for game in range(games):
+        tree = quietGameTree(game % 2)
+        while tree.moves < tree.area and not tree.win():
+            tree.put(rand.choice([col for col in range(tree.width) if tree.possible(col)]))
+            if tree.moves > 1 and rand.random() < 0.2:
+                tree.undo()
+
+            startTime = time()
+            value = tree.evaluate()
+            fastTime += time() - startTime
+            startTime = time()
+            fullValue = tree.evaluateFull()
+            fullTime += time() - startTime
+            checks += 1
+            mismatches += value != fullValue
+    return checks, mismatches, checks / fastTime, checks / fullTime
+
+# 빈 board에서 depth수까지 모든 수순을 BatchBoard.expand로 펼친 position들의 win, evaluate를 한 번에 계산하는 속도를 측정
+# random한 게임들의 position에서 BatchBoard와 Heuristic의 값이 같은지도 확인한다
+# input : 펼칠 depth, 확인할 게임 수, random seed
+# output : (position 수, 초당 계산한 position 수, Board를 하나씩 계산했을 때의 초당 position 수, 값이 다른 position 수)
+def benchBatch(depth = 7, games = 100, seed = 0):
+    # 1. Board(GameTree)로 하나씩 계산
+    rand = random.Random(seed)
+    trees, players = [], []
+    for game in range(games):
+        tree = quietGameTree(game % 2)
+        for _ in range(rand.randint(0, tree.area - 1)):
+            tree.put(rand.choice([col for col in range(tree.width) if tree.possible(col)]))
+            if tree.win():
+                break
+        trees.append(tree)
+        players.append(tree.player)
+    startTime = time()
+    values = [(tree.win(), tree.evaluateFull()) for tree in trees]
+    loopRate = len(trees) / (time() - startTime)
+    batch = BatchBoard.fromBoards(trees)
+    mismatches = sum(value != (bool(win), int(score)) for value, win, score in zip(values, batch.win(), batch.evaluate(players)))
+
+    # 2. BatchBoard로 한 번에 계산
+    batch = BatchBoard([0], [0])
+    for _ in range(depth):
+        batch = batch.expand()[0]
+    startTime = time()
+    batch.win()
+    batch.evaluate(0)
+    return len(batch), len(batch) / (time() - startTime), loopRate, mismatches
+
+# random한 position들에서 rootTactics를 사용할 때와 사용하지 않을 때의 search 시간을 비교
+# input : position 수, 탐색할 depth, random seed
+# output : (rootTactics의 통계 dict, 사용할 때의 시간, 사용하지 않을 때의 시간)
+def benchTactics(games = 200, depth = 6, seed = 0):
+    rand = random.Random(seed)
+    stats = dict()
+    onTime, offTime = 0.0, 0.0
+    for game in range(games):
+        trees = [quietGameTree(game % 2, tactics = tactics, solverCells = 0) for tactics in (True, False)]
+        for _ in range(rand.randint(0, 30)):
+            col = rand.choice([col for col in range(trees[0].width) if trees[0].possible(col)])
+            for tree in trees:
+                tree.put(col)
+            if trees[0].win():
+                for tree in trees:
+                    tree.undo()
+                break
+        for tree in trees:
+            startTime = time()
+            with redirect_stdout(io.StringIO()):
+                tree.search(startTime, depth)
+            if tree.tactics:
+                onTime += time() - startTime
+            else:
+                offTime += time() - startTime
+        for key, value in trees[0].tacticStats.items():
+            stats[key] = stats.get(key, 0) + value
+    return stats, onTime, offTime
+
+# 고정된 depth로 탐색하는 속도를 측정
+# 측정값의 편차를 줄이기 위해 repeat번 실행하여 가장 빠른 시간을 사용한다
+# input : GameTree의 engine, 탐색할 depth, 반복 횟수
+# output : 측정 결과 dictionary
+#          (scores : position마다 구한 score, nodes : 탐색한 node 수, time : 걸린 시간,
+#           entries : table에 저장된 position 수, hitRate : table hit rate, firstMoveCutoffRate : 첫 번째 수에서 pruning이 일어난 비율)
+def benchSearch(engine = 'minimax', depth = 6, repeat = 3):
+    stats = {'scores': [], 'nodes': 0, 'time': 0.0, 'entries': 0}
+    hits, probes, cutoffs, firstMoveCutoffs = 0, 0, 0, 0
+    for cols in POSITIONS:
+        bestTime = None
+        for _ in range(repeat):
+            tree = quietGameTree(len(cols) % 2, engine = engine)
+            tree.puts(cols)
+            startTime = time()
+            score = tree.searchScore(-10000, 10000, tree.moves + depth)
+            searchTime = time() - startTime
+            bestTime = searchTime if (bestTime is None or searchTime < bestTime) else bestTime
+        stats['scores'].append(score)
+        stats['time'] += bestTime
+        stats['nodes'] += tree.nodes
+        stats['entries'] += tree.table.used
+        hits += tree.table.hits
+        probes += tree.table.probes
+        cutoffs += tree.cutoffs
+        firstMoveCutoffs += tree.firstMoveCutoffs
+    stats['hitRate'] = hits / probes if probes else 0.0
+    stats['firstMoveCutoffRate'] = firstMoveCutoffs / cutoffs if cutoffs else 0.0
+    return stats
+
+# 같은 position들에서 GameTree.search와 ParallelGameTree(또는 LazySmpGameTree).search를 고정된 depth로 실행하여 걸린 시간을 비교
+# input : 비교할 class, worker process의 수, 탐색할 depth
+# output : (GameTree.search의 시간, treeClass.search의 시간, 같은 column을 선택하지 않은 position 수)
+def benchParallel(treeClass = ParallelGameTree, workers = None, depth = 8):
+    serialTime, parallelTime, mismatches = 0.0, 0.0, 0
+    for cols in POSITIONS:
+        serial = quietGameTree(len(cols) % 2)
+        serial.puts(cols)
+        startTime = time()
+        with redirect_stdout(io.StringIO()):
+            serialCol = serial.search(startTime, depth)
+        serialTime += time() - startTime
+
+        # process pool을 만드는 시간은 제외하기 위해 worker를 먼저 실행해 둔다
+        # 탐색 중 예외가 발생하더라도 process pool과 shared memory를 정리한다
+        parallel = quietGameTree(len(cols) % 2, treeClass, workers = workers)
+        try:
+            parallel.puts(cols)
+            with redirect_stdout(io.StringIO()):
+                parallel.search(time(), 1)
+            parallel.table.clear()
+            startTime = time()
+            with redirect_stdout(io.StringIO()):
+                parallelCol = parallel.search(startTime, depth)
+            parallelTime += time() - startTime
+        finally:
+            parallel.close()
+        mismatches += serialCol != parallelCol
+    return serialTime, parallelTime, mismatches
+
+# benchSearch의 결과를 출력
+# input : engine 이름, benchSearch의 결과
+def printStats(engine, stats):
+    print(engine + ' : ' + str(stats['nodes']) + ' nodes, ' + str(round(stats['time'], 3)) + '초, ' + str(int(stats['nodes'] / stats['time'])) + ' nodes/초')
+    print('\ttable : 저장된 position ' + str(stats['entries']) + '개, hit rate ' + str(round(stats['hitRate'] * 100, 1)) + '%')
+    print('\tmove ordering : 첫 번째 수에서 pruning이 일어난 비율 ' + str(round(stats['firstMoveCutoffRate'] * 100, 1)) + '%')
+
+if __name__ == '__main__':
+    print('put/undo/posCurrent : ' + str(int(benchPutUndo())) + ' 회/초')
+
+    # put/undo에서 갱신한 heuristic value와 board 전체를 다시 계산한 값 비교
+    checks, mismatches, fastRate, fullRate = benchEvaluate()
+    print('evaluate : ' + str(int(fastRate)) + ' 회/초, evaluateFull : ' + str(int(fullRate)) + ' 회/초 (' + str(checks) + '개의 position 확인)')
+    if mismatches:
+        print('경고 : ' + str(mismatches) + '개의 position에서 evaluate와 evaluateFull의 값이 다릅니다.')
+
+    # 많은 position을 NumPy 배열로 한 번에 계산했을 때의 속도
+    if np is not None:
+        count, batchRate, loopRate, mismatches = benchBatch()
+        print('BatchBoard : ' + str(count) + '개의 position, win + evaluate ' + str(int(batchRate)) + ' position/초 (Board 하나씩 ' + str(int(loopRate)) + ' position/초)')
+        if mismatches:
+            print('경고 : ' + str(mismatches) + '개의 position에서 BatchBoard와 Heuristic의 값이 다릅니다.')
+
+    # 탐색 전에 확실한 수를 찾아 바로 둔 비율과 search 시간 비교
+    stats, onTime, offTime = benchTactics()
+    shortcuts = stats['win'] + stats['doubleThreat'] + stats['forced'] + stats['lost']
+    print('tactics : ' + str(stats['searches']) + '개의 position 중 ' + str(shortcuts) + '개를 탐색 없이 둠 (이기는 수 ' + str(stats['win']) + ', double threat ' + str(stats['doubleThreat'])
+          + ', 유일한 수 ' + str(stats['forced']) + ', 지는 경우 ' + str(stats['lost']) + '), column 제외 ' + str(stats['pruned']) + '번 (' + str(stats['prunedCols']) + '개)')
+    print('\tsearch 시간 : tactics 사용 ' + str(round(onTime, 3)) + '초, 사용하지 않음 ' + str(round(offTime, 3)) + '초')
+
+    # 같은 position들에서 engine마다 탐색 속도를 비교하고, 같은 score가 나오는지 확인한다
+    results = dict()
+    for engine in ['minimax', 'negamax', 'pvs', 'mtdf']:
+        results[engine] = benchSearch(engine)
+        printStats(engine, results[engine])
+    for engine in results:
+        if results[engine]['scores'] != results['minimax']['scores']:
+            print('경고 : ' + engine + '의 score가 minimax와 다릅니다. ' + str(results[engine]['scores']))
+
+    # root의 column들을 여러 process에서 나누어 탐색했을 때의 speedup
+    serialTime, parallelTime, mismatches = benchParallel(ParallelGameTree)
+    print('parallel search : GameTree ' + str(round(serialTime, 3)) + '초, ParallelGameTree ' + str(round(parallelTime, 3)) + '초, speedup ' + str(round(serialTime / parallelTime, 2)) + '배')
+    if mismatches:
+        print('경고 : ' + str(mismatches) + '개의 position에서 ParallelGameTree가 다른 column을 선택했습니다.')
+
+    # 여러 process가 하나의 table을 공유하며 같은 position을 탐색했을 때의 speedup
+    # Lazy SMP는 탐색 순서에 따라 결과가 달라질 수 있으므로 다른 column을 선택한 position 수는 참고용이다
+    serialTime, parallelTime, mismatches = benchParallel(LazySmpGameTree)
+    print('lazy SMP : GameTree ' + str(round(serialTime, 3)) + '초, LazySmpGameTree ' + str(round(parallelTime, 3)) + '초, speedup ' + str(round(serialTime / parallelTime, 2)) + '배, 다른 column을 선택한 position ' + str(mismatches) + '개')
@@ -15,6 +15,9 @@
 # => current = posOX + posAll + posBottom
 # bit를 읽는 순서는 왼쪽 아래부터 위로 올라간다. (ex. current = 0b 10100 01001 01110 11111)
 
+# 입력받은 정수에서 1인 bit의 수 (Python 3.10 미만에서는 int.bit_count가 없으므로 bin을 이용한다)
+popcount = int.bit_count if hasattr(int, 'bit_count') else (lambda pos: bin(pos).count('1'))
+
 class Board:
 
     # Initialization
@@ -29,6 +32,22 @@ class Board:
         self.posAll = [0] * self.width
         self.posBottom = [1 << (i * (self.height + 1)) for i in range(self.width)]
 
+        # sum(self.posAll), sum(self.posBottom)을 매번 계산하지 않기 위해 하나의 정수로 유지한다
+        # mask : 모든 stone의 위치 (= sum(self.posAll)), put/undo에서 O(1)로 갱신
+        # bottom : 각 column의 가장 아래칸 (= sum(self.posBottom)), 변하지 않는 값
+        self.mask = 0
+        self.bottom = sum(self.posBottom)
+
+        # 좌우 대칭(mirror)된 board의 position
+        # put/undo/posReverse에서 원래 position과 함께 O(1)로 갱신하여,
+        # position과 그 mirror를 같은 key(canonicalKey)로 다룰 수 있게 한다
+        self.posOXMirror = 0
+        self.maskMirror = 0
+        self.colShift = [i * (self.height + 1) for i in range(self.width)]
+
+        # board 위의 모든 칸 (각 column의 맨 위 padding bit를 제외한 칸)
+        self.boardMask = self.bottom * ((1 << self.height) - 1)
+
         # 게임 진행 기록
         self.moves = 0                  # game에서 움직인 횟수
         self.log = []                   # 현재까지 둔 stone의 기록
@@ -45,8 +64,8 @@ class Board:
 
     # Board를 출력
     def printBoard(self):
-        posO = (self.posOX) if (self.moves % 2) else (sum(self.posAll) - self.posOX)
-        posX = (sum(self.posAll) - self.posOX) if (self.moves % 2) else (self.posOX)
+        posO = (self.posOX) if (self.moves % 2) else (self.mask - self.posOX)
+        posX = (self.mask - self.posOX) if (self.moves % 2) else (self.posOX)
         
         board4print = []
         for w in range(self.width):
@@ -67,39 +86,40 @@ class Board:
     # output : 현재 position
     # posCurrent = posOX + posAll + posBottom
     def posCurrent(self):
-        return self.posOX + sum(self.posAll) + sum(self.posBottom)
+        return self.posOX + self.mask + self.bottom
+
+    # output : 현재 board를 좌우 대칭한 board의 position
+    def posMirror(self):
+        return self.posOXMirror + self.maskMirror + self.bottom
+
+    # output : position과 mirror position 중 작은 값
+    # 좌우 대칭인 두 board는 heuristic value가 같으므로 DP의 key로 사용한다
+    def canonicalKey(self):
+        pos = self.posOX + self.mask + self.bottom
+        posMirror = self.posOXMirror + self.maskMirror + self.bottom
+        return pos if (pos < posMirror) else posMirror
 
     # posOX에서 O와 X를 reverse
     # 현재 turn을 상대 turn으로 바꾸기 위해 사용한다.
     def posReverse(self):
-        self.posOX = sum(self.posAll) - self.posOX
+        self.posOX = self.mask - self.posOX
+        self.posOXMirror = self.maskMirror - self.posOXMirror
 
     # output : 현재 board가 대칭이면 True, 아니면 False
-    # 만약 앞으로의 board에서 대칭이 절대 나오지 않는 상황이라면 self.neverSymmetry = False
+    # 만약 앞으로의 board에서 대칭이 절대 나오지 않는 상황이라면 self.neverSymmetry = True
     def symmetry(self):
         if self.neverSymmetry:
             return False
 
-        posO = self.posOX
-        posX = sum(self.posAll) - posO
+        # 1. board와 mirror board가 같으면 대칭
+        if self.posOX == self.posOXMirror and self.mask == self.maskMirror:
+            return True
 
-        colO = []
-        colX = []
-
-        mask = self.posBottom[1] - 1
-        
-        for _ in range(self.width):
-            colO.append(posO & mask)
-            colX.append(posX & mask)
-            posO >>= (self.height + 1)
-            posX >>= (self.height + 1)
-
-        for i in range(self.width // 2):
-            if colO[i] != colO[-i-1] or colX[i] != colX[-i-1]:
-                if colO[i] & colX[-i-1] > 0 or colO[-i-1] & colX[i] > 0:
-                    self.neverSymmetry = True
-                return False
-        return True
+        # 2. 어떤 칸의 stone과 그 대칭 위치의 stone이 서로 다르다면 앞으로도 대칭이 될 수 없다
+        #    (posOX & mirror(상대 stone) > 0)
+        if self.posOX & (self.maskMirror - self.posOXMirror):
+            self.neverSymmetry = True
+        return False
 
     # 입력 받은 column에 stone을 놓을 수 있는지 판단한다
     # input : column number
@@ -113,7 +133,11 @@ class Board:
         # 1. moves = moves + 1
         self.moves += 1
         # 2. posAll의 제일 위칸에 stone(1) 추가
-        self.posAll[col] = (self.posAll[col] << 1) + self.posBottom[col]
+        #    (posAll[col] + posBottom[col]은 새로 놓이는 칸 하나만을 나타낸다)
+        stone = self.posAll[col] + self.posBottom[col]
+        self.posAll[col] |= stone
+        self.mask |= stone
+        self.maskMirror |= (stone >> self.colShift[col]) << self.colShift[self.width - col - 1]
         # 3. turn(O, X)이 바뀌었으므로 position reverse
         self.posReverse()
         # 4. log에 둔 stone 추가
@@ -131,11 +155,17 @@ class Board:
         # 4. log에서 stone을 뺀다
         col = self.log.pop()
         # 3. position reverse
-        self.posOX = sum(self.posAll) - self.posOX
+        self.posOX = self.mask - self.posOX
+        self.posOXMirror = self.maskMirror - self.posOXMirror
         # 2. posAll의 제일 위칸 stone 제거
-        self.posAll[col] &= (self.posAll[col] >> 1)
+        stone = self.posAll[col] ^ (self.posAll[col] & (self.posAll[col] >> 1))
+        self.posAll[col] ^= stone
+        self.mask ^= stone
+        self.maskMirror ^= (stone >> self.colShift[col]) << self.colShift[self.width - col - 1]
         # 1. moves = moves - 1
         self.moves -= 1
+        # 0. stone을 빼면 다시 대칭이 될 수 있으므로, self.symmetry()가 다시 확인하도록 한다
+        self.neverSymmetry = False
     
     # 현재 connect four가 완성되었는지 확인
     # output : 4줄 이상 연속으로 존재하면 True, 아니면 False
@@ -199,11 +229,11 @@ class Board:
         # mask : 찾으려는 위치를 표시하는 역할
         mask = self.posBottom[col] << row
 
-        posO = (self.posOX) if (self.moves % 2 != self.player) else (sum(self.posAll) - self.posOX)
+        posO = (self.posOX) if (self.moves % 2 != self.player) else (self.mask - self.posOX)
         if (posO & mask) > 0:
             return 0
         
-        posX = sum(self.posAll) - posO
+        posX = self.mask - posO
         if (posX & mask) > 0:
             return 1
 
@@ -213,4 +243,51 @@ class Board:
     # input : 찾으려는 칸의 column number
     # output : 해당 column에 놓인 top stone이 'O'이면 0, 'X'이면 1, 없으면 -1
     def topStone(self, col):        
-        return self.exists(col, self.getRow(col))
\ No newline at end of file
+        return self.exists(col, self.getRow(col))
+
+    # 입력받은 stone들에 stone 하나를 더 놓으면 4줄이 완성되는 빈칸들을 계산한다
+    # win 함수처럼 가로(-), 세로(|), 대각선(/, \) 방향으로 shift하여 한 번에 계산한다
+    # ex. 세로(|)의 경우 아래 3칸이 모두 stone인 빈칸 : (pos << 1) & (pos << 2) & (pos << 3)
+    #     가로(-)의 경우 ???. , ??.? , ?.?? , .??? 의 4가지 경우를 모두 확인한다
+    # input : 한 player의 stone들의 position (ex. self.posOX), 세로(|) 방향 포함 여부
+    # output : 4줄이 완성되는 빈칸들의 position (아직 stone을 놓을 수 없는 칸도 포함)
+    def winningCells(self, pos, vertical = True):
+        # 1. 세로(|)
+        cells = ((pos << 1) & (pos << 2) & (pos << 3)) if vertical else 0
+
+        # 2. 가로(-), 대각선(/), 대각선(\)
+        for shift in (self.height + 1, self.height + 2, self.height):
+            pair = (pos << shift) & (pos << (2 * shift))
+            cells |= pair & (pos << (3 * shift))
+            cells |= pair & (pos >> shift)
+            pair = (pos >> shift) & (pos >> (2 * shift))
+            cells |= pair & (pos << shift)
+            cells |= pair & (pos >> (3 * shift))
+
+        # 3. board 밖의 칸과 이미 stone이 놓인 칸은 제외
+        return cells & (self.boardMask ^ self.mask)
+
+    # output : 현재 turn에 stone을 놓을 수 있는 칸들의 position (column마다 가장 아래의 빈칸)
+    def playableCells(self):
+        return (self.mask + self.bottom) & self.boardMask
+
+    # 현재 turn의 player가 두어도 상대가 바로 다음 turn에 이기지 못하는 칸들 (non-losing move)
+    # 1. 상대가 이길 수 있는 칸이 2개 이상 열려 있다면 어디에 두어도 진다
+    # 2. 상대가 이길 수 있는 칸이 1개 열려 있다면 그 칸에 두어 막아야 한다
+    # 3. 상대가 이길 수 있는 칸 바로 아래에 두면 상대가 그 위에 두어 이긴다
+    # 현재 turn에 바로 이길 수 있는지는 확인하지 않으므로, 이기는 수는 먼저 따로 확인해야 한다
+    # output : stone을 놓을 칸들의 position (0이면 어디에 두어도 다음 turn에 진다)
+    def nonLosingCells(self):
+        playable = (self.mask + self.bottom) & self.boardMask
+        oppWins = self.winningCells(self.posOX)
+        forced = playable & oppWins
+        if forced:
+            if forced & (forced - 1):
+                return 0
+            playable = forced
+        return playable & ~(oppWins >> 1)
+
+    # input : 칸 하나의 position
+    # output : 그 칸의 column number
+    def cellColumn(self, cell):
+        return (cell.bit_length() - 1) // (self.height + 1)
\ No newline at end of file
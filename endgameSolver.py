@@ -0,0 +1,153 @@
+### 남은 칸이 적을 때 heuristic 없이 게임의 결과를 정확히 계산하는 solver ###
+
+## GameTree 대신 solver를 사용하는 이유
+# 남은 칸이 적으면 depth limit 없이 게임이 끝날 때까지 탐색할 수 있으므로,
+# heuristic function, iterative deepening, 시간 예측이 모두 필요 없다
+
+## 탐색 방법 (현재 turn의 player 입장에서 계산하는 negamax)
+# 1. 바로 이길 수 있다면 바로 return
+# 2. 지지 않는 수(non-losing move)만 탐색한다
+#    - 상대가 이길 수 있는 칸이 2개 이상 열려 있다면 다음 turn에 진다
+#    - 상대가 이길 수 있는 칸이 1개 열려 있다면 그 칸만 탐색한다 (막는 수)
+#    - 상대가 이길 수 있는 칸 바로 아래에는 두지 않는다
+# 3. 남은 칸으로 얻을 수 있는 가장 높은 score로 beta를 줄인다
+# 4. 구한 score는 depth = PROVEN으로 self.table에 저장한다 (GameTree의 탐색에서도 그대로 사용할 수 있다)
+# 5. root에서는 null window 탐색만 사용한다
+#    - 먼저 비기는 score로 이기는지/비기는지/지는지를 확인하고 (weak solver)
+#    - 이기거나 진다면 몇 수 안에 끝나는지를 binary search로 찾는다 (strong solver)
+
+## score (GameTree와 같은 기준)
+# 이긴 경우 : 1000 + width * height - (이긴 stone을 둔 후의 moves) + 1, 진 경우 : 음수
+# 비긴 경우 : AI 입장에서 1000 (현재 turn이 Human이라면 -1000)
+# self.table, self.nodes, self.checkLimits는 GameTree class에서 만든다
+
+from moveOrder import MoveOrder
+from transpositionTable import PROVEN, EXACT, LOWER, UPPER
+
+class EndgameSolver(MoveOrder):
+
+    # Initialization
+    # input : player, width, height, solver를 사용할 남은 칸 수
+    def __init__(self, player, width = None, height = None, solverCells = 16):
+        # MoveOrder class에서 initialization
+        super().__init__(player, width, height)
+
+        # 남은 칸이 solverCells개 이하가 되면 GameTree.search에서 solver를 사용한다
+        self.solverCells = solverCells
+
+        # solver에서 null window 탐색을 한 횟수
+        self.solverProbes = 0
+
+    # 현재 상태에서 게임의 결과를 정확히 계산한다
+    # input : weak solver 여부 (True이면 이기는지/비기는지/지는지만 확인)
+    # output : 현재 turn의 player 입장에서의 score (weak이면 이기거나 지는 경우는 bound)
+    def solve(self, weak = False):
+        area = self.width * self.height
+        draw = 1000 if (self.moves % 2 == self.player) else -1000
+
+        # 1. 비기는 score로 null window 탐색
+        self.solverProbes += 1
+        score = self.solveNode(draw - 1, draw + 1)
+        if weak or score == draw:
+            return score
+
+        # 2. 이기거나 지는 경우, score의 범위를 binary search로 좁힌다
+        if score > draw:
+            lower, upper = score, 1000 + area - self.moves
+        else:
+            lower, upper = -(1000 + area - self.moves), score
+        while lower < upper:
+            middle = (lower + upper) // 2
+            self.solverProbes += 1
+            score = self.solveNode(middle, middle + 1)
+            if score <= middle:
+                upper = score
+            else:
+                lower = score
+        return lower
+
+    # alpha-beta pruning을 이용하여 게임이 끝날 때까지 탐색한다 (heuristic을 사용하지 않는다)
+    # input : alpha, beta값 (현재 turn 기준)
+    # output : 현재 turn의 player 입장에서의 score (alpha 이하 또는 beta 이상이라면 그 bound)
+    def solveNode(self, alpha, beta):
+        self.nodes += 1
+        if not (self.nodes & 255):
+            self.checkLimits()
+        area = self.width * self.height
+        moves = self.moves
+        sign = 1 if (moves % 2 == self.player) else -1
+
+        ## 1. 바로 score를 return 할 수 있는 경우
+        # 1-1. 게임이 비긴 경우
+        if moves >= area:
+            return 1000 * sign
+
+        # 1-2. 현재 turn에 바로 이길 수 있는 경우
+        if self.winningCells(self.mask - self.posOX) & self.playableCells():
+            return 1000 + area - moves
+
+        # 1-3. 지지 않는 수만 남긴다 (Board.nonLosingCells)
+        playable = self.nonLosingCells()
+        if not playable:
+            return -(1000 + area - moves - 1)
+
+        # 1-4. 가장 빨리 이기는 경우는 다음 turn(moves + 3번째 stone)이므로 beta를 줄인다
+        maxScore = (1000 + area - moves - 2) if (area - moves >= 3) else 1000 * sign
+        if beta > maxScore:
+            beta = maxScore
+            if alpha >= beta:
+                return beta
+
+        # 1-5. self.table에 결과가 확실한 값(depth = PROVEN)이 있는 경우
+        pos, posMirror = self.posCurrent(), self.posMirror()
+        mirrored = posMirror < pos
+        if mirrored:
+            pos = posMirror
+        ttMove = -1
+        slot = self.table.find(pos)
+        if slot >= 0:
+            ttMove = self.table.moves[slot] - 1
+            if mirrored and ttMove >= 0:
+                ttMove = self.width - ttMove - 1
+            if self.table.depths[slot] > PROVEN:
+                score = self.table.values[slot] * sign
+                flag = self.table.flags[slot]
+                if flag == EXACT:
+                    return score
+                if (flag == LOWER) == (sign > 0):
+                    if alpha < score:
+                        alpha = score
+                elif score < beta:
+                    beta = score
+                if beta <= alpha:
+                    return score
+
+        ## 2. 지지 않는 수들을 MoveOrder 순서대로 탐색
+        alphaInit = alpha
+        count = self.fillMoves(ttMove, playable)
+        moveBuffer = self.moveBuffer[moves]
+        score, bestCol = -100000, -1
+        for i in range(count):
+            col = moveBuffer[i]
+            self.put(col)
+            childScore = -self.solveNode(-beta, -alpha)
+            self.undo()
+            if childScore > score:
+                score, bestCol = childScore, col
+                if score >= beta:
+                    self.cutoff(col, area - moves, i == 0)
+                    break               # pruning!
+                if score > alpha:
+                    alpha = score
+
+        ## 3. score를 AI 입장으로 바꾸어 self.table에 저장
+        if score <= alphaInit:
+            flag = UPPER if (sign > 0) else LOWER
+        elif score >= beta:
+            flag = LOWER if (sign > 0) else UPPER
+        else:
+            flag = EXACT
+        if mirrored:
+            bestCol = self.width - bestCol - 1
+        self.table.store(pos, score * sign, PROVEN, flag, bestCol)
+        return score
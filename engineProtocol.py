@@ -0,0 +1,304 @@
+### AI를 다른 program(대국 관리 program 등)에서 subprocess로 실행하기 위한 한 줄 단위의 protocol (UCI와 비슷한 형식) ###
+
+## protocol을 사용하는 이유
+# play.py는 input()으로 한국어 안내문을 출력하며 입력을 받고, GameTree.search는 탐색 결과를 print로 출력한다
+# -> 여러 engine process를 실행하는 program이 출력된 문장을 해석하지 않아도 되도록, 명령과 응답을 정해진 형식의 한 줄로 주고받는다
+# -> GameTree, Rule이 print하는 내용은 출력하지 않고, protocol의 응답만 stdout으로 출력한다
+
+## 실행 방법
+# python engineProtocol.py [backend] [engine]
+# backend : 'search' (GameTree, 기본값) 또는 'rule' (Rule), engine : GameTree의 engine (기본값 'minimax')
+
+## 명령 (stdin, column number는 1부터 시작)
+# uci                                   -> 'id name ...', 'option ...', 'uciok'
+# isready                               -> 'readyok'
+# setoption name <이름> value <값>       -> Backend(search/rule), Engine(minimax/negamax/pvs/mtdf), Hash(MB)
+# ucinewgame                            -> transposition table을 비우고 새 게임을 시작한다
+# position [startpos] [moves] <columns> -> 처음부터 둔 column number들 (ex. 'position startpos moves 4 4 3', 'position 443')
+# go [movetime <ms>] [depth <d>] [nodes <n>] [infinite]
+#                                       -> 탐색을 시작한다 (탐색은 thread에서 진행하므로 그동안 다른 명령을 받을 수 있다)
+#                                          infinite라면 탐색이 먼저 끝나더라도 stop 또는 quit 명령을 받을 때까지 'bestmove'를 출력하지 않는다
+# stop                                  -> 탐색을 멈추고, 마지막으로 끝까지 탐색한 depth의 결과로 'bestmove'를 출력한다
+# quit                                  -> 탐색을 멈추고 종료한다
+# 탐색 중에 setoption, ucinewgame, position, go 명령을 받으면 먼저 탐색을 멈추고 'bestmove'를 출력한 뒤 처리한다
+
+## 응답 (stdout)
+# info depth <d> score <cp x | mate n | draw> nodes <n> nps <n> time <ms> pv <columns>
+#   - 탐색한 depth마다 출력한다
+#   - score는 둘 차례인 player 입장이다
+#   - mate n : n수 안에 이긴다 (지는 경우 -n)
+#   - cp x   : 3순위 heuristic value
+# info string <문장>                     -> rule backend에서 사용한 rule 이름, 잘못된 명령 등
+# bestmove <column>                     -> 선택한 column number (둘 곳이 없으면 'bestmove none')
+
+from gameTree import GameTree, SearchTimeout
+from rule import Rule
+from timeControl import TimeControl
+from openingBook import openBook
+from time import time
+import os
+import sys
+import threading
+
+# protocol에서 사용하는 GameTree
+# stop 명령을 받으면 256 node마다 확인하는 checkLimits에서 탐색을 멈추고,
+# 한 depth를 끝까지 탐색할 때마다 listener에 결과를 알린다
+class EngineTree(GameTree):
+
+    # Initialization
+    # input : GameTree와 같음
+    def __init__(self, player, width = None, height = None, ttMemory = 16, engine = 'minimax', book = None):
+        super().__init__(player, width, height, ttMemory = ttMemory, engine = engine, book = book)
+        self.stopEvent = threading.Event()
+        self.listener = None
+
+    def checkLimits(self):
+        if self.stopEvent.is_set():
+            raise SearchTimeout
+        super().checkLimits()
+
+    # GameTree.searchRoot로 한 depth를 탐색한 뒤, 끝까지 탐색한 경우에만 listener에 (depth, best column, score)를 알린다
+    def searchRoot(self, colOrder, depth):
+        depthScores, depthTime = super().searchRoot(colOrder, depth)
+        if self.listener is not None:
+            baseOrder = [col for col in self.getColOrder() if col in depthScores]
+            bestCol = self.bestColumn(baseOrder, depthScores)
+            self.listener(depth, bestCol, depthScores[bestCol])
+        return depthScores, depthTime
+
+class Engine:
+
+    # Initialization
+    # input : 'search' 또는 'rule', GameTree의 engine, 응답을 출력할 stream
+    def __init__(self, backend = 'search', engine = 'minimax', output = None):
+        self.output = output if (output is not None) else sys.stdout
+        self.outputLock = threading.Lock()
+        self.backend = backend
+        self.engine = engine
+        self.ttMemory = 16
+        self.book = None
+
+        # player(0 = 선공, 1 = 후공)별 GameTree (둘 차례인 player가 AI가 되도록 position마다 골라 사용한다)
+        # 같은 게임에서는 transposition table을 계속 사용한다
+        self.trees = [None, None]
+
+        # 현재 position (처음부터 둔 column number list)과 탐색 중인 thread
+        self.moves = []
+        self.thread = None
+        self.tree = None
+
+    # 응답 한 줄을 출력한다 (탐색 thread와 main thread가 함께 사용)
+    def send(self, line):
+        with self.outputLock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    # 명령 한 줄을 처리한다
+    # input : 명령 문자열
+    # output : quit 명령이면 False, 아니면 True
+    def handle(self, line):
+        words = line.split()
+        if not words:
+            return True
+        command, args = words[0], words[1:]
+        try:
+            if command == 'uci':
+                self.send('id name connect-four (' + self.backend + ')')
+                self.send('option name Backend type combo default search var search var rule')
+                self.send('option name Engine type combo default minimax var minimax var negamax var pvs var mtdf')
+                self.send('option name Hash type spin default 16 min 1 max 1024')
+                self.send('uciok')
+            elif command == 'isready':
+                self.send('readyok')
+            elif command == 'setoption':
+                self.stop()
+                self.setOption(args)
+            elif command == 'ucinewgame':
+                self.stop()
+                self.trees = [None, None]
+                self.moves = []
+            elif command == 'position':
+                self.stop()
+                self.moves = self.parseMoves(args)
+            elif command == 'go':
+                self.stop()
+                self.go(args)
+            elif command == 'stop':
+                self.stop()
+            elif command == 'quit':
+                self.stop()
+                return False
+            else:
+                self.send('info string unknown command ' + command)
+        except ValueError as error:
+            self.send('info string error ' + str(error))
+        return True
+
+    # setoption 명령 처리
+    # input : 'name <이름> value <값>' 단어 list
+    def setOption(self, args):
+        if len(args) < 4 or args[0] != 'name' or args[2] != 'value':
+            raise ValueError('setoption name <이름> value <값>')
+        name, value = args[1].lower(), args[3].lower()
+        if name == 'backend':
+            if value not in ('search', 'rule'):
+                raise ValueError('Backend는 search 또는 rule이어야 합니다 : ' + value)
+            self.backend = value
+        elif name == 'engine':
+            if value not in ('minimax', 'negamax', 'pvs', 'mtdf'):
+                raise ValueError('Engine은 minimax, negamax, pvs, mtdf 중 하나여야 합니다 : ' + value)
+            self.engine = value
+            self.trees = [None, None]
+        elif name == 'hash':
+            self.ttMemory = int(value)
+            self.trees = [None, None]
+        else:
+            raise ValueError('알 수 없는 option : ' + args[1])
+
+    # position 명령의 column number들을 읽는다 (1부터 시작, 'startpos', 'moves'는 무시한다)
+    # input : 단어 list
+    # output : column number list (0부터 시작)
+    def parseMoves(self, args):
+        board = Rule(0)
+        moves = []
+        for text in args:
+            if text in ('startpos', 'moves'):
+                continue
+            for char in text:
+                col = int(char) - 1
+                if not (0 <= col < board.width) or not board.possible(col) or board.win():
+                    raise ValueError('둘 수 없는 column : ' + char)
+                board.put(col)
+                moves.append(col)
+        return moves
+
+    # 현재 position에서 둘 차례인 player를 AI로 하는 GameTree를 만들고, board를 self.moves와 같게 맞춘다
+    # 이전 position과 같은 수순까지는 그대로 두고, 다른 부분만 undo/put 한다
+    # output : EngineTree object
+    def getTree(self):
+        player = len(self.moves) % 2
+        if self.trees[player] is None:
+            if self.book is None:
+                self.book = openBook()
+            self.trees[player] = EngineTree(player, ttMemory = self.ttMemory, engine = self.engine, book = self.book)
+        tree = self.trees[player]
+        common = 0
+        while common < min(len(tree.log), len(self.moves)) and tree.log[common] == self.moves[common]:
+            common += 1
+        while tree.moves > common:
+            tree.undo()
+        tree.puts(self.moves[common:])
+        return tree
+
+    # go 명령 처리
+    # input : 단어 list
+    def go(self, args):
+        # 1. 탐색 제한 (movetime은 ms 단위)
+        options = dict()
+        infinite = False
+        i = 0
+        while i < len(args):
+            if args[i] == 'infinite':
+                infinite = True
+                i += 1
+                continue
+            if args[i] not in ('movetime', 'depth', 'nodes') or i + 1 >= len(args):
+                raise ValueError('go [movetime <ms>] [depth <d>] [nodes <n>] [infinite]')
+            options[args[i]] = int(args[i + 1])
+            i += 2
+
+        # 2. 게임이 끝난 position
+        board = Rule(len(self.moves) % 2)
+        board.puts(self.moves)
+        if board.win() or board.moves == board.width * board.height:
+            self.send('bestmove none')
+            return
+
+        # 3. rule backend는 바로 결과를 출력한다
+        if self.backend == 'rule':
+            col, name, _ = board.choose()
+            self.send('info string ' + name)
+            self.send('bestmove ' + str(col + 1))
+            return
+
+        # 4. search backend는 thread에서 탐색한다
+        tree = self.getTree()
+        moveTime = options['movetime'] / 1000 if ('movetime' in options) else None
+        tree.timeControl = TimeControl(moveTime = moveTime, nodes = options.get('nodes'), depth = options.get('depth'))
+        tree.stopEvent.clear()
+        self.tree = tree
+        self.thread = threading.Thread(target = self.run, args = (tree, infinite), daemon = True)
+        self.thread.start()
+
+    # thread에서 실행되는 탐색
+    # input : EngineTree object, go infinite 명령인지 여부
+    def run(self, tree, infinite = False):
+        startTime, startNodes = time(), tree.nodes
+        reported = []
+
+        # 한 depth를 끝까지 탐색할 때마다 info를 출력한다
+        def listener(depth, bestCol, score):
+            tree.put(bestCol)
+            pv = [bestCol] + tree.principalVariation()
+            tree.undo()
+            self.sendInfo(tree, depth, score, pv, startTime, startNodes)
+            reported.append(depth)
+
+        tree.listener = listener
+        col = tree.search(startTime)
+        tree.listener = None
+
+        # opening book, result cache, rootTactics로 탐색 없이 둔 경우
+        if not reported:
+            pos, posMirror = tree.posCurrent(), tree.posMirror()
+            slot = tree.table.find(min(pos, posMirror))
+            score = tree.table.values[slot] if (slot >= 0) else None
+            self.sendInfo(tree, tree.ply, score, [col], startTime, startNodes)
+
+        # go infinite라면 stop 또는 quit 명령을 받을 때까지 기다린 뒤 bestmove를 출력한다
+        if infinite:
+            tree.stopEvent.wait()
+        self.send('bestmove ' + str(col + 1))
+
+    # info 한 줄을 출력한다
+    # input : EngineTree object, depth, score (AI 입장, 모르면 None), principal variation, 탐색 시작 시간, 탐색 시작 시의 node 수
+    def sendInfo(self, tree, depth, score, pv, startTime, startNodes):
+        elapsed = time() - startTime
+        nodes = tree.nodes - startNodes
+        items = ['info', 'depth', str(depth)]
+        if score is not None:
+            if score > 1000:
+                items += ['score', 'mate', str(tree.area - tree.moves - (score - 1001))]
+            elif score < -1000:
+                items += ['score', 'mate', str(-(tree.area - tree.moves + (score + 1001)))]
+            elif score == 1000:
+                items += ['score', 'draw']
+            else:
+                items += ['score', 'cp', str(score)]
+        items += ['nodes', str(nodes), 'nps', str(int(nodes / elapsed) if (elapsed > 0) else 0), 'time', str(int(elapsed * 1000))]
+        items += ['pv'] + [str(col + 1) for col in pv]
+        self.send(' '.join(items))
+
+    # 탐색 중이라면 탐색을 멈추고, thread가 bestmove를 출력할 때까지 기다린다
+    def stop(self):
+        if self.thread is not None:
+            self.tree.stopEvent.set()
+            self.thread.join()
+            self.thread = None
+            self.tree = None
+
+# stdin에서 명령을 한 줄씩 읽어 처리한다
+# GameTree, Rule이 print하는 내용은 버리고, protocol의 응답만 원래의 stdout으로 출력한다
+def main():
+    backend = sys.argv[1] if (len(sys.argv) > 1) else 'search'
+    engine = sys.argv[2] if (len(sys.argv) > 2) else 'minimax'
+    output = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    protocol = Engine(backend, engine, output)
+    for line in sys.stdin:
+        if not protocol.handle(line):
+            break
+    protocol.stop()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
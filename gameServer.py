@@ -0,0 +1,424 @@
+### 많은 게임을 동시에 진행하기 위한 asyncio server (worker process pool에서 탐색) ###
+
+## server를 사용하는 이유
+# play.py는 process 하나가 게임 하나를 input()으로 진행하고, GameTree의 board와 table은 object마다 따로 있다
+# -> 게임(session)마다 board는 둔 column number들로만 가지고 있고, 탐색은 정해진 수의 worker process가 나누어 한다
+# -> 연결(client)이 많아도 thread나 process를 늘리지 않도록 asyncio로 여러 연결을 한 thread에서 처리한다
+
+## 구조
+# 1. session : 게임마다 둔 column number list, Position, backend('search' 또는 'rule')를 가진다
+# 2. queue   : 'go' 요청은 크기가 정해진 queue에 넣고, queue가 가득 차면 기다리지 않고 바로 'busy' error를 보낸다 (backpressure)
+#              client는 잠시 후 다시 요청해야 한다
+# 3. worker  : process pool의 worker 수만큼의 coroutine이 queue에서 요청을 꺼내 worker process에 넘긴다
+#              요청마다 deadline(ms)이 있으며, queue에서 기다리는 동안 deadline이 지나면 탐색하지 않고 'deadline' error를 보낸다
+#              탐색 시간은 남은 시간과 movetime 중 작은 값으로 제한한다
+# 4. 공유하는 table
+#    - worker process마다 player별 GameTree를 하나씩 만들어 모든 게임에서 같이 사용한다 (transposition table은 position의 key로 찾으므로 게임이 달라도 사용할 수 있다)
+#    - opening book은 worker마다 mmap으로 열기 때문에 파일 내용은 OS가 process들 사이에서 공유한다
+#    - heuristic의 window table은 board 크기별로 process마다 한 번만 만든다 (heuristic.windowTable)
+#    - rule backend는 server process의 RuleDecider(LRU cache)를 모든 session이 같이 사용한다
+# 5. 통계 : 'go' 요청의 latency(요청을 받은 뒤 응답할 때까지, queue에서 기다린 시간 포함) percentile과 초당 처리한 요청 수
+
+## 요청과 응답 (한 줄에 JSON 하나, column number는 1부터 시작)
+# {"op": "new", "backend": "search"}                      -> {"game": 게임 번호}
+# {"op": "move", "game": 1, "col": 4}                     -> {"moves": 둔 수의 수, "result": null | "win" | "draw"}
+# {"op": "go", "game": 1, "movetime": 200, "deadline": 1000, "depth": 10, "nodes": 100000}
+#                                                         -> {"col": AI가 둔 column, "score", "depth", "nodes", "rule", "result", "queueTime", "time"}
+#                                                            (movetime, deadline은 ms, depth와 nodes는 생략할 수 있다. 선택한 column은 session에 바로 둔다)
+# {"op": "close", "game": 1}                              -> {}
+#                                                            (연결이 끊어지면 그 연결에서 만든 게임은 close 하지 않았더라도 모두 정리한다)
+# {"op": "stats"}                                         -> {"sessions", "queued", "completed", "busy", "expired", "throughput", "latency": {"p50", "p90", "p99", "max"}}
+# 요청에 "id"가 있으면 응답에 그대로 넣어 보낸다. error가 발생하면 {"error": 문장}을 보낸다
+
+## 실행 방법
+# python gameServer.py serve [port 또는 unix socket 경로] [worker 수]     (기본값 : 127.0.0.1:7474, CPU 수)
+# python gameServer.py bench [client 수] [게임 수] [backend] [movetime]   (server와 load generator를 함께 실행하여 측정)
+
+from gameTree import GameTree
+from parallelSearch import loadSnapshot
+from position import Position
+from rule import RuleDecider
+from timeControl import TimeControl
+from openingBook import openBook
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from collections import deque
+from time import time
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+
+# worker process마다 하나씩 존재하는 player별 GameTree와 설정
+workerTrees = [None, None]
+workerOptions = None
+
+# worker process를 시작할 때 한 번 실행된다
+# input : transposition table 크기(MB), engine
+def initWorker(ttMemory, engine):
+    global workerOptions
+    workerOptions = (ttMemory, engine, openBook())
+
+# worker process에서 한 게임의 position을 탐색한다
+# 둘 차례인 player의 GameTree를 사용하며, 처음 사용할 때 만든다
+# input : board (지금까지 둔 column number의 bytes), 제한 시간(초), depth, node 수
+# output : (column number, score (AI 입장, 모르면 None), 끝까지 탐색한 depth, 탐색한 node 수)
+def searchGame(snapshot, moveTime, depth, nodes):
+    player = len(snapshot) % 2
+    if workerTrees[player] is None:
+        ttMemory, engine, book = workerOptions
+        with redirect_stdout(io.StringIO()):
+            workerTrees[player] = GameTree(player, ttMemory = ttMemory, engine = engine, book = book)
+    tree = workerTrees[player]
+    loadSnapshot(tree, snapshot)
+
+    tree.timeControl = TimeControl(moveTime = moveTime, nodes = nodes, depth = depth)
+    startNodes = tree.nodes
+    with redirect_stdout(io.StringIO()):
+        col = tree.search(time())
+    pos, posMirror = tree.posCurrent(), tree.posMirror()
+    slot = tree.table.find(min(pos, posMirror))
+    score = tree.table.values[slot] if (slot >= 0) else None
+    return col, score, tree.ply, tree.nodes - startNodes
+
+# 값들의 percentile
+# input : 정렬된 값의 list, percentile (0 ~ 100)
+# output : percentile에 해당하는 값 (값이 없으면 0)
+def percentile(values, p):
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+# 게임 하나의 상태
+class GameSession:
+
+    # Initialization
+    # input : 게임 번호, backend
+    def __init__(self, gameId, backend):
+        self.gameId = gameId
+        self.backend = backend
+        self.moves = []
+        self.position = Position()
+        self.result = None          # None, 'win' (마지막에 둔 player가 이김), 'draw'
+        self.lock = asyncio.Lock()  # 한 게임의 요청은 하나씩 처리한다
+        self.closed = False         # close 되었다면 True (lock을 기다리던 요청은 처리하지 않는다)
+
+    # column에 stone을 둔다
+    # input : column number (0부터 시작)
+    def play(self, col):
+        if self.result is not None:
+            raise ValueError('이미 끝난 게임입니다.')
+        if not (0 <= col < self.position.width) or not self.position.possible(col):
+            raise ValueError('둘 수 없는 column : ' + str(col + 1))
+        self.position = self.position.play(col)
+        self.moves.append(col)
+        if self.position.win():
+            self.result = 'win'
+        elif self.position.moves == self.position.width * self.position.height:
+            self.result = 'draw'
+
+class GameServer:
+
+    # Initialization
+    # input : worker process의 수 (None이면 CPU 수), queue 크기, transposition table 크기(MB), engine, 기본 movetime(ms), 기본 deadline(ms)
+    def __init__(self, workers = None, queueSize = 256, ttMemory = 16, engine = 'minimax', moveTime = 1000, deadline = 5000):
+        self.workers = workers if (workers is not None) else (os.cpu_count() or 1)
+        self.queueSize = queueSize
+        self.ttMemory = ttMemory
+        self.engine = engine
+        self.moveTime = moveTime
+        self.deadline = deadline
+
+        # session, 처음 start할 때 만드는 process pool과 queue
+        self.sessions = dict()
+        self.nextGameId = 1
+        self.pool = None
+        self.queue = None
+        self.dispatchers = []
+        self.server = None
+
+        # rule backend에서 모든 session이 같이 사용하는 cache
+        self.decider = RuleDecider()
+
+        # 통계 (latency는 최근 10000개의 'go' 요청, ms 단위)
+        self.latencies = deque(maxlen = 10000)
+        self.completed = 0
+        self.busy = 0
+        self.expired = 0
+        self.startTime = time()
+
+    # server를 시작한다
+    # input : host와 port, 또는 unix socket 경로 (path가 있으면 unix socket 사용)
+    async def start(self, host = '127.0.0.1', port = 7474, path = None):
+        self.pool = ProcessPoolExecutor(self.workers, initializer = initWorker, initargs = (self.ttMemory, self.engine))
+        self.queue = asyncio.Queue(self.queueSize)
+        self.dispatchers = [asyncio.ensure_future(self.dispatch()) for _ in range(self.workers)]
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handleClient, path = path)
+        else:
+            self.server = await asyncio.start_server(self.handleClient, host, port)
+        self.startTime = time()
+        return self.server
+
+    # server와 process pool을 정리한다
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # 연결 하나를 처리한다 (요청을 한 줄씩 읽고, 응답을 보낸 뒤 다음 요청을 읽는다)
+    # 연결이 끊어지면 이 연결에서 만든 게임들의 session을 정리한다
+    async def handleClient(self, reader, writer):
+        owned = set()   # 이 연결에서 만든 게임 번호
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = await self.handle(request, owned)
+                except Exception as error:
+                    response = {'error': str(error)}
+                if isinstance(request, dict) and 'id' in request:
+                    response['id'] = request['id']
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # client가 연결을 끊었거나 server를 종료하는 경우
+            pass
+        finally:
+            for gameId in owned:
+                session = self.sessions.pop(gameId, None)
+                if session is not None:
+                    session.closed = True
+            writer.close()
+
+    # 요청 하나를 처리한다
+    # input : 요청 dict, 요청을 보낸 연결에서 만든 게임 번호 set (None이면 기록하지 않는다)
+    # output : 응답 dict
+    async def handle(self, request, owned = None):
+        op = request['op']
+        if op == 'new':
+            backend = request.get('backend', 'search')
+            if backend not in ('search', 'rule'):
+                raise ValueError('backend는 search 또는 rule이어야 합니다 : ' + str(backend))
+            session = GameSession(self.nextGameId, backend)
+            self.sessions[session.gameId] = session
+            self.nextGameId += 1
+            if owned is not None:
+                owned.add(session.gameId)
+            return {'game': session.gameId}
+        if op == 'stats':
+            return self.stats()
+
+        session = self.sessions.get(request['game'])
+        if session is None:
+            raise ValueError('없는 게임 번호 : ' + str(request['game']))
+        async with session.lock:
+            # lock을 기다리는 동안 다른 요청이나 연결 종료로 close 된 게임
+            if session.closed:
+                raise ValueError('없는 게임 번호 : ' + str(request['game']))
+            if op == 'close':
+                session.closed = True
+                self.sessions.pop(session.gameId, None)
+                if owned is not None:
+                    owned.discard(session.gameId)
+                return {}
+            if op == 'move':
+                session.play(int(request['col']) - 1)
+                return {'moves': len(session.moves), 'result': session.result}
+            if op == 'go':
+                return await self.go(session, request)
+        raise ValueError('알 수 없는 op : ' + str(op))
+
+    # 'go' 요청 처리 : session의 position에서 AI가 둘 column을 정하고 session에 둔다
+    # input : GameSession object, 요청 dict
+    # output : 응답 dict
+    async def go(self, session, request):
+        if session.result is not None:
+            raise ValueError('이미 끝난 게임입니다.')
+        startTime = time()
+        deadline = startTime + request.get('deadline', self.deadline) / 1000
+        moveTime = request.get('movetime', self.moveTime) / 1000
+        response = {'score': None, 'depth': 0, 'nodes': 0, 'rule': None, 'queueTime': 0}
+
+        # 1. rule backend는 server process에서 바로 계산한다
+        if session.backend == 'rule':
+            lastCol = session.moves[-1] if session.moves else -1
+            col, response['rule'] = self.decider.decide(session.position, lastCol)
+
+        # 2. search backend는 queue에 넣고 worker의 결과를 기다린다 (queue가 가득 차면 바로 error)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            job = (bytes(session.moves), moveTime, request.get('depth'), request.get('nodes'), deadline, startTime, future)
+            try:
+                self.queue.put_nowait(job)
+            except asyncio.QueueFull:
+                self.busy += 1
+                return {'error': 'busy'}
+            result = await future
+            if result is None:
+                self.expired += 1
+                return {'error': 'deadline'}
+            col, response['score'], response['depth'], response['nodes'], response['queueTime'] = result
+
+        # 3. 선택한 column을 session에 둔다
+        session.play(col)
+        elapsed = (time() - startTime) * 1000
+        self.latencies.append(elapsed)
+        self.completed += 1
+        response.update({'col': col + 1, 'result': session.result, 'time': elapsed})
+        return response
+
+    # queue에서 요청을 꺼내 worker process에 넘기는 coroutine (worker process 수만큼 실행)
+    # deadline이 지난 요청은 탐색하지 않고 None을 결과로 넘긴다
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            snapshot, moveTime, depth, nodes, deadline, startTime, future = await self.queue.get()
+            now = time()
+            queueTime = (now - startTime) * 1000
+            remaining = deadline - now
+            if remaining <= 0:
+                future.set_result(None)
+                continue
+            try:
+                col, score, ply, searched = await loop.run_in_executor(self.pool, searchGame, snapshot, min(moveTime, remaining * 0.9), depth, nodes)
+                future.set_result((col, score, ply, searched, queueTime))
+            except Exception as error:
+                future.set_exception(error)
+
+    # output : server의 통계 dict
+    def stats(self):
+        latencies = sorted(self.latencies)
+        elapsed = time() - self.startTime
+        return {
+            'sessions': len(self.sessions),
+            'queued': self.queue.qsize() if (self.queue is not None) else 0,
+            'completed': self.completed,
+            'busy': self.busy,
+            'expired': self.expired,
+            'throughput': self.completed / elapsed if (elapsed > 0) else 0.0,
+            'latency': {'p50': percentile(latencies, 50), 'p90': percentile(latencies, 90), 'p99': percentile(latencies, 99), 'max': latencies[-1] if latencies else 0},
+        }
+
+# server에 연결하여 요청을 보내는 client
+class GameClient:
+
+    # input : host와 port, 또는 unix socket 경로
+    async def connect(self, host = '127.0.0.1', port = 7474, path = None):
+        if path is not None:
+            self.reader, self.writer = await asyncio.open_unix_connection(path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        return self
+
+    # 요청을 보내고 응답을 기다린다
+    # input : 요청 dict
+    # output : 응답 dict
+    async def request(self, message):
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+# 여러 client가 동시에 random한 Human과 AI의 게임을 진행하여 server의 latency와 throughput을 측정한다 (load generator)
+# 'busy' error를 받으면 잠시 기다렸다가 다시 요청한다
+# input : host, port, unix socket 경로, client 수, 전체 게임 수, backend, movetime(ms), random seed
+# output : 측정 결과 dict (client 입장의 latency percentile, 초당 'go' 요청 수, 초당 게임 수, server의 통계)
+async def loadTest(host = '127.0.0.1', port = 7474, path = None, clients = 16, games = 100, backend = 'search', moveTime = 50, seed = 0):
+    rand = random.Random(seed)
+    latencies, counts = [], {'games': 0, 'go': 0, 'busy': 0, 'errors': 0}
+
+    async def play(client):
+        while counts['games'] < games:
+            counts['games'] += 1
+            gameId = (await client.request({'op': 'new', 'backend': backend}))['game']
+            position, humanTurn = Position(), rand.random() < 0.5
+            result = None
+            while result is None:
+                if humanTurn:
+                    col = rand.choice([col for col in range(position.width) if position.possible(col)])
+                    result = (await client.request({'op': 'move', 'game': gameId, 'col': col + 1}))['result']
+                else:
+                    startTime = time()
+                    response = await client.request({'op': 'go', 'game': gameId, 'movetime': moveTime})
+                    if response.get('error') == 'busy':
+                        counts['busy'] += 1
+                        await asyncio.sleep(0.01)
+                        continue
+                    if 'error' in response:
+                        counts['errors'] += 1
+                        break
+                    latencies.append((time() - startTime) * 1000)
+                    counts['go'] += 1
+                    col, result = response['col'] - 1, response['result']
+                position = position.play(col)
+                humanTurn = not humanTurn
+            await client.request({'op': 'close', 'game': gameId})
+
+    connections = [await GameClient().connect(host, port, path) for _ in range(clients)]
+    startTime = time()
+    await asyncio.gather(*[play(client) for client in connections])
+    elapsed = time() - startTime
+    stats = await connections[0].request({'op': 'stats'})
+    for client in connections:
+        await client.close()
+
+    latencies.sort()
+    return {
+        'games': counts['games'], 'go': counts['go'], 'busy': counts['busy'], 'errors': counts['errors'], 'time': elapsed,
+        'throughput': counts['go'] / elapsed, 'gamesPerSecond': counts['games'] / elapsed,
+        'latency': {'p50': percentile(latencies, 50), 'p90': percentile(latencies, 90), 'p99': percentile(latencies, 99), 'max': latencies[-1] if latencies else 0},
+        'server': stats,
+    }
+
+# server와 load generator를 함께 실행하여 결과를 출력한다
+async def bench(clients = 16, games = 100, backend = 'search', moveTime = 50):
+    server = GameServer(moveTime = moveTime)
+    await server.start(port = 0)
+    port = server.server.sockets[0].getsockname()[1]
+    result = await loadTest(port = port, clients = clients, games = games, backend = backend, moveTime = moveTime)
+    await server.close()
+    latency = result['latency']
+    print(backend + ' : ' + str(result['games']) + '게임, go ' + str(result['go']) + '번, ' + str(round(result['time'], 3)) + '초, '
+          + str(round(result['throughput'], 1)) + ' go/초, ' + str(round(result['gamesPerSecond'], 2)) + ' 게임/초')
+    print('\tlatency (ms) : p50 ' + str(round(latency['p50'], 1)) + ', p90 ' + str(round(latency['p90'], 1)) + ', p99 ' + str(round(latency['p99'], 1)) + ', max ' + str(round(latency['max'], 1)))
+    print('\tbusy ' + str(result['busy']) + '번, error ' + str(result['errors']) + '번, server : ' + json.dumps(result['server']))
+
+# 종료할 때까지 server를 실행한다
+async def serve(address = '7474', workers = None):
+    server = GameServer(workers)
+    if address.isdigit():
+        await server.start(port = int(address))
+    else:
+        await server.start(path = address)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+if __name__ == '__main__':
+    mode = sys.argv[1] if (len(sys.argv) > 1) else 'serve'
+    if mode == 'bench':
+        clients = int(sys.argv[2]) if (len(sys.argv) > 2) else 16
+        games = int(sys.argv[3]) if (len(sys.argv) > 3) else 100
+        backend = sys.argv[4] if (len(sys.argv) > 4) else 'search'
+        moveTime = int(sys.argv[5]) if (len(sys.argv) > 5) else 50
+        asyncio.run(bench(clients, games, backend, moveTime))
+    else:
+        address = sys.argv[2] if (len(sys.argv) > 2) else '7474'
+        workers = int(sys.argv[3]) if (len(sys.argv) > 3) else None
+        asyncio.run(serve(address, workers))
\ No newline at end of file
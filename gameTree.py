@@ -5,8 +5,10 @@
 # 2. Alpha-Beta pruning
 # 3. Partial tree
 # 4. Heuristic function
-# 5. Iterative deepening (기존의 개념에서 변형하여 사용)
-# 6. Dynamic Programming
+# 5. Iterative deepening (depth를 1씩 늘려가며 탐색하고, 제한 시간이 지나면 마지막으로 끝까지 탐색한 depth의 결과를 사용)
+# 6. Dynamic Programming (transposition table)
+# 7. 남은 칸이 solverCells개 이하라면 heuristic 없이 게임의 결과를 정확히 계산 (EndgameSolver class)
+# 8. 탐색 전에 bit 연산으로 확실한 수를 찾아 바로 두고, 바로 지는 column은 탐색하지 않음 (rootTactics 함수)
 
 ## heuristic value를 결정하는 우선순위
 # 1순위 : 게임에서 이기거나 진 경우 (게임의 결과를 확실히 아는 경우)
@@ -16,42 +18,86 @@
 #            2. column을 탐색한 순서 (탐색하는 column의 순서가 가운대를 중심으로 탐색하기 때문에 가장 가운데이 있는 것이라고 봐도 무방)
 # 이 중, GameTree class는 1순위, 2순위, 동점일 경우를 계산한다.
 
-# 아쉬운 부분 : 대칭인 경우 탐색 속도가 많이 줄어드는데, 시간 계산에 적용하지 못한 점
-
-from heuristic import Heuristic
-from copy import deepcopy
+from endgameSolver import EndgameSolver
+from transpositionTable import TranspositionTable, PROVEN, EXACT, LOWER, UPPER
+from timeControl import TimeControl
 from time import time
 
-class GameTree(Heuristic):
+# rootTactics로 찾은 수의 종류별 설명과 확인한 수순의 길이 (self.ply)
+TACTIC_NAMES = {'win': '바로 이기는 수', 'doubleThreat': '상대가 모두 막을 수 없는 threat을 만드는 수', 'forced': '바로 지지 않는 유일한 수', 'lost': '어디에 두어도 지는 경우'}
+TACTIC_PLY = {'win': 1, 'doubleThreat': 3, 'forced': 2, 'lost': 2}
+
+# 제한 시간(또는 node 수)을 넘어 탐색을 중간에 멈출 때 사용하는 exception
+class SearchTimeout(Exception):
+    pass
+
+class GameTree(EndgameSolver):
+
+    # searchRoot가 구한 root의 column별 score가 모두 정확한 값인지 여부
+    # (alpha를 사용하여 탐색하는 class에서는 best column 외의 score가 bound일 수 있다)
+    exactRootScores = True
 
     # Initialization
-    def __init__(self, player, width = None, height = None, timeLimit = 120):
-        # Heuristic class에서 initialization
-        super().__init__(player, width, height)
+    def __init__(self, player, width = None, height = None, timeLimit = 120, ttMemory = 16, engine = 'minimax', timeControl = None, book = None, solverCells = 16, cache = None, tactics = True):
+        # EndgameSolver class에서 initialization
+        super().__init__(player, width, height, solverCells)
         
         # 탐색 제한 시간 설정
+        # timeControl이 없다면 한 수마다 timeLimit초를 사용한다
+        # 게임 전체 시간, increment, node 수, depth 제한은 timeControl로 설정 (timeControl.py 참고)
         self.timeLimit = timeLimit
+        self.timeControl = timeControl if (timeControl is not None) else TimeControl(moveTime = timeLimit)
+
+        # 탐색에 사용할 engine
+        # 'minimax' : MAX/MIN turn을 나누어 계산하는 miniMax 함수
+        # 'negamax' : 현재 turn의 player 입장에서 계산하는 negaMax 함수 (node마다 list를 만들거나 복사하지 않는다)
+        # 'pvs'     : negaMax 함수에서 첫 번째 child 이후는 null window로 탐색하는 Principal Variation Search
+        # 'mtdf'    : null window negaMax 탐색을 반복하여 score의 범위를 좁혀가는 MTD(f)
+        if engine not in ('minimax', 'negamax', 'pvs', 'mtdf'):
+            raise ValueError('engine은 minimax, negamax, pvs, mtdf 중 하나여야 합니다 : ' + str(engine))
+        self.engine = engine
+        self.nullWindow = engine in ('pvs', 'mtdf')
+        self.area = self.width * self.height
+
+        # PVS에서 null window 탐색이 실패하여 다시 탐색한 횟수, MTD(f)에서 null window 탐색을 한 횟수
+        self.researches = 0
+        self.mtdfPasses = 0
+
+        # board들에 대한 heuristic value들을 저장 (ttMemory MB 크기의 transposition table)
+        # 1. 1순위 heuristic value (abs(score) > 1000)와 게임이 끝난 board : depth = PROVEN으로 저장
+        # 2. 그 외의 heuristic value : depth = 탐색한 depth (depthLimit - moves)로 저장
+        # 값의 종류(EXACT, LOWER, UPPER)와 best column number도 함께 저장한다
+        # position은 좌우 대칭인 board끼리 같은 값을 갖는 canonicalKey를 사용한다
+        self.table = TranspositionTable(ttMemory, self.width * (self.height + 1))
 
-        # board들에 대한 heuristic value들을 저장
-        # 1. data[position] = 1순위, 2순위 heuristic value (abs(score) >= 1000)
-        # 2. heuData[depth][position] = 3순위 heuristic value
-        self.data = dict()
-        self.heuData = dict(dict())
+        # search 전에 먼저 찾아보는 opening book (OpeningBook object, 없으면 None)
+        self.book = book
 
-        # 탐색할 column number의 순서
-        self.colOrder = self.getColOrder()
+        # 게임의 결과가 확실한 position들을 파일에 저장하는 cache (ResultCache object, 없으면 None)
+        # search할 때 root와 root의 child position만 cache에서 찾아 사용하고, search가 끝나면 새로 확실해진 결과를 cache에 추가한다
+        self.cache = cache
 
-        # 몇 수 앞까지 search할 것인지 판단
-        # AI가 선공일 경우에는 절반의 column(width가 7일 때 3, 2, 1번 column)만 탐색하기 때문에 초기값이 더 크다 
-        self.ply = (self.player == 0) and 12 or 11
+        # 마지막 search에서 끝까지 탐색한 depth (몇 수 앞까지 탐색했는지)
+        self.ply = 0
 
-        # 현재까지 구한 score 중 가장 높은 score를 저장
-        # 1순위 heuristic value에 한한다.
-        self.maxScore = None
+        # 마지막 search에서 실제로 끝까지 탐색한 depth (search가 탐색 없이 바로 둔 경우에는 0)
+        # self.ply와 달리 iterative deepening (또는 solver)이 끝까지 마친 depth만 저장하며, Ponder가 pondering한 depth와 비교한다
+        self.searchDepth = 0
 
-        # ply가 이미 커졌거나 작아졌던 적이 있는지를 나타낸다
-        self.alreadyIncreased = False
-        self.alreadyDecreased = False
+        # 탐색을 멈춰야 하는 시간 (search 함수 밖에서는 제한 없음)
+        # 탐색 중에는 256 node마다 (약 10ms마다) checkLimits 함수로 시간을 확인하여, 이 시간이 지나면 SearchTimeout을 발생시킨다
+        self.deadline = float('inf')
+
+        # 탐색한 node의 수 (benchmark 용도)
+        # 탐색 중에 self.nodes가 self.nodeLimit을 넘으면 SearchTimeout을 발생시킨다
+        self.nodes = 0
+        self.nodeLimit = float('inf')
+
+        # search 전에 rootTactics 함수로 확실한 수를 찾을지 여부와 그 통계
+        # searches : rootTactics를 확인한 횟수, win/doubleThreat/forced/lost : 탐색 없이 바로 둔 횟수 (rootTactics 참고)
+        # pruned : 바로 지는 column을 제외하고 탐색한 횟수, prunedCols : 제외한 column의 수
+        self.tactics = tactics
+        self.tacticStats = {'searches': 0, 'win': 0, 'doubleThreat': 0, 'forced': 0, 'lost': 0, 'pruned': 0, 'prunedCols': 0}
 
         print('\nHeuristic value는 아래 기준에 의해 결정됩니다.')
         print('- 1순위 : 게임에서 확실히 이기거나 지는 경우')
@@ -72,23 +118,7 @@ class GameTree(Heuristic):
     # ex. 현재 board가 대칭이라면 width = 7 일 때 colOrder = [3, 2, 1, 0]
     # output : 탐색할 column number의 순서
     def getColOrder(self):
-        # 1. 첫 turn이고 width = 7인 경우
-        if self.moves == 0 and self.width == 7:
-            return [2, 1, 0]
-        # 2. 대칭인 경우
-        if self.symmetry():
-            #return [i for i in range(self.width // 2, -1, -1)]
-            return [3, 2, 1, 0]
-        # 2. 대칭이 아닌 경우
-        #colOrder = []
-        #col = self.width // 2
-        #sign = 1
-        #for i in range(self.width):
-        #    col += sign * i
-        #    sign *= -1
-        #    colOrder.append(col)
-        #return colOrder
-        return [3, 2, 4, 1, 5, 0, 6]
+        return list(self.candidateMoves())
     
     # 현재 turn이 max's turn인지 min's turn인지 확인
     # output : 현재 turn이 max's turn이면 True, min's turn이면 False
@@ -100,51 +130,80 @@ class GameTree(Heuristic):
     # output : 현재 상태에서 선택할 수 있는 가장 높은 score
     def miniMax(self, parentAlpha, parentBeta, depthLimit):
         ## 1. 현재 상태에서 바로 score를 return 할 수 있는 경우
-        pos = self.posCurrent()
+        self.nodes += 1
+        if not (self.nodes & 255):
+            self.checkLimits()
+        alpha, beta = parentAlpha, parentBeta
+
+        # table에는 canonicalKey를 기준으로 한 best column number를 저장하므로,
+        # 현재 board가 mirror 쪽이라면 column number를 좌우로 뒤집어서 사용한다
+        pos, posMirror = self.posCurrent(), self.posMirror()
+        mirrored = posMirror < pos
+        if mirrored:
+            pos = posMirror
         
-        # 1-1. 현재 상태에 대한 1순위 heuristic value가 self.data에 존재하는 경우
-        if pos in self.data:
-            return self.data[pos]
+        # 1-1. 현재 상태가 self.table에 존재하는 경우
+        #      depth limit 이상으로 탐색한 값이라면 값의 종류에 따라 바로 return하거나 alpha, beta를 좁힌다
+        ttMove = -1
+        slot = self.table.find(pos)
+        if slot >= 0:
+            ttMove = self.table.moves[slot] - 1
+            if mirrored and ttMove >= 0:
+                ttMove = self.width - ttMove - 1
+            if self.table.depths[slot] > depthLimit - self.moves:
+                score, flag = self.table.values[slot], self.table.flags[slot]
+                if flag == EXACT:
+                    return score
+                elif flag == LOWER and alpha < score:
+                    alpha = score
+                elif flag == UPPER and score < beta:
+                    beta = score
+                if beta <= alpha:
+                    return score
         
         # 1-2. 현재 게임이 이겼거나 진 상태로 끝이 난 경우 (1순위)
-        elif self.win():
+        if self.win():
             score = 1000 + self.width * self.height - self.moves + 1   # Heuristic class에서 구현한 score와의 우선순위 구분을 주기 위해 값에 1000을 더한다. 더 빨리 이길 수록 점수가 크다
             score *= self.maxTurn() and -1 or +1                       # 내가 이긴 경우는 양수, 상태가 이긴 경우는 음수로 score을 설정
-            self.data[pos] = score                                     # 구한 score를 self.data에 저장한다
+            self.table.store(pos, score, PROVEN)                       # 구한 score를 self.table에 저장한다
             return score
         
         # 1-3. 게임이 비긴 경우 (42턴이 넘어갔는데, 이겼거나 지지 않은 경우. 1순위)
         # Heuristic class에서 구한 score는 설령 점수가 높다 하더라도 결과적으로 게임에서 질 수도 있기 때문에 비겼을 때의 우선순위(점수)를 더 높게 책정하였다.
         elif self.moves >= self.width * self.height:
-            self.data[pos] = 1000      # 비긴 경우의 score = 1000
+            self.table.store(pos, 1000, PROVEN)     # 비긴 경우의 score = 1000
             return 1000
         
-        # 1-4. 현재 상태에 2순위 heuristic value가 self.heuData에 존재하는 경우
-        elif depthLimit in self.heuData and pos in self.heuData[depthLimit]:
-            return self.heuData[depthLimit][pos]
-        
-        # 1-5. 설정한 depth limit 값만큼 search를 한 경우 (2순위)
+        # 1-4. 설정한 depth limit 값만큼 search를 한 경우 (2순위)
         elif self.moves >= depthLimit:
             score = self.evaluate()                 # score = Heuristic class에서 나온 score
-            if depthLimit not in self.heuData:      # 구한 score를 self.heuData에 저장한다
-                self.heuData[depthLimit] = dict()
-            self.heuData[depthLimit][pos] = score
-            return self.evaluate()
+            self.table.store(pos, score, 0)         # 구한 score를 self.table에 저장한다
+            return score
+
+        # 1-5. 현재 turn에 바로 이길 수 있는 경우 (1순위)
+        maxTurn = self.maxTurn()
+        if self.winningCells(self.mask - self.posOX) & self.playableCells():
+            score = 1000 + self.area - self.moves
+            return score if maxTurn else -score
+
+        # 1-6. 지지 않는 수(Board.nonLosingCells)가 없다면 상대가 다음 turn에 이긴다 (1순위)
+        cells = self.nonLosingCells()
+        if not cells:
+            score = 1000 + self.area - self.moves - 1
+            return -score if maxTurn else score
         
 
         ## 2. Mini-Max algorithm과 Alpha-Beta pruning을 이용하여 탐색
 
-        # 2-1. 탐색할 column number의 순서를 설정
-        self.colOrder = self.getColOrder()
-        for col in deepcopy(self.colOrder):
-            if not self.possible(col):
-                self.colOrder.remove(col)
+        # 2-1. 탐색할 column number의 순서를 설정 (MoveOrder class)
+        #      지지 않는 수들만 self.table에 저장된 best column, 막는 수, killer move, threat 수, history 순서로 탐색한다
+        colOrder = self.orderMoves(ttMove, cells)
 
-        alpha, beta = parentAlpha, parentBeta
-        score = None
+        alphaInit, betaInit = alpha, beta
+        score, bestCol = None, -1
 
         # 2-2. child node를 탐색하여 score 계산
-        for col in self.colOrder:
+        for col in colOrder:
             # child node의 score 계산
             self.put(col)
             childScore = self.miniMax(alpha, beta, depthLimit)
@@ -152,190 +211,506 @@ class GameTree(Heuristic):
 
             # child score와 현재까지 구한 score 비교
             # MAX turn
-            if (self.maxTurn()) and (score is None or score < childScore):
-                score = childScore
+            if (maxTurn) and (score is None or score < childScore):
+                score, bestCol = childScore, col
                 if beta <= score:
-                    return score        # pruning!
+                    self.cutoff(col, depthLimit - self.moves, col == colOrder[0])
+                    break               # pruning!
                 elif alpha < score:
                     alpha = score       # alpha값 설정
             # MIN turn
-            elif (not self.maxTurn()) and (score is None or childScore < score):
-                score = childScore
+            elif (not maxTurn) and (score is None or childScore < score):
+                score, bestCol = childScore, col
                 if score <= alpha:
-                    return score        # pruning!
+                    self.cutoff(col, depthLimit - self.moves, col == colOrder[0])
+                    break               # pruning!
                 elif score < beta:
                     beta = score      
         
+        # 2-3. 구한 score의 종류를 판단
+        # pruning이 일어났거나 모든 child가 window 밖의 값이라면 정확한 값이 아닌 범위(bound)만 알 수 있다
+        if score <= alphaInit:
+            flag = UPPER        # 실제 값 <= score
+        elif score >= betaInit:
+            flag = LOWER        # 실제 값 >= score
+        else:
+            flag = EXACT
+
+        if mirrored:
+            bestCol = self.width - bestCol - 1
+
         # 1순위 heuristic value를 저장
-        if abs(score) >= 1000:
-            self.data[pos] = score
-        # 2순위 heuristic value를 저장
+        if abs(score) > 1000:
+            self.table.store(pos, score, PROVEN, flag, bestCol)
+        # 2순위, 3순위 heuristic value를 저장
         else:
-            if depthLimit not in self.heuData:
-                self.heuData[depthLimit] = dict()
-            self.heuData[depthLimit][pos] = score
+            self.table.store(pos, score, depthLimit - self.moves, flag, bestCol)
 
         return score
 
-    # miniMax 함수를 통해 구한 score를 이용하여 다음에 둘 column nuber를 정한다
-    # 이때, 제한 시간 내에 탐색을 마쳐야 하므로, 각각의 node를 탐색한 시간을 통해 ply값을 증가시킬지, 감소시킬지, 그대로 유지할지를 정한다
-    # input : 초기 시간
+    # Negamax algorithm을 이용하여 최적의 score를 계산
+    # miniMax 함수와 같은 값을 계산하지만, 항상 현재 turn의 player 입장에서의 score를 다룬다
+    # (AI turn이면 miniMax의 score 그대로, Human turn이면 -score)
+    # 따라서 MAX/MIN turn을 나누지 않고, child의 score에 -를 붙여 비교한다
+    # 또한 node마다 list를 새로 만들거나 복사하지 않는다 (MoveOrder class의 buffer를 사용)
+    # self.table에는 miniMax 함수와 같은 기준(AI 입장)의 score를 저장하므로 두 engine이 table을 함께 쓸 수 있다
+    # input : alpha-beta pruning을 위한 alpha, beta값 (현재 turn 기준), partial tree를 위한 depth limit
+    # output : 현재 turn의 player 입장에서 선택할 수 있는 가장 높은 score
+    def negaMax(self, alpha, beta, depthLimit):
+        self.nodes += 1
+        if not (self.nodes & 255):
+            self.checkLimits()
+        moves = self.moves
+        sign = 1 if (moves % 2 == self.player) else -1     # AI turn이면 1, Human turn이면 -1
+
+        ## 1. 현재 상태에서 바로 score를 return 할 수 있는 경우
+        # 1-1. 직전에 둔 상대가 이긴 경우 (1순위)
+        if self.win():
+            return -(1000 + self.area - moves + 1)
+
+        # 1-2. 게임이 비긴 경우 (1순위, AI 입장에서 1000)
+        if moves >= self.area:
+            return 1000 * sign
+
+        # 1-3. 현재 상태가 self.table에 존재하는 경우
+        pos = self.posCurrent()
+        posMirror = self.posMirror()
+        mirrored = posMirror < pos
+        if mirrored:
+            pos = posMirror
+
+        ttMove = -1
+        slot = self.table.find(pos)
+        if slot >= 0:
+            ttMove = self.table.moves[slot] - 1
+            if mirrored and ttMove >= 0:
+                ttMove = self.width - ttMove - 1
+            if self.table.depths[slot] > depthLimit - moves:
+                score = self.table.values[slot] * sign
+                flag = self.table.flags[slot]
+                if flag == EXACT:
+                    return score
+                # AI 입장의 lower bound는 Human 입장에서는 upper bound이다
+                if (flag == LOWER) == (sign > 0):
+                    if alpha < score:
+                        alpha = score
+                elif score < beta:
+                    beta = score
+                if beta <= alpha:
+                    return score
+
+        # 1-4. 설정한 depth limit 값만큼 search를 한 경우 (2순위)
+        if moves >= depthLimit:
+            score = self.evaluate()
+            self.table.store(pos, score, 0)
+            return score * sign
+
+        # 1-5. 현재 turn에 바로 이길 수 있는 경우 (child node의 1-1)
+        #      (self.mask + self.bottom)은 각 column에서 다음에 stone이 놓일 칸이다
+        if self.winningCells(self.mask - self.posOX) & self.playableCells():
+            return 1000 + self.area - moves
+
+        # 1-6. 지지 않는 수(Board.nonLosingCells)가 없다면 상대가 다음 turn에 이긴다
+        cells = self.nonLosingCells()
+        if not cells:
+            return -(1000 + self.area - moves - 1)
+
+        ## 2. Alpha-Beta pruning을 이용하여 지지 않는 수들만 탐색
+        alphaInit = alpha
+        count = self.fillMoves(ttMove, cells)
+        moveBuffer = self.moveBuffer[moves]
+        score, bestCol = -100000, -1
+
+        i = 0
+        while i < count:
+            col = moveBuffer[i]
+            self.put(col)
+            # PVS : 첫 번째 child가 가장 좋은 수라고 가정하고, 나머지 child는 null window (alpha, alpha + 1)로
+            #       그 수보다 좋은지만 확인한다. 더 좋다면 원래 window로 다시 탐색한다
+            if i == 0 or not self.nullWindow:
+                childScore = -self.negaMax(-beta, -alpha, depthLimit)
+            else:
+                childScore = -self.negaMax(-alpha - 1, -alpha, depthLimit)
+                if alpha < childScore < beta:
+                    self.researches += 1
+                    childScore = -self.negaMax(-beta, -alpha, depthLimit)
+            self.undo()
+
+            if childScore > score:
+                score, bestCol = childScore, col
+                if score >= beta:
+                    self.cutoff(col, depthLimit - moves, i == 0)
+                    break               # pruning!
+                if score > alpha:
+                    alpha = score
+            i += 1
+
+        ## 3. score를 AI 입장으로 바꾸어 self.table에 저장
+        if score <= alphaInit:
+            flag = UPPER if (sign > 0) else LOWER
+        elif score >= beta:
+            flag = LOWER if (sign > 0) else UPPER
+        else:
+            flag = EXACT
+
+        if mirrored:
+            bestCol = self.width - bestCol - 1
+
+        self.table.store(pos, score * sign, PROVEN if (abs(score) > 1000) else (depthLimit - moves), flag, bestCol)
+        return score
+
+    # MTD(f) algorithm을 이용하여 score를 계산
+    # score의 범위 [lower, upper]를 null window 탐색으로 좁혀가다가 lower == upper가 되면 그 값이 정확한 score이다
+    # connect four의 score는 정수이고 범위가 좁기 때문에 적은 횟수의 탐색으로 값을 구할 수 있다
+    # 탐색한 값들은 self.table에 bound로 저장되므로 반복해서 탐색하더라도 대부분은 table에서 바로 찾는다
+    # input : alpha, beta값, depth limit (현재 turn 기준)
+    # output : 현재 turn의 player 입장에서의 score (alpha 이하 또는 beta 이상이라면 그 bound)
+    def mtdf(self, alpha, beta, depthLimit):
+        # 1. 첫 추측값 : self.table에 저장된 값이 있다면 그 값, 없다면 0
+        score = 0
+        slot = self.table.find(self.canonicalKey())
+        if slot >= 0:
+            score = self.table.values[slot] * (1 if self.maxTurn() else -1)
+
+        # 2. score가 속한 범위를 좁혀간다
+        lower, upper = -100000, 100000
+        while lower < upper and lower < beta and alpha < upper:
+            window = score + 1 if (score == lower) else score
+            self.mtdfPasses += 1
+            score = self.negaMax(window - 1, window, depthLimit)
+            if score < window:
+                upper = score
+            else:
+                lower = score
+        return score
+
+    # 선택한 engine으로 현재 상태의 score를 계산한다
+    # input : alpha, beta값, depth limit (모두 AI 입장)
+    # output : AI 입장에서의 score (miniMax 함수와 같은 기준)
+    def searchScore(self, alpha, beta, depthLimit):
+        if self.engine == 'minimax':
+            return self.miniMax(alpha, beta, depthLimit)
+        search = self.mtdf if (self.engine == 'mtdf') else self.negaMax
+        if self.maxTurn():
+            return search(alpha, beta, depthLimit)
+        return -search(-beta, -alpha, depthLimit)
+
+    # 현재 상태에 대해 self.table에 저장된 best column number
+    # output : best column number, 없거나 둘 수 없는 column이면 -1
+    def tableMove(self):
+        pos, posMirror = self.posCurrent(), self.posMirror()
+        slot = self.table.find(posMirror if (posMirror < pos) else pos)
+        if slot < 0 or self.table.moves[slot] == 0:
+            return -1
+        col = self.table.moves[slot] - 1
+        if posMirror < pos:
+            col = self.width - col - 1
+        return col if self.possible(col) else -1
+
+    # self.table에 저장된 best column들을 따라가며 principal variation(양쪽이 최선으로 둘 때의 수순)을 구한다
+    # input : 구할 수순의 최대 길이
+    # output : column number의 list
+    def principalVariation(self, maxLength = 20):
+        pv = []
+        while len(pv) < maxLength and not self.win():
+            col = self.tableMove()
+            if col < 0:
+                break
+            self.put(col)
+            pv.append(col)
+        for _ in pv:
+            self.undo()
+        return pv
+
+    # Iterative deepening을 이용하여 다음에 둘 column number를 정한다
+    # depth를 1, 2, 3, ... 으로 늘려가며 root의 모든 column을 탐색하고, 제한 시간이 지나면 탐색 중이더라도 바로 멈춘다
+    # 이전 depth의 결과는 다음 depth에서 다음과 같이 사용된다
+    # - self.table에 저장된 값, bound와 best column (principal variation 포함)
+    # - root의 column은 이전 depth에서 score가 높았던 순서로 탐색
+    # 따라서 항상 마지막으로 끝까지 탐색한 depth의 best column을 return할 수 있다
+    # 사용할 시간, node 수, depth는 self.timeControl이 정하고, 탐색이 끝나면 사용한 시간을 self.timeControl에 알린다
+    # input : 초기 시간, 최대 depth (None이면 남은 칸 수까지)
     # output : 선택할 column number
-    def search(self, initTime):
-        # 1. 만약 찾고자 하는 depth의 값이 이미 데이터 상에 존재한다면 다음 한 단계 아래의 depth를 탐색한다.
-        #    이때, 만약 현재 상황이 기존에 탐색하다 시간이 오래 걸려 depth를 낮춰서 탐색하게 된 경우라면 그대로 진행한다.
-        if not self.alreadyDecreased and self.ply + self.moves in self.heuData:
-            self.ply += 1
-            self.alreadyIncreased += 1
-            return self.search(initTime)
-
-        # 2. 탐색할 column number의 순서를 설정
-        possibleColLength = 7       # 현재 둘 수 있는 column의 수
-        sym = self.symmetry()       # 현재 상태가 대칭 상황인지 확인
-
-        if self.moves == 0 and self.width == 7:
-            print('\nboard가 대칭입니다.')
-            colOrder = [2, 1, 0]
-        elif sym:
+    def search(self, initTime, maxDepth = None):
+        self.searchDepth = 0
+
+        ## 0. opening book에 있는 position이라면 탐색하지 않고 바로 둔다
+        if self.book is not None:
+            entry = self.book.lookup(self)
+            if entry is not None:
+                score, col = entry
+                print('\nopening book : ' + str(col + 1) + '열 (score ' + str(score) + ', ' + str(self.book.depth) + '수 앞까지 탐색한 결과)')
+                self.timeControl.update(time() - initTime)
+                return col
+
+        ## 0-1. result cache에 best column까지 저장된 position이라면 탐색하지 않고 바로 둔다
+        #      아니라면 root의 child 중 cache에 결과가 있는 position을 self.table에 넣어 둔다
+        if self.cache is not None:
+            pos, posMirror = self.posCurrent(), self.posMirror()
+            entry = self.cache.get(min(pos, posMirror))
+            if entry is not None and entry[1] >= 0:
+                score, col = entry
+                col = (self.width - col - 1) if (posMirror < pos) else col
+                score = 1000 if (score == 0) else score * (1 if (self.player == 0) else -1)
+                print('\nresult cache : ' + str(col + 1) + '열 (score ' + str(score) + ')')
+                self.timeControl.update(time() - initTime)
+                return col
+            self.probeCache()
+
+        ## 0-2. 탐색하지 않아도 결과가 확실한 수가 있다면 바로 두고, 바로 지는 column은 탐색할 column에서 제외한다
+        safeCols = None
+        if self.tactics:
+            col, score, kind, safeCols = self.rootTactics()
+            if col >= 0:
+                print('\ntactics : ' + str(col + 1) + '열 (' + TACTIC_NAMES[kind] + ')')
+                if score is not None:
+                    pos, posMirror = self.posCurrent(), self.posMirror()
+                    self.table.store(min(pos, posMirror), score, PROVEN, EXACT, (self.width - col - 1) if (posMirror < pos) else col)
+                self.ply = TACTIC_PLY[kind]
+                self.timeControl.update(time() - initTime)
+                return col
+
+        ## 1. 탐색 설정
+        # soft limit이 지나면 새로운 depth를 탐색하지 않고, hard limit(self.deadline)이 지나면 바로 멈춘다
+        softLimit, hardLimit = self.timeControl.allocate(self)
+        softDeadline = initTime + softLimit
+        self.deadline = initTime + hardLimit
+        if self.timeControl.nodes is not None:
+            self.nodeLimit = self.nodes + self.timeControl.nodes
+        rootMoves = self.moves
+        remaining = self.area - self.moves
+        maxDepth = remaining if (maxDepth is None) else min(maxDepth, remaining)
+        if self.timeControl.depth is not None:
+            maxDepth = min(maxDepth, self.timeControl.depth)
+
+        # 1-0. 남은 칸이 적다면 EndgameSolver로 게임의 결과를 정확히 계산한다
+        #      hard limit의 절반이 지나도 끝나지 않으면, 남은 시간 동안 iterative deepening으로 탐색한다
+        if remaining <= self.solverCells:
+            self.deadline = initTime + hardLimit / 2
+            try:
+                return self.solveRoot(initTime)
+            except SearchTimeout:
+                while self.moves > rootMoves:
+                    self.undo()
+                print('\nsolver가 제한 시간 안에 끝나지 않아 iterative deepening으로 탐색합니다.')
+            self.deadline = initTime + hardLimit
+
+        # 1-1. 탐색할 column number의 순서 (첫 turn, 대칭인 경우 고려)
+        sym = self.symmetry()
+        if sym:
             print('\nboard가 대칭입니다.')
-            colOrder = []
-            #for col in deepcopy(self.getColOrder()):
-            for col in [3, 2, 1, 0]:
-                if self.possible(col):
-                    colOrder.append(col)
-                #elif self.width % 2 == 1 and col == self.width // 2:
-                elif col == 3:
-                    possibleColLength -= 1
-                else:
-                    possibleColLength -= 2
-        else:
-            colOrder = []
-            #for col in deepcopy(self.getColOrder()):
-            for col in [3, 2, 4, 1, 5, 0, 6]:
-                if self.possible(col):
-                    colOrder.append(col)
-                else:
-                    possibleColLength -= 1
-
-        # 3. 탐색하여 score를 구하고, ply를 조정
-        print('\n' + str(self.ply if (self.ply + self.moves <= self.width * self.height) else (self.width * self.height - self.moves)) + '수 앞을 계산중...')
-        
-        score, bestCol = None, None     # 가장 높은 점수와 return할 column number
-        colSearchTime = []              # column마다 탐색하는데 걸린 시간을 저장하는 list
-        heuristicChanged = 0            # 탐색 중간에 ply를 바꾼 경우, 다음 turn의 탐색시 ply값을 조정하기 위해 사용
+        baseOrder = [col for col in self.getColOrder() if self.possible(col) and (safeCols is None or col in safeCols)]
+        colOrder = list(baseOrder)
+        ttMove = self.tableMove()
+        if ttMove in colOrder:
+            colOrder.remove(ttMove)
+            colOrder.insert(0, ttMove)
 
-        for col in colOrder:
-            # 1. miniMax 함수를 이용하여 child score를 계산
+        bestCol = colOrder[0]       # 한 depth도 끝까지 탐색하지 못한 경우 return할 column
+        scores, colSearchTime = dict(), dict()
+
+        ## 2. depth를 1씩 늘려가며 탐색
+        try:
+            for depth in range(1, maxDepth + 1):
+                iterationStart = time()
+                depthScores, depthTime = self.searchRoot(colOrder, depth)
+
+                # 2-1. depth를 끝까지 탐색한 경우에만 결과를 사용한다
+                scores, colSearchTime = depthScores, depthTime
+                self.ply = self.searchDepth = depth
+                bestCol = self.bestColumn(baseOrder, scores)
+                print(str(depth) + '수 앞 : ' + str(bestCol + 1) + '열 (score ' + str(scores[bestCol]) + ', ' + str(round(time() - initTime, 3)) + '초)')
+
+                # 2-2. root의 best column을 self.table에 저장하고, 다음 depth는 score가 높은 column부터 탐색
+                pos, posMirror = self.posCurrent(), self.posMirror()
+                self.table.store(min(pos, posMirror), scores[bestCol], depth, EXACT, (self.width - bestCol - 1) if (posMirror < pos) else bestCol)
+                colOrder.sort(key = lambda col: (col != bestCol, -scores[col]))
+
+                # 2-3. 탐색을 멈추는 경우
+                # - 바로 이기는 수를 찾았거나, 모든 column의 결과가 확실한 경우 (1순위)
+                # - 다음 depth는 보통 지금까지 걸린 시간보다 오래 걸리므로, 남은 시간이 부족한 경우
+                if scores[bestCol] > 1000 or all(abs(score) > 1000 for score in scores.values()):
+                    break
+                if time() + 2 * (time() - iterationStart) > softDeadline:
+                    break
+
+        # 3. 제한 시간이 지나 탐색을 멈춘 경우, board를 탐색 전의 상태로 되돌린다
+        except SearchTimeout:
+            while self.moves > rootMoves:
+                self.undo()
+        self.deadline = float('inf')
+        self.nodeLimit = float('inf')
+        self.timeControl.update(time() - initTime)
+
+        ## 4. 마지막으로 끝까지 탐색한 depth의 결과를 출력
+        print()
+        for col in baseOrder:
+            if col in scores:
+                self.printHeuristic(col, scores[col], colSearchTime[col])
+                if sym and col != self.width - col - 1:
+                    self.printHeuristic(self.width - col - 1, scores[col], 0)
+        print('principal variation : ' + ' '.join(str(col + 1) for col in self.principalVariation()))
+        print()
+
+        ## 5. 결과가 확실해진 position을 cache에 저장하고, 최적의 column number를 return
+        if scores:
+            self.rememberResults(scores, bestCol, False)
+        return bestCol
+
+    # EndgameSolver를 이용하여 root의 모든 column의 score를 정확히 계산하고 best column을 고른다
+    # input : 초기 시간
+    # output : 선택할 column number
+    def solveRoot(self, initTime):
+        baseOrder = [col for col in self.getColOrder() if self.possible(col)]
+        scores, colSearchTime = dict(), dict()
+        for col in baseOrder:
             startTime = time()
             self.put(col)
-            childScore = self.miniMax(-10000, 10000, self.ply + self.moves - 1)
+            if self.win():
+                scores[col] = 1000 + self.area - self.moves + 1
+            else:
+                scores[col] = -self.solve()         # Human 입장의 score를 AI 입장으로 바꾼다
             self.undo()
+            colSearchTime[col] = time() - startTime
 
-            # 2. 탐색 시간을 이용하여 변수 값들 설정
-            # - initTime : play.py에서 search 함수를 부른 시간 (가장 초기 시간)
-            # - startTime : 현재 column 탐색을 시작한 시간
-            # - endTime : 현재 column 탐색이 끝난 시간
-            # - initFunctionCallTime : search 함수를 부른 이후 현재까지 걸린 시간
-            # - avgColSearchSpeed : column을 탐색하는데 걸린 평균 시간
-            # - maxColSearchSpeed : column을 탐색하는데 걸린 최대 시간
-            endTime = time()
-            initFunctionCallTime = endTime - initTime 
-            if None in colSearchTime:
-                colSearchTime = [(endTime - startTime) for _ in range(len(colSearchTime))]
-            colSearchTime.append(endTime - startTime)
-            avgColSearchSpeed = sum(colSearchTime) / len(colSearchTime)
-            maxColSearchSpeed = max(colSearchTime)
-                
-            # 3. 탐색을 통해 구한 정보를 출력
-            self.printHeuristic(col, childScore, colSearchTime[-1])
-            if sym:
-                self.printHeuristic(self.width - col - 1, childScore, 0)
-            # 3-1. 만약 바로 이기는 경우에는 더이상의 탐색을 하지 않고 해당 column을 return
-            if childScore > 1000 and (self.maxScore is None or self.maxScore < childScore):
-                self.maxScore = childScore
-                maxPly = (self.width * self.height - (childScore - 1000) + 1) - self.moves
-                self.ply = maxPly if (self.ply >= maxPly) else self.ply
-                return col
-            
-            # 4. 탐색하는데 걸린 시간을 계산하여 ply를 조정
-            # 기본적으로 탐색한 시간을 통해 ply를 -2 ~ +2 만큼 조정하는데,
-            # 만약 이미 ply가 줄어들었는데 다시 올리려는 경우는 제외한다
-            # 또한, ply가 짝수일 때는 상대방이 공격한 이후 나온 값들을 이용하여 계산하기 때문에 비교적 score가 낮고,
-            #      ply가 홀수일 때는 내가 공격한 이후 나온 값들을 이용하여 계산하기 때문에 비교적 score가 높게 나오므로
-            #      첫 turn 이후 ply를 조정해야 하는 경우에는 ply를 -2 또는 +2 한다
-            # search 함수를 다시 부르지 않고 탐색 시간을 조정하는 경우에는 다음 탐색 때 탐색 시간 설정을 다시 하기 위해 colSearchTime을 None으로 채운다
-
-            # 4-1. 첫 탐색 때 걸린 시간을 이용하여 계산
-            #      ply를 +2, +1, -1 하는 경우에는 search 함수를 다시 불러서 계산하고,
-            #      ply를 -2 하거나 변동이 없는 경우에는 현재 상태에서 그대로 계산한다
-            if col == colOrder[0] and self.maxScore is None and self.ply + self.moves < self.width * self.height:
-                if not self.alreadyDecreased and not childScore <= -1000 and not (self.alreadyIncreased and self.moves < 20) and initFunctionCallTime + len(colOrder) * pow(possibleColLength, 2) * colSearchTime[0] < self.timeLimit * 0.95:
-                    self.ply += 2
-                    self.alreadyIncreased = True
-                    return self.search(initTime)
-                elif not self.alreadyDecreased and not childScore <= -1000 and not (self.alreadyIncreased and self.moves < 20) and initFunctionCallTime + len(colOrder) * possibleColLength * colSearchTime[0] < self.timeLimit * 0.95:
-                    self.ply += 1
-                    self.alreadyIncreased = True
-                    return self.search(initTime)
-                elif initFunctionCallTime + (len(colOrder) - 1) * colSearchTime[0] < self.timeLimit:
-                    pass
-                elif initFunctionCallTime + len(colOrder) * colSearchTime[0] / possibleColLength < self.timeLimit:
-                    self.ply -= 1
-                    self.alreadyDecreased = True
-                    return self.search(initTime)
-                else:
-                    self.ply -= 2
-                    self.alreadyDecreased = True
-                    colSearchTime = [None for _ in range(len(colSearchTime))]
-                    print(str(self.ply if (self.ply + self.moves <= self.width * self.height) else (self.width * self.height - self.moves)) + '수 앞을 계산중...')
-            
-            # 4-2. 첫 탐색 이후에 걸린 시간을 이용하여 계산
-            #      탐색 시간이 빠른 경우에는 다음 탐색부터는 ply에 +2하여 탐색한다
-            #      단, 시간이 제한 내에 탐색하는 것이 중요하므로 2/3 이상 탐색한 경우에는 적용하지 않는다
-            #      탐색 시간이 느린 경우에는 ply에 -2를 하여 탐색한다
-            elif col != colOrder[0] and self.maxScore is None:
-                if not self.alreadyDecreased and len(colSearchTime) <= len(colOrder) * (2/3) and self.ply + self.moves < self.width * self.height and len(colSearchTime) < len(colOrder) and initFunctionCallTime + (len(colOrder) - len(colSearchTime)) * (avgColSearchSpeed * pow(possibleColLength, 2)) < self.timeLimit * 0.95:
-                    self.ply += 2
-                    self.alreadyIncreased = True
-                    colSearchTime = [None for _ in range(len(colSearchTime))]
-                    heuristicChanged += 1
-                    print(str(self.ply if (self.ply + self.moves <= self.width * self.height) else (self.width * self.height - self.moves)) + '수 앞을 계산중...')
-                elif len(colSearchTime) < len(colOrder) and initFunctionCallTime + maxColSearchSpeed + (len(colOrder) - len(colSearchTime) - 1) * (maxColSearchSpeed / possibleColLength) > self.timeLimit * 0.95:
-                    self.ply -= 2
-                    colSearchTime = [None for _ in range(len(colSearchTime))]
-                    heuristicChanged -= 1
-                    print(str(self.ply if (self.ply + self.moves <= self.width * self.height) else (self.width * self.height - self.moves)) + '수 앞을 계산중...')
-            
-            # 5. child score와 현재 score를 비교
-            # 만약 child score와 현재 score가 같다면 해당 column의 높이를 통해 결정(3순위)
-            # 높이도 같다면 먼저 탐색한 순서대로 결정(4순위)
-            if score is None or childScore > score:
-                score, bestCol = childScore, col
-            elif childScore == score and self.getRow(col) > self.getRow(bestCol):
-                bestCol = col
+        bestCol = self.bestColumn(baseOrder, scores)
+        pos, posMirror = self.posCurrent(), self.posMirror()
+        self.table.store(min(pos, posMirror), scores[bestCol], PROVEN, EXACT, (self.width - bestCol - 1) if (posMirror < pos) else bestCol)
+        self.ply = self.searchDepth = self.area - self.moves
+        self.deadline = float('inf')
+        self.nodeLimit = float('inf')
+        self.timeControl.update(time() - initTime)
+
+        print('\nsolver : 남은 ' + str(self.area - self.moves) + '칸을 끝까지 탐색했습니다. (' + str(round(time() - initTime, 3)) + '초)')
+        for col in baseOrder:
+            self.printHeuristic(col, scores[col], colSearchTime[col])
+        print('principal variation : ' + ' '.join(str(col + 1) for col in self.principalVariation()))
         print()
+        self.rememberResults(scores, bestCol, True)
+        return bestCol
 
-        # 4. 다음 turn에 탐색할 ply를 조정
-        # 4-1. moves = 0 일때는 3개의 column만 탐색하기 때문에 초기값을 높게 설정하였으므로 그 값이 중간에 줄어들지 않았다면 1만큼 낮춰준다
-        #if self.width == 7 and self.moves == 0 and self.ply > 11:
-        if self.moves == 0 and self.ply > 11:
-            self.ply -= 1
-        # 4-2. 탐색 중간에 ply값이 바뀐 경우에는 초기값과 바뀐 값의 중간값으로 ply를 조정한다
-        elif self.moves > 0:
-            self.ply -= heuristicChanged
-        
-        # 5. 필요 없어진 heuData값을 메모리에서 지운다
-        for key in range(self.moves + self.ply):
-            if key in self.heuData:
-                self.heuData[key].clear()
+    # root의 child position들 중 self.cache에 결과가 있는 것을 self.table에 depth = PROVEN으로 넣는다
+    # cache 전체가 아니라 이번 search의 root에서 필요한 position만 canonicalKey로 찾는다
+    def probeCache(self):
+        sign = 1 if (self.player == 0) else -1      # 선공 입장의 score -> AI 입장의 score
+        for col in range(self.width):
+            if not self.possible(col):
+                continue
+            self.put(col)
+            key = self.canonicalKey()
+            entry = self.cache.get(key)
+            if entry is not None:
+                score, bestCol = entry
+                self.table.store(key, 1000 if (score == 0) else score * sign, PROVEN, EXACT, bestCol)
+            self.undo()
+
+    # root의 column별 score 중 결과가 확실한 것들을 self.cache에 저장한다
+    # - abs(score) > 1000인 score는 항상 확실하다 (1순위)
+    # - 비기는 score(1000)는 solver로 구한 경우에만 확실하다 (iterative deepening에서는 더 깊이 탐색하면 이길 수도 있다)
+    # - root는 best column이 이기는 수이거나 모든 column의 결과가 확실할 때만 best column과 함께 저장한다
+    # - root의 child는 score만 저장한다 (table의 best column이 cutoff를 일으킨 수일 수도 있기 때문)
+    # input : column별 score의 dict (AI 입장), 선택한 column number, solver로 구한 score인지 여부
+    def rememberResults(self, scores, bestCol, solved):
+        if self.cache is None:
+            return
+        sign = 1 if (self.player == 0) else -1      # AI 입장의 score -> 선공 입장의 score
+        proven = lambda score: abs(score) > 1000 or (solved and score == 1000)
+
+        if self.exactRootScores:
+            for col, score in scores.items():
+                if proven(score):
+                    self.put(col)
+                    self.cache.add(self.canonicalKey(), 0 if (score == 1000) else score * sign)
+                    self.undo()
+
+        if scores[bestCol] > 1000 or all(proven(score) for score in scores.values()):
+            pos, posMirror = self.posCurrent(), self.posMirror()
+            score = scores[bestCol]
+            self.cache.add(min(pos, posMirror), 0 if (score == 1000) else score * sign, (self.width - bestCol - 1) if (posMirror < pos) else bestCol)
+        self.cache.flush()
 
-        # 6. 기타 값 초기화
-        self.alreadyIncreased = False
-        self.alreadyDecreased = False
+    # 탐색 전에 bit 연산(Board.winningCells, Board.nonLosingCells)만으로 root에서 둘 수를 확인한다 (Rule class의 rule1~rule4와 같은 방법)
+    # 1. 'win'          : 바로 이기는 수가 있다면 그 column (rule1)
+    # 2. 'lost'         : 상대가 이길 수 있는 칸이 2개 이상이라 어디에 두어도 진다면, 상대가 이길 수 있는 칸 중 하나를 막는다
+    # 3. 'forced'       : 바로 지지 않는 column이 하나뿐이라면 그 column (상대의 수를 막는 rule2 또는 나머지 column이 모두 rule3에 해당하는 경우)
+    # 4. 'doubleThreat' : 두었을 때 이길 수 있는 칸이 2개 이상 열리거나, 위아래로 겹쳐 상대가 막을 수 없는 column (rule4)
+    #                     상대가 바로 이길 수 없는 column만 확인하므로, 3수 안에 반드시 이긴다
+    # 그 외에는 바로 지지 않는 column들만 탐색하도록 넘겨준다 (rule2, rule3에 의해 지는 column 제외)
+    # rule5(상대의 double threat을 막는 수)는 다른 column으로도 막을 수 있는 경우가 있어 확실하지 않으므로 사용하지 않는다
+    # output : (둘 column number (없으면 -1), 그 column의 score (모르면 None), 종류, 탐색할 column number의 set (제외하지 않으면 None))
+    def rootTactics(self):
+        stats = self.tacticStats
+        stats['searches'] += 1
+        order = [col for col in self.candidateMoves() if self.possible(col)]
+        colMask = (1 << self.height) - 1
+        playable = self.playableCells()
+        posMove = self.mask - self.posOX
 
-        # 7. 최적의 column number를 return
+        # 1. 바로 이기는 수
+        wins = self.winningCells(posMove) & playable
+        for col in order:
+            if wins & (colMask << self.colShift[col]):
+                stats['win'] += 1
+                return col, 1000 + self.area - self.moves, 'win', None
+
+        # 2. 바로 지지 않는 column이 없는 경우
+        cells = self.nonLosingCells()
+        if cells == 0:
+            threats = (self.winningCells(self.posOX) & playable) or playable
+            col = self.cellColumn(threats & -threats)
+            stats['lost'] += 1
+            return col, -(1000 + self.area - self.moves - 1), 'lost', None
+
+        # 3. 바로 지지 않는 column이 하나뿐인 경우
+        safeCols = [col for col in order if cells & (colMask << self.colShift[col])]
+        if len(safeCols) == 1:
+            stats['forced'] += 1
+            return safeCols[0], None, 'forced', None
+
+        # 4. 두었을 때 상대가 모두 막을 수 없는 threat이 생기는 column
+        for col in safeCols:
+            cell = cells & (colMask << self.colShift[col])
+            threats = self.winningCells(posMove | cell)
+            openCells = threats & ((playable ^ cell) | ((cell << 1) & self.boardMask))
+            if (openCells & (openCells - 1)) or (openCells & (threats >> 1)):
+                stats['doubleThreat'] += 1
+                return col, 1000 + self.area - self.moves - 2, 'doubleThreat', None
+
+        if len(safeCols) < len(order):
+            stats['pruned'] += 1
+            stats['prunedCols'] += len(order) - len(safeCols)
+        return -1, None, None, set(safeCols)
+
+    # root의 column들을 정해진 depth까지 탐색한다 (search 함수의 한 depth)
+    # input : 탐색할 column number의 순서, 탐색할 depth
+    # output : column별 score의 dict, column별 탐색하는데 걸린 시간의 dict
+    def searchRoot(self, colOrder, depth):
+        depthScores, depthTime = dict(), dict()
+        for col in colOrder:
+            startTime = time()
+            self.put(col)
+            depthScores[col] = self.searchScore(-10000, 10000, self.moves - 1 + depth)
+            self.undo()
+            depthTime[col] = time() - startTime
+        return depthScores, depthTime
+
+    # root의 column별 score 중 가장 높은 column을 고른다
+    # child score가 같다면 해당 column의 높이를 통해 결정(3순위)
+    # 높이도 같다면 기본 순서(가운데 column부터)대로 결정(4순위)
+    # input : 기본 순서대로의 column number list, column별 score의 dict
+    # output : 선택할 column number
+    def bestColumn(self, baseOrder, scores):
+        bestCol = baseOrder[0]
+        for col in baseOrder:
+            if scores[col] > scores[bestCol] or (scores[col] == scores[bestCol] and self.getRow(col) > self.getRow(bestCol)):
+                bestCol = col
         return bestCol
 
+    # 탐색 중 256 node마다 불려 제한 시간과 node 수를 넘었는지 확인한다
+    def checkLimits(self):
+        if time() > self.deadline or self.nodes > self.nodeLimit:
+            raise SearchTimeout
+
     # 현재 상태에서 입력받은 column에 stone을 놓았을 때의 heuristic value와 탐색하는데 걸린 시간을 출력
     # input : 탐색한 column number, 탐색 결과 나온 score, 탐색하는데 걸린 시간
     def printHeuristic(self, col, score, searchTime):
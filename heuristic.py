@@ -18,8 +18,52 @@
 # 2. X가 2개 : AI가 선공이면 15점, 후공이면 16점 (XX.. X.X. X..X .XX. .X.X ..XX)
 # 3. X가 3개 : AI가 선공이면 32점, 후공이면 35점 (XXX. XX.X X.XX .XXX)
 
-from board import Board
-from itertools import combinations
+## 점진적(incremental) 계산
+# evaluate 함수가 매번 board 전체의 window(4칸)를 다시 확인하지 않도록, heuristic value를 put/undo에서 갱신한다
+# 1. 각 window의 상태를 (AI stone 수) * 5 + (Human stone 수)로 저장해 둔다
+# 2. stone을 놓거나 뺄 때는 그 칸을 지나는 window(최대 16개)의 점수 변화만 heuristic value에 더한다
+# 3. evaluate 함수는 저장된 heuristic value를 바로 return 한다 (evaluateFull 함수는 board 전체를 다시 계산한다)
+
+## window table
+# 모든 window(4칸)의 mask와 각 칸을 지나는 window 번호는 board의 크기(width, height)로만 정해지므로,
+# 크기마다 한 번만 계산하여 모든 Heuristic object가 같이 사용한다 (windowTable 함수)
+# evaluateFull 함수는 각 window의 AI/Human stone 수를 popcount로 세어 window의 상태별 점수(windowScore)를 더한다
+
+from board import Board, popcount
+
+# board의 크기별 window table : (width, height) -> (windows, cellWindows)
+windowTables = dict()
+
+# board의 크기에 해당하는 window table을 return 한다 (처음 요청한 크기라면 계산하여 저장)
+# (col, row) = (2, 1)라면,
+# _______  _______  _______  _______
+# _______  _?_____  ____?__  _?_____
+# _______  _?_____  ___?___  __?____
+# _______  _?_____  __?____  ___?___
+# _????__  _?_____  _?_____  ____?__
+# _______  _______  _______  _______ -> ?에 표시된 칸들이 각각 하나의 window이다
+# input : width, height
+# output : (모든 window의 mask tuple, 각 칸(bit 번호)을 지나는 window 번호의 tuple)
+def windowTable(width, height):
+    table = windowTables.get((width, height))
+    if table is not None:
+        return table
+
+    # 1. 가로(-), 세로(|), 대각선(/), 대각선(\) 방향의 모든 window
+    #    (column 방향 이동, row 방향 이동)으로 나타내고, 시작 칸에서 4칸이 모두 board 안에 있는 경우만 사용한다
+    windows = []
+    for dx, dy in [(1, 0), (0, 1), (1, 1), (1, -1)]:
+        for col in range(width):
+            for row in range(height):
+                if not (0 <= col + 3 * dx < width and 0 <= row + 3 * dy < height):
+                    continue
+                windows.append(sum(1 << ((col + i * dx) * (height + 1) + row + i * dy) for i in range(4)))
+
+    # 2. 각 칸(bit 번호)을 지나는 window의 번호
+    cellWindows = tuple(tuple(i for i, window in enumerate(windows) if (window >> cell) & 1) for cell in range(width * (height + 1)))
+
+    table = windowTables[(width, height)] = (tuple(windows), cellWindows)
+    return table
 
 class Heuristic(Board):
 
@@ -28,64 +72,69 @@ class Heuristic(Board):
         # Board class에서 initialization
         super().__init__(player, width, height)
 
-        # 가로, 세로, 대각선에 들어갈 패턴들의 목록
-        self.patH = [(1 << (i * (self.height + 1))) for i in range(4)]
-        self.patV = [(1 << i) for i in range(4)]
-        self.patD1 = [(1 << (i * (self.height + 2))) for i in range(4)]
-        self.patD2 = [(1 << (i * self.height + 3)) for i in range(4)]
-        
         # 각 패턴들에 부여할 점수
         self.scoreO = (player == 0) and [0, 2, 15, 32, 100000] or [0, 2, 16, 35, 100000]
         self.scoreX = (player == 0) and [0, 2, 15, 32, 100000] or [0, 2, 14, 30, 100000]
 
-        # 각 패턴들에 대한 점수가 들어있는 dictionary
-        self.patMatchO = dict()
-        self.patMatchX = dict()
-        self.patternSetting()   # patMatchO, patMatch setting
-
-    # patMatchO와 patMatchX에 값을 집어 넣는다
-    # ex. O___
-    #     _.__
-    #     __O_
-    #     ___. (대각선(\))
-    # posOX = 0b 00000 00010 00000 01000 이면 15점
-    def patternSetting(self):
-        for pat in [self.patH, self.patV, self.patD1, self.patD2]:
-            for r in [1, 2, 3]:
-                for comb in combinations(pat, r):
-                    self.patMatchO[sum(comb)] = self.scoreO[r]
-                    self.patMatchX[sum(comb)] = self.scoreX[r]
-
-    # output : 현재 상태에 대한 heuristic value
-    # (col, row) = (2, 1)라면,
-    # _______  _______  _______  _______
-    # _______  _?_____  ____?__  _?_____
-    # _______  _?_____  ___?___  __?____
-    # _______  _?_____  __?____  ___?___
-    # _????__  _?_____  _?_____  ____?__
-    # _______  _______  _______  _______ -> ?에 표시된 부분을 확인한다
-    def evaluate(self):
-        posA = sum(self.posAll)
-        posO = (self.moves % 2 != self.player) and (self.posOX) or (posA - self.posOX)
-        posX = posA - posO
-        score = 0
+        # board의 크기별로 공유하는 window table
+        self.windows, self.cellWindows = windowTable(self.width, self.height)
+
+        # put/undo에서 갱신하는 heuristic value와 window들의 상태
+        self.heuristicValue = 0
+        self.windowStates = [0] * len(self.windows)
+        self.scoreSetting()     # windowScore, deltaAI, deltaHuman setting
+
+    # window의 상태(state) = (AI stone 수) * 5 + (Human stone 수)
+    # windowScore[state] : 상태별 window의 점수 (AI stone만 있으면 scoreO, Human stone만 있으면 -scoreX, 4개인 경우는 0)
+    # deltaAI[state], deltaHuman[state] : 해당 window에 AI/Human stone이 하나 추가되었을 때의 점수 변화
+    # ex. O.O. (AI stone 2개) -> state = 10, windowScore[10] = scoreO[2]
+    #     O.X. (둘 다 있음)   -> state = 6,  windowScore[6] = 0
+    def scoreSetting(self):
+        self.windowScore = [0] * 25
+        for r in [1, 2, 3]:
+            self.windowScore[r * 5] = self.scoreO[r]
+            self.windowScore[r] = -self.scoreX[r]
+        self.deltaAI = [self.windowScore[state + 5] - self.windowScore[state] for state in range(20)]
+        self.deltaHuman = [self.windowScore[state + 1] - self.windowScore[state] for state in range(20)]
+
+    # board에 stone을 놓고, 그 칸을 지나는 window들의 점수 변화를 heuristic value에 더한다
+    # input : stone을 놓을 column number
+    def put(self, col):
+        cell = (self.posAll[col] + self.posBottom[col]).bit_length() - 1
+        delta, step = (self.moves % 2 == self.player) and (self.deltaAI, 5) or (self.deltaHuman, 1)
+        states = self.windowStates
+        value = self.heuristicValue
+        for i in self.cellWindows[cell]:
+            state = states[i]
+            value += delta[state]
+            states[i] = state + step
+        self.heuristicValue = value
+        super().put(col)
 
-        for pat in [self.patH, self.patV, self.patD1, self.patD2]:
-            mask = sum(pat)
-            shift = 0
-            for _ in range((pat == self.patV) and (self.width) or (self.width - 3)):
-                for _ in range((pat == self.patH) and (self.height) or (self.height - 3)):
-                    # 1. (posA & mask) == (posO/X & mask)를 확인
-                    #    빈칸인지 상대 stone인지 확인하기 위해 (ex. O..O는 True, O.XO는 False)
-                    # 2. 해당 pattern이 patMatchO/X에 존재하는지 확인
-                    # -> 해당 pattenr에 대한 score를 반영한다. (O의 score는 plus, X의 score는 minus)
-                    if (posA & mask) == (posO & mask) and ((posO & mask) >> shift) in self.patMatchO:
-                        score += self.patMatchO[(posO & mask) >> shift]
-                    elif (posA & mask) == (posX & mask) and ((posX & mask) >> shift) in self.patMatchX:
-                        score -= self.patMatchX[(posX & mask) >> shift]
-                    mask <<= 1
-                    shift += 1
-                mask <<= (pat == self.patH) and 1 or 4
-                shift += (pat == self.patH) and 1 or 4
+    # 마지막에 놓았던 stone을 없애고, put 함수에서 더한 점수 변화를 뺀다
+    def undo(self):
+        cell = self.posAll[self.log[-1]].bit_length() - 1
+        delta, step = ((self.moves - 1) % 2 == self.player) and (self.deltaAI, 5) or (self.deltaHuman, 1)
+        states = self.windowStates
+        value = self.heuristicValue
+        for i in self.cellWindows[cell]:
+            state = states[i] - step
+            value -= delta[state]
+            states[i] = state
+        self.heuristicValue = value
+        super().undo()
 
+    # output : 현재 상태에 대한 heuristic value (put/undo에서 갱신한 값)
+    def evaluate(self):
+        return self.heuristicValue
+
+    # output : board 전체의 window를 다시 확인하여 계산한 heuristic value (evaluate 함수와 같은 값)
+    # 각 window의 AI/Human stone 수를 popcount로 세어 windowScore를 더한다
+    def evaluateFull(self):
+        posAI = (self.moves % 2 != self.player) and (self.posOX) or (self.mask - self.posOX)
+        posHuman = self.mask - posAI
+        windowScore = self.windowScore
+        score = 0
+        for window in self.windows:
+            score += windowScore[popcount(posAI & window) * 5 + popcount(posHuman & window)]
         return score
\ No newline at end of file
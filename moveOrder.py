@@ -0,0 +1,144 @@
+### Game tree에서 child node(column)를 탐색할 순서를 정하는 class ###
+
+## 탐색 순서를 정하는 이유
+# alpha-beta pruning은 가장 좋은 수를 먼저 탐색할수록 pruning이 많이 일어난다.
+# 기존에는 모든 node에서 가운데 column부터 탐색하는 고정된 순서(colOrder)를 사용했지만,
+# 탐색 중에 얻은 정보를 이용하여 node마다 순서를 다시 정한다.
+
+## 탐색 순서를 정하는 우선순위
+# 1순위 : transposition table에 저장된 best column (이전 탐색에서 가장 좋았던 수)
+# 2순위 : 두면 바로 이기는 수
+# 3순위 : 두지 않으면 상대가 바로 이기는 수 (막는 수)
+# 4순위 : killer move (같은 depth의 다른 node에서 pruning을 일으킨 수, depth마다 2개)
+# 5순위 : 나머지 수들은 아래 순서로 비교한다
+#        1. 두었을 때 새로 생기는 threat(4줄이 완성되는 빈칸)의 수
+#        2. history table (pruning을 일으킨 칸마다 depth^2만큼 더한 값)
+#        3. 가운데 column에 가까운 순서
+# 마지막 : 상대가 이길 수 있는 칸 바로 아래에 두는 수 (상대에게 이기는 칸을 열어주므로)
+
+from heuristic import Heuristic
+from board import popcount
+
+class MoveOrder(Heuristic):
+
+    # Initialization
+    def __init__(self, player, width = None, height = None):
+        # Heuristic class에서 initialization
+        super().__init__(player, width, height)
+
+        # 가운데 column부터 탐색하는 기본 순서
+        # ex. width = 7 일 때 centerOrder = [3, 2, 4, 1, 5, 0, 6], halfOrder = [3, 2, 1, 0]
+        self.centerOrder = sorted(range(self.width), key = lambda col: (abs(2 * col - self.width + 1), col))
+        self.halfOrder = [col for col in self.centerOrder if col <= self.width // 2]
+        self.firstOrder = [2, 1, 0] if (self.width == 7) else self.halfOrder
+
+        # 탐색 중에 list를 새로 만들지 않도록 depth(moves)마다 미리 만들어 둔 buffer
+        # moveBuffer[moves] = 탐색할 column number, priorityBuffer[moves] = 각 column의 우선순위
+        self.moveBuffer = [[0] * self.width for _ in range(self.width * self.height + 1)]
+        self.priorityBuffer = [[0] * self.width for _ in range(self.width * self.height + 1)]
+
+        # killers[moves] = 해당 depth에서 pruning을 일으킨 최근 2개의 column number
+        self.killers = [[-1, -1] for _ in range(self.width * self.height + 1)]
+
+        # history[turn][칸의 bit 위치] = 해당 칸에 둔 수가 pruning을 일으킨 정도
+        self.history = [[0] * (self.width * (self.height + 1)) for _ in range(2)]
+
+        # 탐색 순서가 얼마나 정확한지 확인하기 위한 counter
+        # firstMoveCutoffs / cutoffs가 1에 가까울수록 좋은 순서이다
+        self.cutoffs = 0            # pruning이 일어난 node의 수
+        self.firstMoveCutoffs = 0   # 첫 번째로 탐색한 수에서 pruning이 일어난 node의 수
+
+    # 현재 상태에서 탐색할 column number의 순서를 계산한다
+    # input : transposition table에 저장된 best column number (없으면 -1), 탐색할 칸들 (None이면 stone을 놓을 수 있는 모든 칸)
+    # output : 탐색할 column number의 순서
+    def orderMoves(self, ttMove = -1, cells = None):
+        count = self.fillMoves(ttMove, cells)
+        return self.moveBuffer[self.moves][:count]
+
+    # 현재 상태에서 탐색할 후보 column number (기본 순서)
+    # 첫 turn(width = 7)에는 가운데 column에 둘 수 없고, 대칭인 경우에는 절반의 column만 탐색한다
+    # 탐색 중의 모든 node에서 불리므로 self.symmetry()를 사용하지 않고 board와 mirror board를 직접 비교한다
+    # (self.symmetry()는 대칭이 될 수 없는 node에서 self.neverSymmetry를 True로 바꾸므로, root에서만 사용한다)
+    # output : 후보 column number의 list (stone을 놓을 수 없는 column도 포함)
+    def candidateMoves(self):
+        if self.moves == 0:
+            return self.firstOrder
+        elif self.posOX == self.posOXMirror and self.mask == self.maskMirror:
+            return self.halfOrder
+        return self.centerOrder
+
+    # 탐색할 column number를 우선순위 순서대로 self.moveBuffer[self.moves]에 채운다
+    # 새로운 list를 만들지 않기 위해 우선순위를 하나의 정수로 계산하여 insertion sort로 정렬한다
+    # 우선순위 = (rank + 1) << 28 | threat 수 << 24 | history << 4 | (15 - 기본 순서)
+    # input : transposition table에 저장된 best column number (없으면 -1), 탐색할 칸들 (None이면 stone을 놓을 수 있는 모든 칸)
+    # output : 탐색할 column의 수
+    def fillMoves(self, ttMove = -1, cells = None):
+        # 1. 후보 column과 탐색할 칸 (ex. Board.nonLosingCells)
+        cols = self.candidateMoves()
+        if cells is None:
+            cells = (self.mask + self.bottom) & self.boardMask
+
+        # 2. 현재 turn의 stone(myPos)과 상대 stone(self.posOX)이 4줄을 완성할 수 있는 빈칸
+        myPos = self.mask - self.posOX
+        myWins = self.winningCells(myPos)
+        oppWins = self.winningCells(self.posOX)
+        killers = self.killers[self.moves]
+        history = self.history[self.moves % 2]
+        moveBuffer = self.moveBuffer[self.moves]
+        priorityBuffer = self.priorityBuffer[self.moves]
+
+        # 3. column마다 우선순위를 계산하여 정렬된 위치에 넣는다
+        count = 0
+        for i in range(len(cols)):
+            col = cols[i]
+            cell = self.posAll[col] + self.posBottom[col]       # 새로 stone이 놓일 칸
+            if not (cell & cells):
+                continue
+
+            if col == ttMove:
+                priority = 6 << 28
+            elif cell & myWins:
+                priority = 5 << 28
+            elif cell & oppWins:
+                priority = 4 << 28
+            elif (cell << 1) & oppWins:
+                priority = 0
+            elif col == killers[0]:
+                priority = 3 << 28
+            elif col == killers[1]:
+                priority = 2 << 28
+            else:
+                threats = popcount(self.winningCells(myPos | cell) & ~cell)
+                priority = (1 << 28) | (min(threats, 15) << 24) | (min(history[cell.bit_length() - 1], 0xFFFFF) << 4)
+            priority |= 15 - i
+
+            # insertion sort (우선순위가 높은 순서)
+            j = count
+            while j > 0 and priorityBuffer[j - 1] < priority:
+                moveBuffer[j] = moveBuffer[j - 1]
+                priorityBuffer[j] = priorityBuffer[j - 1]
+                j -= 1
+            moveBuffer[j] = col
+            priorityBuffer[j] = priority
+            count += 1
+
+        return count
+
+    # pruning이 일어난 경우 killer move와 history table을 갱신한다
+    # input : pruning을 일으킨 column number, 남은 depth, 첫 번째로 탐색한 수인지 여부
+    def cutoff(self, col, depth, first):
+        self.cutoffs += 1
+        if first:
+            self.firstMoveCutoffs += 1
+
+        killers = self.killers[self.moves]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+
+        cell = self.posAll[col] + self.posBottom[col]
+        self.history[self.moves % 2][cell.bit_length() - 1] += depth * depth
+
+    # output : pruning이 일어난 node 중 첫 번째로 탐색한 수에서 pruning이 일어난 비율
+    def firstMoveCutoffRate(self):
+        return self.firstMoveCutoffs / self.cutoffs if self.cutoffs else 0.0
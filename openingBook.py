@@ -0,0 +1,141 @@
+### 게임 초반의 best column을 미리 계산해 둔 opening book ###
+
+## opening book을 사용하는 이유
+# 게임 초반에는 남은 칸이 많아 GameTree.search가 가장 오래 걸리지만, 나올 수 있는 position의 수는 적다
+# -> N수 이하의 모든 position을 미리 깊게 탐색하여 파일로 저장해 두고, 게임 중에는 파일에서 찾기만 한다
+
+## 파일 형식 (little endian)
+# header : magic(4byte, b'C4BK'), width(1byte), height(1byte), plies(1byte), depth(1byte), record 수(4byte)
+# record : key(8byte), score(2byte), column number(1byte) - key 순서대로 정렬
+# - key는 좌우 대칭인 board끼리 같은 canonicalKey를 사용하고, column number도 canonicalKey 기준으로 저장한다
+# - score는 해당 position에서 둘 차례인 player 입장의 score (GameTree의 score 기준과 같다)
+# - 게임 중에는 파일을 mmap으로 열어 binary search로 찾으므로, 파일을 읽어 들이는 시간이 없다
+
+## 만드는 방법
+# python openingBook.py [plies] [depth]
+# plies수 이하의 모든 position을 GameTree.search로 depth수 앞까지 탐색하여 openingBook.bin에 저장한다 (기본값 4, 10)
+
+from gameTree import GameTree
+from timeControl import TimeControl
+from contextlib import redirect_stdout
+from time import time
+import io
+import mmap
+import os
+import struct
+import sys
+
+HEADER = struct.Struct('<4sBBBBI')
+RECORD = struct.Struct('<Qhb')
+MAGIC = b'C4BK'
+
+# 기본 opening book 파일 경로
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openingBook.bin')
+
+class OpeningBook:
+
+    # Initialization
+    # input : opening book 파일 경로
+    def __init__(self, path = DEFAULT_PATH):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, self.width, self.height, self.plies, self.depth, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError('opening book 파일이 아닙니다 : ' + str(path))
+
+        # opening book에서 찾은 횟수 (통계)
+        self.probes = 0
+        self.hits = 0
+
+    # key 순서대로 정렬된 record에서 binary search로 key를 찾는다
+    # input : position의 canonicalKey
+    # output : (score, column number), 없으면 None
+    def probe(self, key):
+        self.probes += 1
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) >> 1
+            recordKey, score, col = RECORD.unpack_from(self.data, HEADER.size + mid * RECORD.size)
+            if recordKey < key:
+                low = mid + 1
+            elif recordKey > key:
+                high = mid
+            else:
+                self.hits += 1
+                return score, col
+        return None
+
+    # 현재 board에서 둘 차례인 player의 best column을 찾는다
+    # input : Board object
+    # output : (score, column number), board의 크기가 다르거나 없으면 None
+    def lookup(self, board):
+        if board.width != self.width or board.height != self.height or board.moves > self.plies:
+            return None
+        pos, posMirror = board.posCurrent(), board.posMirror()
+        entry = self.probe(min(pos, posMirror))
+        if entry is None:
+            return None
+        score, col = entry
+        return score, (board.width - col - 1) if (posMirror < pos) else col
+
+    # 파일을 닫는다
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+# opening book 파일이 있으면 열고, 없으면 None을 return
+# input : opening book 파일 경로
+# output : OpeningBook object 또는 None
+def openBook(path = DEFAULT_PATH):
+    return OpeningBook(path) if os.path.exists(path) else None
+
+# plies수 이하의 모든 position을 탐색하여 opening book 파일을 만든다
+# 둘 차례인 player가 AI인 GameTree 2개(선공, 후공)로 탐색하며, 두 GameTree의 transposition table은 계속 사용한다
+# input : 파일 경로, 몇 수 이하의 position을 저장할지, 몇 수 앞까지 탐색할지, board의 크기
+# output : 저장한 position의 수
+def build(path = DEFAULT_PATH, plies = 4, depth = 10, width = 7, height = 6):
+    with redirect_stdout(io.StringIO()):
+        trees = [GameTree(player, width, height, timeControl = TimeControl(depth = depth)) for player in (0, 1)]
+    records = dict()
+    startTime = time()
+
+    # 1. 좌우 대칭을 제외한 position들을 depth-first로 찾는다
+    stack = [[]]
+    seen = set()
+    while stack:
+        cols = stack.pop()
+        tree = trees[len(cols) % 2]
+        tree.puts(cols)
+        pos, posMirror = tree.posCurrent(), tree.posMirror()
+        key = min(pos, posMirror)
+        if key not in seen and not tree.win() and tree.moves < tree.area:
+            seen.add(key)
+
+            # 2. position을 탐색하여 best column과 score를 저장한다
+            with redirect_stdout(io.StringIO()):
+                col = tree.search(time())
+            slot = tree.table.find(key)
+            score = tree.table.values[slot] if (slot >= 0) else 0
+            records[key] = (score, (width - col - 1) if (posMirror < pos) else col)
+            print(str(len(records)) + '. ' + (' '.join(str(c + 1) for c in cols) or '(시작)') + ' -> ' + str(col + 1) + '열 (score ' + str(score) + ', ' + str(round(time() - startTime, 1)) + '초)')
+
+            # 3. 다음 수의 position들 (첫 turn의 규칙은 getColOrder를 따른다)
+            if len(cols) < plies:
+                for nextCol in tree.getColOrder():
+                    if tree.possible(nextCol):
+                        stack.append(cols + [nextCol])
+        for _ in cols:
+            tree.undo()
+
+    # 4. key 순서대로 정렬하여 저장
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, width, height, plies, depth, len(records)))
+        for key in sorted(records):
+            score, col = records[key]
+            f.write(RECORD.pack(key, score, col))
+    return len(records)
+
+if __name__ == '__main__':
+    plies = int(sys.argv[1]) if (len(sys.argv) > 1) else 4
+    depth = int(sys.argv[2]) if (len(sys.argv) > 2) else 10
+    print('opening book : ' + str(build(DEFAULT_PATH, plies, depth)) + '개의 position을 ' + DEFAULT_PATH + '에 저장했습니다.')
@@ -0,0 +1,268 @@
+### 여러 process를 사용하여 탐색하는 game tree ###
+# 1. ParallelGameTree : root의 column들을 여러 process에서 나누어 탐색
+# 2. LazySmpGameTree  : 여러 process가 같은 position을 탐색하며 하나의 transposition table을 공유
+
+## ParallelGameTree의 탐색 방법 (root에서의 Young Brothers Wait)
+# 1. 각 depth에서 가장 좋을 것으로 예상되는 첫 번째 column(eldest brother)을 full window로 먼저 탐색한다
+# 2. 첫 번째 column의 score를 alpha로 하여 나머지 column들을 process pool에서 동시에 탐색한다
+#    - 먼저 끝난 column의 score가 더 높다면 공유 메모리의 alpha를 갱신하고, 이후에 시작하는 column은 갱신된 alpha를 사용한다
+#    - alpha보다 낮은 column의 score는 정확한 값이 아닌 상한값(upper bound)이다
+#    - alpha와 같은 score도 정확히 구하기 위해 (alpha - 1)을 사용하므로, best column은 GameTree.search와 같다
+# 3. 제한 시간이나 node 수를 넘으면 공유 메모리의 abort flag를 세워 모든 worker의 탐색을 멈춘다
+
+## worker process
+# - 각 worker는 자신만의 GameTree(WorkerTree)와 transposition table을 가지고, 여러 depth에 걸쳐 계속 사용한다
+# - board는 지금까지 둔 column number들의 bytes(self.log)로 전달한다 (7x6 board에서 최대 42 byte)
+
+## LazySmpGameTree의 탐색 방법 (Lazy SMP)
+# 1. main process는 GameTree.search와 똑같이 탐색하고, 그동안 helper process들도 같은 position을 탐색한다
+# 2. 모든 process는 shared memory에 있는 하나의 SharedTranspositionTable을 사용한다
+#    helper가 먼저 구한 값과 best column을 main process가 table에서 읽어 사용하므로 탐색할 node가 줄어든다
+# 3. helper마다 root의 column 순서와 시작 depth를 다르게 하여 서로 다른 부분을 먼저 탐색하게 한다
+# 4. main process의 탐색이 끝나면 abort flag를 세워 helper들을 멈춘다
+# core가 하나인 환경의 benchmark.py에서는 helper들이 main process와 같은 core를 나누어 쓰므로 GameTree보다 느리다 (여러 core에서는 아직 측정하지 않았다)
+
+from gameTree import GameTree, SearchTimeout
+from transpositionTable import SharedTranspositionTable
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from multiprocessing import Value
+from time import time
+import io
+import os
+
+# worker process마다 하나씩 존재하는 GameTree와 공유 메모리
+workerTree = None
+workerAbort = None
+workerAlpha = None
+
+# worker process에서 사용하는 GameTree
+# 256 node마다 제한 시간, node 수와 함께 main process의 abort flag를 확인한다
+class WorkerTree(GameTree):
+
+    def checkLimits(self):
+        if workerAbort.value:
+            raise SearchTimeout
+        super().checkLimits()
+
+# worker process를 시작할 때 한 번 실행되어 WorkerTree를 만든다
+# input : player, width, height, transposition table 크기(MB), engine, abort flag, alpha (공유 메모리),
+#         SharedTranspositionTable의 이름 (None이면 worker마다 따로 table을 만든다)
+def initWorker(player, width, height, ttMemory, engine, abort, alpha, tableName = None):
+    global workerTree, workerAbort, workerAlpha
+    with redirect_stdout(io.StringIO()):
+        workerTree = WorkerTree(player, width, height, ttMemory = 0 if tableName else ttMemory, engine = engine)
+    if tableName:
+        workerTree.table = SharedTranspositionTable(ttMemory, tableName)
+    workerAbort, workerAlpha = abort, alpha
+
+# worker의 board를 snapshot과 같게 만든다
+# input : WorkerTree object, board (지금까지 둔 column number의 bytes)
+def loadSnapshot(tree, snapshot):
+    if bytes(tree.log) != snapshot:
+        while tree.moves:
+            tree.undo()
+        tree.puts(snapshot)
+
+# worker process에서 root의 column 하나를 탐색한다
+# input : board (지금까지 둔 column number의 bytes), 탐색할 column number, depth, 제한 시간, 남은 node 수, alpha 사용 여부
+# output : (column number, score (제한을 넘으면 None), 탐색한 node 수, principal variation, 걸린 시간)
+def searchChild(snapshot, col, depth, deadline, nodeLimit, useAlpha):
+    startTime = time()
+    tree = workerTree
+
+    # 1. worker의 board를 snapshot과 같게 만든다
+    loadSnapshot(tree, snapshot)
+
+    # 2. column을 탐색한다
+    alpha = (workerAlpha.value - 1) if useAlpha else -10000
+    startNodes = tree.nodes
+    tree.deadline = deadline
+    tree.nodeLimit = startNodes + nodeLimit
+    tree.put(col)
+    try:
+        score = tree.searchScore(alpha, 10000, tree.moves - 1 + depth)
+        pv = tree.principalVariation()
+    except SearchTimeout:
+        score, pv = None, []
+
+    # 3. board를 snapshot으로 되돌린다
+    while tree.moves > len(snapshot):
+        tree.undo()
+    tree.deadline = tree.nodeLimit = float('inf')
+    return col, score, tree.nodes - startNodes, pv, time() - startTime
+
+# helper process에서 abort flag가 설 때까지 iterative deepening으로 탐색한다 (Lazy SMP)
+# helper마다 root의 column 순서를 index만큼 돌리고, 홀수 번째 helper는 depth 2부터 시작한다
+# input : board (지금까지 둔 column number의 bytes), helper 번호 (1부터)
+# output : 탐색한 node 수
+def helperSearch(snapshot, index):
+    tree = workerTree
+    loadSnapshot(tree, snapshot)
+    startNodes = tree.nodes
+
+    colOrder = [col for col in tree.getColOrder() if tree.possible(col)]
+    shift = index % len(colOrder)
+    colOrder = colOrder[shift:] + colOrder[:shift]
+    try:
+        for depth in range(1 + index % 2, tree.area - tree.moves + 1):
+            tree.searchRoot(colOrder, depth)
+    except SearchTimeout:
+        while tree.moves > len(snapshot):
+            tree.undo()
+    return tree.nodes - startNodes
+
+class ParallelGameTree(GameTree):
+
+    # alpha보다 낮은 column의 score는 upper bound이다
+    exactRootScores = False
+
+    # Initialization
+    # input : GameTree와 같음, worker process의 수 (None이면 CPU 수)
+    #         그 외의 GameTree input은 keyword로 입력한다
+    def __init__(self, player, width = None, height = None, timeLimit = 120, ttMemory = 16, engine = 'minimax', timeControl = None, book = None, workers = None, **kwargs):
+        # GameTree class에서 initialization
+        super().__init__(player, width, height, timeLimit, ttMemory, engine, timeControl, book, **kwargs)
+        self.ttMemory = ttMemory
+        self.workers = workers if (workers is not None) else (os.cpu_count() or 1)
+
+        # 처음 search할 때 만드는 process pool
+        self.pool = None
+
+        # worker들과 공유하는 abort flag와 root의 alpha
+        self.abort = Value('b', 0)
+        self.alpha = Value('i', -10000)
+
+        # 마지막으로 끝까지 탐색한 depth에서 worker가 구한 column별 principal variation (column 다음 수부터)
+        # depthPV는 탐색 중인 depth의 principal variation
+        self.rootPV = dict()
+        self.depthPV = dict()
+
+    # root의 column들을 process pool에서 나누어 탐색한다 (GameTree.searchRoot를 대체)
+    # input : 탐색할 column number의 순서, 탐색할 depth
+    # output : column별 score의 dict, column별 탐색하는데 걸린 시간의 dict
+    def searchRoot(self, colOrder, depth):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers, initializer = initWorker,
+                                            initargs = (self.player, self.width, self.height, self.ttMemory, self.engine, self.abort, self.alpha))
+        snapshot = bytes(self.log)
+        depthScores, depthTime = dict(), dict()
+        self.depthPV = dict()
+
+        # 1. 첫 번째 column은 full window로 먼저 탐색
+        self.alpha.value = -10000
+        self.collect([self.submit(snapshot, colOrder[0], depth, False)], depthScores, depthTime)
+
+        # 2. 나머지 column은 alpha를 사용하여 동시에 탐색
+        self.collect([self.submit(snapshot, col, depth, True) for col in colOrder[1:]], depthScores, depthTime)
+        self.rootPV = self.depthPV
+        return depthScores, depthTime
+
+    # 하나의 column을 process pool에 넘긴다
+    # input : board의 snapshot, column number, depth, alpha 사용 여부
+    # output : Future object
+    def submit(self, snapshot, col, depth, useAlpha):
+        return self.pool.submit(searchChild, snapshot, col, depth, self.deadline, self.nodeLimit - self.nodes, useAlpha)
+
+    # 넘긴 column들의 결과를 끝난 순서대로 모은다
+    # 제한 시간이나 node 수를 넘은 경우, 모든 worker를 멈추고 SearchTimeout을 발생시킨다
+    # worker에서 예외가 발생한 경우에도 나머지 worker를 멈추고, process pool이 망가졌다면 다음 search에서 새로 만든다
+    # input : Future object의 list, 결과를 저장할 column별 score와 시간의 dict
+    def collect(self, futures, depthScores, depthTime):
+        timeout = False
+        try:
+            for future in as_completed(futures):
+                col, score, nodes, pv, searchTime = future.result()
+                self.nodes += nodes
+                if score is None or self.nodes > self.nodeLimit:
+                    timeout = True
+                    self.abort.value = 1
+                    continue
+                depthScores[col], depthTime[col] = score, searchTime
+                self.depthPV[col] = pv
+                if score > self.alpha.value:
+                    self.alpha.value = score
+        except BaseException as error:
+            # 아직 시작하지 않은 column은 취소하고, 탐색 중인 worker가 멈출 때까지 기다린다
+            self.abort.value = 1
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            self.alpha.value = -10000
+            if isinstance(error, BrokenProcessPool):
+                self.pool.shutdown(wait = False)
+                self.pool = None
+            raise
+        finally:
+            # 모든 worker가 멈춘 뒤에 abort flag를 내린다
+            self.abort.value = 0
+        if timeout:
+            raise SearchTimeout
+
+    # root의 best column과, 그 column을 탐색한 worker가 구한 principal variation
+    # input : 구할 수순의 최대 길이
+    # output : column number의 list
+    def principalVariation(self, maxLength = 20):
+        col = self.tableMove()
+        if col not in self.rootPV:
+            return super().principalVariation(maxLength)
+        return ([col] + self.rootPV[col])[:maxLength]
+
+    # process pool을 종료한다
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+class LazySmpGameTree(GameTree):
+
+    # Initialization
+    # input : GameTree와 같음, 탐색에 사용할 process의 수 (main process 포함, None이면 CPU 수)
+    #         그 외의 GameTree input은 keyword로 입력한다
+    def __init__(self, player, width = None, height = None, timeLimit = 120, ttMemory = 16, engine = 'minimax', timeControl = None, book = None, workers = None, **kwargs):
+        # GameTree class에서 initialization (self.table은 SharedTranspositionTable로 바꾼다)
+        super().__init__(player, width, height, timeLimit, 0, engine, timeControl, book, **kwargs)
+        self.table = SharedTranspositionTable(ttMemory)
+        self.ttMemory = ttMemory
+        self.workers = workers if (workers is not None) else (os.cpu_count() or 1)
+        self.helpers = max(self.workers - 1, 1)
+
+        # 처음 search할 때 만드는 process pool, helper들과 공유하는 abort flag
+        self.pool = None
+        self.abort = Value('b', 0)
+
+        # helper들이 탐색한 node의 수
+        self.helperNodes = 0
+
+    # helper들이 같은 position을 탐색하는 동안 GameTree.search로 다음에 둘 column number를 정한다
+    # input : 초기 시간, 최대 depth (None이면 남은 칸 수까지)
+    # output : 선택할 column number
+    def search(self, initTime, maxDepth = None):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.helpers, initializer = initWorker,
+                                            initargs = (self.player, self.width, self.height, self.ttMemory, self.engine, self.abort, None, self.table.name))
+        snapshot = bytes(self.log)
+        futures = [self.pool.submit(helperSearch, snapshot, index + 1) for index in range(self.helpers)]
+        try:
+            return super().search(initTime, maxDepth)
+        finally:
+            # main process의 탐색이 끝나면 helper들을 멈춘다 (helper에서 예외가 발생하더라도 abort flag를 내린다)
+            self.abort.value = 1
+            try:
+                for future in futures:
+                    self.helperNodes += future.result()
+            except BrokenProcessPool:
+                self.pool.shutdown(wait = False)
+                self.pool = None
+                raise
+            finally:
+                self.abort.value = 0
+
+    # process pool과 shared memory를 정리한다
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self.table.close()
+        self.table.unlink()
@@ -1,4 +1,8 @@
 from gameTree import GameTree
+from timeControl import TimeControl
+from ponder import Ponder
+from openingBook import openBook
+from resultCache import ResultCache
 from rule import Rule
 from time import time
 
@@ -12,8 +16,20 @@ player = 'input'
 while player not in ['Y', 'y', 'Yes', 'YES', 'yes', 'O', 'o', 'N', 'n', 'No', 'no', 'X', 'x']:
     player = input('2. 먼저 하시겠습니까? (Y/N) - ')
 player = (player in ['Y', 'y', 'Yes', 'YES', 'yes', 'O', 'o']) and 1 or 0        # AI 기준으로 선공 = 0, 후공 = 1
-# 1-3. 기본 정보를 바탕으로 GameTree/Rule class 선언
-connect4 = (mode == 'S' or mode == 's') and GameTree(player) or Rule(player)
+# 1-3. 서치 기반일 경우 AI의 시간 제한 방식 선택 (입력하지 않으면 한 수에 120초)
+timeControl = None
+while (mode == 'S' or mode == 's') and timeControl is None:
+    try:
+        text = input("3. AI의 시간 제한 방식을 입력해 주십시오. ('120' = 한 수에 120초, '300+2' = 전체 300초 + 한 수마다 2초, 'd10' = 10수 앞까지, 'n50000' = 한 수에 50000 node) : ")
+        timeControl = TimeControl.parse(text or '120')
+    except ValueError:
+        print('Wrong input! Try again.')
+# 1-4. 기본 정보를 바탕으로 GameTree/Rule class 선언
+#      openingBook.bin이 있다면 opening book으로 사용하고, 결과가 확실한 position은 resultCache_7x6.bin에 쌓는다
+connect4 = (mode == 'S' or mode == 's') and GameTree(player, timeControl = timeControl, book = openBook(), cache = ResultCache()) or Rule(player)
+# 1-5. 서치 기반일 경우 Human이 고민하는 동안 AI가 미리 탐색한다 (pondering)
+ponder = (mode == 'S' or mode == 's') and Ponder(connect4) or None
+humanCol = -1
 
 for i in range(connect4.width * connect4.height):
     # 2. board 출력
@@ -25,8 +41,17 @@ for i in range(connect4.width * connect4.height):
         # 3-1. Game tree search 일때는 걸린 시간을 체크하여 출력
         if mode == 'S' or mode == 's':
             startTime = time()
-            col = connect4.search(startTime)
+            startNodes = connect4.nodes
+            # Human이 예상한 수에 두었고 충분히 미리 탐색했다면 search 없이 바로 둔다 (ponder hit)
+            col = ponder.answer(humanCol)
+            if col >= 0:
+                print('\nponder hit : Human이 고민하는 동안 ' + str(ponder.depth) + '수 앞까지 탐색한 결과로 바로 둡니다.')
+                connect4.timeControl.update(time() - startTime)
+            else:
+                col = connect4.search(startTime)
             print('걸린 시간 : ' + str(time() - startTime))
+            print('탐색한 node 수 : ' + str(connect4.nodes - startNodes))
+            print('시간 제한 : ' + str(connect4.timeControl))
         # 3-2. Rule based
         else:
             col = connect4.solver()
@@ -36,11 +61,17 @@ for i in range(connect4.width * connect4.height):
 
     # 4. Human's turn
     else:
+        # 4-0. 서치 기반일 때는 입력을 기다리는 동안 pondering
+        if ponder is not None:
+            ponder.start()
         while True:
             try:
-                # 4-1. 두고 싶은 stone의 column number를 입력받는다
+                # 4-1. 두고 싶은 stone의 column number를 입력받는다 (입력을 받으면 pondering을 멈춘다)
                 print()
-                col = int(input(str(i+1) + '. ' + (connect4.moves % 2 == player and 'AI' or 'Human') + '\'s turn(' + (connect4.moves % 2 == 0 and 'O' or 'X') + ') : ')) - 1                
+                text = input(str(i+1) + '. ' + (connect4.moves % 2 == player and 'AI' or 'Human') + '\'s turn(' + (connect4.moves % 2 == 0 and 'O' or 'X') + ') : ')
+                if ponder is not None:
+                    ponder.stop()
+                col = int(text) - 1
                 # 4-2. 첫 턴에 가운데에 둘 경우 error
                 if connect4.width == 7 and connect4.moves == 0 and col == 3:
                     raise WrongInput
@@ -52,10 +83,15 @@ for i in range(connect4.width * connect4.height):
                     raise WrongInput
                 # 4-5. 문제가 없다면 stone을 착수
                 connect4.put(col)
+                humanCol = col
                 break
             # error가 발생한 경우에는 error message와 함께 다시 진행한다
+            # 다시 입력을 기다리는 동안에도 pondering을 이어서 한다
             except:
                 print('Wrong input! Try again.')
+                if ponder is not None:
+                    ponder.stop()
+                    ponder.start(resume = True)
 
     # 5. 게임에서 이긴 경우
     if connect4.win():
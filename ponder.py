@@ -0,0 +1,109 @@
+### Human이 수를 고민하는 동안 AI가 미리 탐색하는 class (pondering) ###
+
+## 방법
+# 1. Human의 turn이 되면 Human이 둘 것으로 예상되는 column(예상 수)을 정한다
+#    transposition table에 저장된 best column (마지막 탐색의 principal variation), 없다면 orderMoves의 첫 번째 column
+# 2. background thread에서 예상 수를 둔 board를 iterative deepening으로 탐색한다
+#    탐색 결과는 GameTree의 transposition table에 저장되므로, 예상이 틀리더라도 다음 탐색이 빨라진다
+# 3. Human이 수를 입력하면 thread를 멈춘다 (deadline을 0으로 바꾸면 256 node 안에 SearchTimeout이 발생)
+# 4. Human이 예상 수에 두었고(ponder hit), 아래 중 하나라도 만족하면 search 없이 바로 그 결과로 둔다
+#    - 결과가 확실한 경우 (1순위)
+#    - 마지막 search가 실제로 탐색한 depth(GameTree.searchDepth) 이상까지 탐색한 경우
+#      (마지막 search가 탐색 없이 바로 둔 경우에는 비교하지 않는다)
+#    - timeControl이 한 수에 주는 시간(soft limit) 이상 pondering한 경우
+# thread가 탐색하는 동안에는 GameTree의 board가 바뀌므로, stop 함수를 부르기 전에는 board를 읽거나 바꾸면 안 된다
+
+from gameTree import SearchTimeout
+from transpositionTable import EXACT
+from time import time
+import threading
+
+class Ponder:
+
+    # Initialization
+    # input : GameTree object
+    def __init__(self, tree):
+        self.tree = tree
+        self.thread = None
+
+        # 마지막 pondering의 결과
+        self.reply = -1         # 예상한 Human의 column number
+        self.bestCol = -1       # 예상 수를 둔 board에서 AI의 best column number
+        self.depth = 0          # 끝까지 탐색한 depth
+        self.proven = False     # 결과가 확실한 경우 (1순위)
+        self.startTime = 0.0    # pondering을 시작한 시간
+        self.elapsed = 0.0      # pondering한 시간
+
+        # ponder hit 통계
+        self.ponders = 0        # pondering한 횟수
+        self.hits = 0           # 예상 수가 맞은 횟수
+        self.instant = 0        # search 없이 바로 둔 횟수
+
+    # background thread에서 pondering을 시작한다
+    # input : 잘못된 입력 등으로 멈췄던 같은 turn의 pondering을 다시 시작하는 경우 True
+    #         (pondering한 시간은 처음 시작한 시간부터 이어서 세고, pondering한 횟수는 늘리지 않는다)
+    def start(self, resume = False):
+        tree = self.tree
+        if tree.win() or tree.moves == tree.area:
+            return
+        reply = tree.tableMove()
+        self.reply = reply if (reply >= 0) else tree.orderMoves()[0]
+        self.bestCol, self.depth, self.proven = -1, 0, False
+        if not resume:
+            self.startTime, self.elapsed = time(), 0.0
+            self.ponders += 1
+
+        tree.deadline = float('inf')
+        self.thread = threading.Thread(target = self.run, daemon = True)
+        self.thread.start()
+
+    # thread에서 실행되는 함수
+    # 예상 수를 둔 board에서 GameTree.search와 같은 방법으로 depth를 늘려가며 root의 column들을 탐색한다
+    def run(self):
+        tree = self.tree
+        rootMoves = tree.moves
+        try:
+            tree.put(self.reply)
+            if not tree.win() and tree.moves < tree.area:
+                baseOrder = [col for col in tree.getColOrder() if tree.possible(col)]
+                colOrder = list(baseOrder)
+                for depth in range(1, tree.area - tree.moves + 1):
+                    scores, _ = tree.searchRoot(colOrder, depth)
+                    bestCol = tree.bestColumn(baseOrder, scores)
+                    self.bestCol, self.depth = bestCol, depth
+
+                    # root의 best column을 table에 저장하고, 다음 depth는 score가 높은 column부터 탐색
+                    pos, posMirror = tree.posCurrent(), tree.posMirror()
+                    tree.table.store(min(pos, posMirror), scores[bestCol], depth, EXACT, (tree.width - bestCol - 1) if (posMirror < pos) else bestCol)
+                    colOrder.sort(key = lambda col: (col != bestCol, -scores[col]))
+                    if scores[bestCol] > 1000 or all(abs(score) > 1000 for score in scores.values()):
+                        self.proven = True
+                        break
+        except SearchTimeout:
+            pass
+        while tree.moves > rootMoves:
+            tree.undo()
+
+    # pondering을 멈추고 thread가 board를 되돌릴 때까지 기다린다
+    def stop(self):
+        if self.thread is not None:
+            self.tree.deadline = 0
+            self.thread.join()
+            self.thread = None
+            self.tree.deadline = float('inf')
+            self.elapsed = time() - self.startTime
+
+    # Human이 둔 column으로 ponder hit인지 확인한다
+    # input : Human이 둔 column number
+    # output : ponder hit이고 충분히 탐색했다면 AI가 둘 column number, 아니면 -1
+    def answer(self, col):
+        if col != self.reply or self.depth == 0:
+            return -1
+        self.hits += 1
+        self.reply = -1
+        enoughDepth = self.tree.searchDepth > 0 and self.depth >= self.tree.searchDepth
+        enoughTime = self.elapsed >= self.tree.timeControl.allocate(self.tree)[0]
+        if self.proven or enoughDepth or enoughTime:
+            self.instant += 1
+            return self.bestCol
+        return -1
@@ -0,0 +1,132 @@
+### board의 상태만 담는 작고 변하지 않는(immutable) Position class ###
+
+## Position을 사용하는 이유
+# Board(GameTree) object는 board 외에도 posAll list, log, transposition table 등을 가지고 있어 복사하거나 pickle하여 다른 process로 보내기에 크다
+# -> board의 상태를 정수 2개(posOX, mask)와 moves만으로 나타내고, put 대신 새로운 Position을 return 하는 play 함수를 사용한다
+#    값이 바뀌지 않으므로 복사 없이 여러 곳(dict의 key, worker process 등)에서 함께 사용할 수 있다
+
+## 형식 (Board class와 같음)
+# posOX : 마지막에 stone을 둔 player의 stone들, mask : 모든 stone의 위치 (= Board.mask), moves : 둔 stone의 수
+# key() = posOX + mask + bottom (= Board.posCurrent)
+# toBytes() : posOX, mask를 각각 8byte(little endian)로 저장한 16byte (width * (height + 1) <= 64인 board만 가능)
+
+from board import popcount
+import struct
+
+BYTES = struct.Struct('<QQ')
+
+# board의 크기별 bottom (각 column의 가장 아래칸) : (width, height) -> bottom
+# key 함수가 자주 불리므로 크기마다 한 번만 계산한다
+bottoms = dict()
+
+class Position:
+
+    __slots__ = ('posOX', 'mask', 'moves', 'width', 'height')
+
+    # Initialization
+    # input : posOX, mask, width, height, moves (None이면 mask의 1인 bit 수)
+    def __init__(self, posOX = 0, mask = 0, width = 7, height = 6, moves = None):
+        setAttr = object.__setattr__
+        setAttr(self, 'posOX', posOX)
+        setAttr(self, 'mask', mask)
+        setAttr(self, 'moves', popcount(mask) if (moves is None) else moves)
+        setAttr(self, 'width', width)
+        setAttr(self, 'height', height)
+
+    # Board object의 현재 상태로 Position을 만든다
+    # input : Board object
+    # output : Position object
+    @classmethod
+    def fromBoard(cls, board):
+        return cls(board.posOX, board.mask, board.width, board.height, board.moves)
+
+    # toBytes 함수로 저장한 16byte로 Position을 만든다
+    # input : 16byte, width, height
+    # output : Position object
+    @classmethod
+    def fromBytes(cls, data, width = 7, height = 6):
+        posOX, mask = BYTES.unpack(data)
+        return cls(posOX, mask, width, height)
+
+    # 값을 바꿀 수 없다
+    def __setattr__(self, name, value):
+        raise AttributeError('Position은 값을 바꿀 수 없습니다.')
+
+    def __delattr__(self, name):
+        raise AttributeError('Position은 값을 바꿀 수 없습니다.')
+
+    # 변하지 않는 값이므로 복사하지 않는다
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    # pickle (multiprocessing으로 worker에 보낼 때)
+    def __reduce__(self):
+        return (Position, (self.posOX, self.mask, self.width, self.height, self.moves))
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.posOX == other.posOX and self.mask == other.mask \
+            and self.width == other.width and self.height == other.height
+
+    def __hash__(self):
+        return hash((self.posOX, self.mask))
+
+    def __repr__(self):
+        return 'Position(' + hex(self.posOX) + ', ' + hex(self.mask) + ', moves = ' + str(self.moves) + ')'
+
+    # output : posOX, mask를 저장한 16byte
+    def toBytes(self):
+        return BYTES.pack(self.posOX, self.mask)
+
+    # output : 각 column의 가장 아래칸 (= Board.bottom)
+    def bottom(self):
+        bottom = bottoms.get((self.width, self.height))
+        if bottom is None:
+            bottom = bottoms[(self.width, self.height)] = sum(1 << (col * (self.height + 1)) for col in range(self.width))
+        return bottom
+
+    # output : 현재 position의 key (= Board.posCurrent)
+    def key(self):
+        return self.posOX + self.mask + self.bottom()
+
+    # output : 좌우 대칭인 두 position 중 작은 key (= Board.canonicalKey)
+    def canonicalKey(self):
+        key, keyMirror = self.key(), self.mirror().key()
+        return key if (key < keyMirror) else keyMirror
+
+    # output : 좌우 대칭한 Position
+    def mirror(self):
+        colBits = (1 << (self.height + 1)) - 1
+        posOX, mask = 0, 0
+        for col in range(self.width):
+            shift, mirrorShift = col * (self.height + 1), (self.width - col - 1) * (self.height + 1)
+            posOX |= ((self.posOX >> shift) & colBits) << mirrorShift
+            mask |= ((self.mask >> shift) & colBits) << mirrorShift
+        return Position(posOX, mask, self.width, self.height, self.moves)
+
+    # input : column number
+    # output : 해당 column에 stone을 놓을 수 있으면 True, 아니면 False (= Board.possible)
+    def possible(self, col):
+        return not (self.mask >> (col * (self.height + 1) + self.height - 1)) & 1
+
+    # input : stone을 놓을 column number
+    # output : 현재 turn의 player가 column에 stone을 놓은 새로운 Position (= Board.put)
+    # column이 가득 찼다면 ValueError
+    def play(self, col):
+        if not self.possible(col):
+            raise ValueError('둘 수 없는 column : ' + str(col + 1))
+        bottom = 1 << (col * (self.height + 1))
+        stone = (self.mask + bottom) & (bottom * ((1 << self.height) - 1))
+        mask = self.mask | stone
+        return Position(mask ^ self.posOX, mask, self.width, self.height, self.moves + 1)
+
+    # output : 마지막에 stone을 둔 player가 4줄을 완성했다면 True, 아니면 False (= Board.win)
+    def win(self):
+        pos = self.posOX
+        for shift in (1, self.height, self.height + 1, self.height + 2):
+            check = pos & (pos >> shift)
+            if check & (check >> (2 * shift)):
+                return True
+        return False
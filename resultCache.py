@@ -0,0 +1,96 @@
+### 게임의 결과가 확실한(proven) position들을 파일에 저장하여 다음 게임에서도 사용하는 cache ###
+
+## cache를 사용하는 이유
+# transposition table은 process가 끝나면 사라지지만, 같은 초반과 중반 position은 여러 게임에서 반복해서 나온다
+# -> 결과가 확실한 position의 score와 best column을 파일에 쌓아 두고, GameTree가 탐색할 때 필요한 position만 canonicalKey로 찾아 사용한다
+#    (파일 전체를 table에 넣으면 게임을 할수록 시간이 오래 걸리고, 지금 게임의 값들이 table에서 밀려난다)
+
+## 파일 형식 (little endian, header 없음)
+# record : key(8byte), score(2byte), column number(1byte) - 파일 끝에 추가만 한다 (append-only)
+# - key는 좌우 대칭인 board끼리 같은 canonicalKey를 사용하고, column number도 canonicalKey 기준으로 저장한다 (없으면 -1)
+# - score는 AI가 선공인지 후공인지와 관계없이 사용할 수 있도록 선공(O) 입장으로 저장한다
+#   선공이 이기면 양수, 후공이 이기면 음수, 비기면 0
+# - board의 크기마다 다른 파일을 사용한다 (resultCache_7x6.bin)
+
+## 여러 process에서 함께 사용하는 방법
+# - 쓸 때는 O_APPEND로 열어 새 record들을 한 번의 write로 추가한다 (가능하면 fcntl.flock으로 lock)
+# - 읽을 때는 파일을 mmap으로 열고, 찾을 때마다 파일 크기를 확인하여 커졌다면 다시 mmap으로 열어 새로 추가된 record만 읽는다
+#   그래서 다른 process가 나중에 추가한 record도 사용할 수 있다
+#   같은 position이 여러 번 저장되어 있더라도 모두 같은 값이므로 문제가 없다
+
+import mmap
+import os
+import struct
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+
+RECORD = struct.Struct('<Qhb')
+
+class ResultCache:
+
+    # Initialization
+    # input : board의 크기, 파일 경로 (None이면 이 파일과 같은 폴더의 resultCache_{width}x{height}.bin)
+    def __init__(self, width = 7, height = 6, path = None):
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultCache_' + str(width) + 'x' + str(height) + '.bin')
+        self.path = path
+        self.width = width
+        self.height = height
+
+        # mmap으로 연 파일과 지금까지 읽은 byte 수 (파일이 커지면 다시 연다)
+        self.data = None
+        self.loaded = 0
+        self.entries = dict()   # key -> (선공 입장의 score, column number)
+        self.pending = []       # 아직 파일에 쓰지 않은 record
+
+    # 파일이 커졌다면 다시 mmap으로 열고, 새로 추가된 record만 읽어 self.entries에 넣는다
+    # 다른 process가 쓰는 도중이라 끝이 잘린 record는 다음에 읽는다
+    def refresh(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        size -= size % RECORD.size
+        if size <= self.loaded:
+            return
+        if self.data is not None:
+            self.data.close()
+        with open(self.path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        for key, score, col in RECORD.iter_unpack(self.data[self.loaded:size]):
+            self.entries[key] = (score, col)
+        self.loaded = size
+
+    # input : position의 canonicalKey
+    # output : (선공 입장의 score, column number), 없으면 None
+    def get(self, key):
+        self.refresh()
+        return self.entries.get(key)
+
+    # 새로운 결과를 추가한다 (flush 함수를 부르면 파일에 쓴다)
+    # input : position의 canonicalKey, 선공 입장의 score, column number
+    def add(self, key, score, col = -1):
+        if self.entries.get(key) == (score, col):
+            return
+        self.entries[key] = (score, col)
+        self.pending.append(RECORD.pack(key, score, col))
+
+    # 추가한 결과들을 파일 끝에 쓴다
+    def flush(self):
+        if not self.pending:
+            return
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, b''.join(self.pending))
+        finally:
+            os.close(fd)
+        self.pending = []
+
+    # 파일을 닫는다 (쓰지 않은 결과는 파일에 쓴다)
+    def close(self):
+        self.flush()
+        if self.data is not None:
+            self.data.close()
+            self.data = None
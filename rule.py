@@ -1,5 +1,7 @@
 from board import Board
+from collections import OrderedDict
 import random
+import threading
 
 # col : 보드판의 각 열을 나타낸다.
 # colList : 보드판의 열 중 AI가 착수 가능한 열들의 리스트이다. 
@@ -8,36 +10,74 @@ import random
 # win() : 보드판의 현재 상태를 보고 게임의 승리여부(종료여부)를 확인하는 함수.
 # self.posOX : posOX는 현재 보드판의 상태이고 
 # self.posReverse() : posReverse()는 보드판의 모든 돌들을 반대로 뒤집는 함수이다. (O -> X, X -> O)
+# decide(position, lastCol) : 보드판을 바꾸거나 출력하지 않고 solver와 같은 수와 rule 이름을 리턴하는 함수이다. (RuleDecider는 결과를 LRU cache에 저장한다.)
+
+# solver가 출력하는 각 rule의 설명
+MESSAGES = {
+    'rule1': "Rule1 : AI가 둠으로써 승리하는 수",
+    'rule2': "Rule2 : AI가 두지 않으면 다음 턴에 상대가 승리하는 것을 막는 수",
+    'rule3': 'Rule3 : 상대방이 승리하게 되는 착수 점 바로 아래에 착수하지 않도록 열을 제외',
+    'rule4': "Rule4 : AI가 착수했을 때 다음 턴에 이기는 경우의 수가 2가지가 나와 무조건 승리하게 되는 수",
+    'rule5': "Rule5 : AI가 두지 않을 경우 다음 턴에 상대방이 이기는 경우의 수가 2가지 나오는 것을 막는 수",
+    'rule6': 'Rule6 : AI가 이길 수 있는 수 바로 밑에 두지 않음으로써 상대방이 수비를 하지 못하도록 열을 제외',
+    'rule7': "Rule7 : AI가 3개의 돌을 연속으로 둘 수 있는 수",
+    'rule7_1': "Rule7_1 : 상대방이 연속으로 3개의 돌을 둘 수 없게 막는 수",
+    'rule8': "Rule8 : AI의 돌이 2개가 연속되고 양 옆이 둘 다 비어있게 되는 수",
+    'rule8_1': "Rule8_1 : 상대방의 돌이 2개가 연속되고 양 옆이 둘 다 비게되는 것을 막는 수",
+    'rule9': "Rule9 : 선공한 상대방이 4열에 두지 않았을 경우 각 경우마다 가장 이길 확률이 높은 열에 두는 수",
+    'rule10': "Rule10 : 상대방이 직전에 둔 열 위에 따라서 두는 수",
+    'rule11': "Rule11 : 상대방이 직전에 둔 열이 colList에 없어서 두지 못할 경우 가능한 열 중 중앙에서 가까운 열에 두는 수",
+    'rule12': "Rule12 : AI가 선공일 경우 3열 또는 5열에 두는 수",
+    'rule13': "Rule13 : colList에 가능한 col이 없어 둘 곳이 없어 착수 가능한 열 중 아무 열이나 두는 수",
+}
+
+# 열을 제외하는 rule (rule3, rule6)과 순서대로 적용하는 나머지 rule들
+EXCLUDE_RULES = ['rule3', 'rule6']
+RULES = ['rule1', 'rule2', 'rule3', 'rule4', 'rule5', 'rule6', 'rule7', 'rule7_1', 'rule8', 'rule8_1', 'rule9', 'rule10', 'rule11', 'rule12', 'rule13']
+
+# random하게 정하는 rule (같은 position이라도 결과가 다를 수 있으므로 cache에 저장하지 않는다)
+RANDOM_RULES = ['rule12', 'rule13', 'random']
+
 class Rule(Board):
     def __init__(self, player, width = 7, height = 6):
         super().__init__(player, width, height)
         self.colList = [i for i in range(0,width)]
+        # rule12, rule13에서 사용하는 random (decide 함수에서는 random.Random object를 넘길 수 있다)
+        self.random = random
+
+    @classmethod
+    def fromPosition(cls, position, lastCol = -1):
+        # Position으로 Rule을 만든다. position에서 둘 차례인 player가 AI이다.
+        # lastCol은 상대방이 마지막에 둔 열이다. (rule9, rule10에서 사용하며, 모르면 -1)
+        # 돌을 둔 순서는 알 수 없으므로 self.log에는 마지막에 둔 열만 넣는다.
+        rule = cls(position.moves % 2, position.width, position.height)
+        colMask = (1 << position.height) - 1
+        for col in range(position.width):
+            rule.posAll[col] = position.mask & (colMask << rule.colShift[col])
+        rule.posOX, rule.mask, rule.moves = position.posOX, position.mask, position.moves
+        if position.moves == 1 and lastCol < 0:
+            lastCol = rule.cellColumn(position.mask)
+        rule.log = [lastCol] if (position.moves > 0) else []
+        return rule
     
     def rule1(self):
         # AI가 착수 했을때 이기는 수
+        # AI의 돌로 4개를 이을 수 있는 빈칸(winningCells) 중 colList의 col에 돌이 놓일 칸이 있다면 그 col을 리턴한다.
+        # (self.posAll[col] + self.posBottom[col]은 col열에 새로 돌이 놓일 칸이다.)
+        cells = self.winningCells(self.mask - self.posOX)
         for col in self.colList:
-            # colList의 col마다 돌을 넣어보고 만약 바로 승리하는 경우 그 col을 리턴한다.
-            if self.possible(col):
-                self.put(col) 
-                if self.win():
-                    self.undo() # put한 돌을 다시 빼야 하므로 undo한다.
-                    return col
-                else:
-                    self.undo()
+            if self.possible(col) and (self.posAll[col] + self.posBottom[col]) & cells:
+                return col
         return -1
 
     def rule2(self):
         # 상대방이 착수 했을때 이기는 경우를 막기 위한 수
-        # colList의 col마다 돌을 넣어보고 만약 상대가 바로 다음턴에 이기게 될 경우 먼저 착수해서 패배를 막는다.
-        self.posReverse()
+        # colList의 col 중 상대가 바로 다음턴에 돌을 놓아 이기게 되는 칸이 있다면 먼저 착수해서 패배를 막는다.
+        # self.posOX는 직전에 둔 상대방의 돌이다.
+        cells = self.winningCells(self.posOX)
         for col in self.colList:
-            self.put(col)
-            if self.win():
-                self.undo()
-                self.posReverse() # Reverse시킨 보드판을 다시 원상복구 시킨다.
+            if (self.posAll[col] + self.posBottom[col]) & cells:
                 return col
-            self.undo()
-        self.posReverse()
         return -1
 
     def rule3(self):
@@ -46,15 +86,11 @@ class Rule(Board):
         # |   | O | X | O |   | O | X |
         # 위의 보드 상황에서 만약 O가 1열이나 5열에 두게 될 경우 바로 다음턴에 X가 4개를 이을수 있으므로 게임이 끝난다.
         # 그런 경우를 방지하기 위해서 1,5열과 같은 경우를 colList에서 제외시켜버리는 함수이다.
-        temp = self.colList.copy()
-        for col in temp:
-            self.put(col)
-            if self.possible(col):
-                self.put(col)
-                if self.win():
-                    self.colList.remove(col)
-                self.undo()
-            self.undo()
+        # col열에 돌이 놓일 칸의 바로 위칸((cell << 1))이 상대가 이길 수 있는 칸이면 제외한다.
+        cells = self.winningCells(self.posOX)
+        for col in self.colList.copy():
+            if ((self.posAll[col] + self.posBottom[col]) << 1) & cells:
+                self.colList.remove(col)
 
     def rule4(self):
         # 착수했을 때 2가지의 이기는 경우가 나오는 수
@@ -67,61 +103,91 @@ class Rule(Board):
         # 위의 상황에서 O가 1열에 둘 경우 1열에 4개로 쌓아서 승리하는 수와 3행의 가로로 4개를 이어서 승리하는 2가지의 경우가 나온다.
         # 이렇게 될 경우 X는 어디를 막아도 다른 하나의 수에 의해서 패배가 확실시 된다. 
         # 이런 경우가 나타날 경우 우선적으로 이 수에 두도록 한다.
+        # col열에 돌이 놓일 칸(cell)에 AI가 둔 뒤 AI가 바로 돌을 놓아 승리할 수 있는 칸의 수를 센다. (put/undo 없이 계산)
+        # - AI의 돌 : (self.mask - self.posOX) | cell
+        # - 돌을 놓을 수 있는 칸 : cell 대신 cell의 위칸
+        posAI = self.mask - self.posOX
+        playable = self.playableCells()
         for col in self.colList:
-            # 각 col에 두었을 때 승리하는 경우의 수를 count 변수에 담아서 저장한다.
-            count = 0
             if self.possible(col):
-                self.put(col)
-                # 한번 put한뒤 보드를 뒤집음으로써 두번 연속 같은 플레이어가 두는 것 같은 효과를 가진다.
-                self.posReverse()
-                for col2 in range(self.width):
-                    if self.possible(col2):
-                        self.put(col2)
-                        if self.win():
-                            count += 1 # 승리하게 될 경우 count +1
-                        self.undo()
-                self.posReverse()
-                self.undo()
-                if count >= 2: # 승리하는 경우의 수가 2가지 이상일 경우 col을 리턴한다.
+                cell = self.posAll[col] + self.posBottom[col]
+                cells = self.winningCells(posAI | cell) & ~cell & ((playable ^ cell) | ((cell << 1) & self.boardMask))
+                if cells & (cells - 1): # 승리하는 경우의 수가 2가지 이상일 경우 col을 리턴한다.
                     return col
         return -1        
 
     def rule5(self):
         # 상대방이 착수했을 때 2가지의 이기는 경우가 나오는 것을 막는 수
         # 위의 rule4와 마찬가지로 이번에는 상대방이 2가지의 이기는 경우의 수가 나오는 것을 미리 차단한다.
-        self.posReverse()
+        # 기존의 put 두 번(상대방, AI 순서)으로 확인하던 방법과 같은 결과가 나오도록 계산하므로,
+        # 실제로는 상대방이 col에 두었을 때 AI가 바로 이길 수 있는 칸의 수를 센다.
+        # (rule1에서 AI가 바로 이기는 수가 없었다면 새로 생기는 칸은 col열의 위칸뿐이므로 2가지 이상이 되지 않는다.)
+        playable = self.playableCells()
+        wins = self.winningCells(self.mask - self.posOX)
         for col in self.colList:
-            count = 0
-            self.put(col)
-            for col2 in range(self.width):
-                if self.possible(col2):
-                    self.put(col2)
-                    if self.win():
-                        count += 1
-                    self.undo()
-            self.undo()
-            if count >= 2:
-                self.posReverse()
+            cell = self.posAll[col] + self.posBottom[col]
+            cells = wins & ~cell & ((playable - cell) | ((cell << 1) & self.boardMask))
+            if cells & (cells - 1):
                 return col
-        self.posReverse()
         return -1
 
     def rule6(self):
         # rule3에 따라 상대방이 뒀을 때 내가 이기는 열에 두지 않는 경우
         # rule3에 의해서 상대방이 두지 못하는 열에 굳이 내가 먼저 수를 둬서 상대방이 수비할 여지를 남기지 않는 수이다.
         # rule3와 마찬가지로 colList에서 해당 col을 삭제해버리는 함수이다.
-        temp = self.colList.copy()
-        for col in temp:
-            self.put(col)
-            self.posReverse()
-            if self.possible(col):
-                self.put(col)
-                if self.winWithoutVerticle():
-                    self.colList.remove(col)
-                self.undo()
-            self.posReverse()
-            self.undo()
+        # 세로(|) 방향을 제외하고 AI가 이길 수 있는 칸 바로 아래의 col을 제외한다.
+        cells = self.winningCells(self.mask - self.posOX, vertical = False)
+        for col in self.colList.copy():
+            if ((self.posAll[col] + self.posBottom[col]) << 1) & cells:
+                self.colList.remove(col)
     
+    def openThreeCols(self, pos):
+        # colList의 col 중 pos의 돌을 col열에 하나 더 놓았을 때 그 돌을 포함하여 가로로 3개가 연속되고 양 옆이 비어있게 되는 col들 (rule7, rule7_1)
+        # 패턴 ".OOO." 의 왼쪽 빈칸을 시작점(starts)으로 하여 shift 연산으로 한 번에 찾는다.
+        # (기존 방법과 같이 1열과 7열은 제외하고, 양 옆의 빈칸은 돌이 없기만 하면 된다.)
+        shift = self.height + 1
+        cols = []
+        for col in self.colList:
+            if col == 0 or col == 6 or not self.possible(col):
+                continue
+            cell = self.posAll[col] + self.posBottom[col]
+            stones = pos | cell
+            empty = self.boardMask & ~(self.mask | cell)
+            starts = empty & (stones >> shift) & (stones >> (2 * shift)) & (stones >> (3 * shift)) & (empty >> (4 * shift))
+            if ((starts << shift) | (starts << (2 * shift)) | (starts << (3 * shift))) & cell:
+                cols.append(col)
+        return cols
+
+    def openTwoCols(self, pos):
+        # colList의 col 중 pos의 돌을 col열에 하나 더 놓았을 때 가로로 2개가 연속되고 양 옆이 비어있게 되는 col들 (rule8, rule8_1)
+        # 기존 방법과 같이 왼쪽 돌을 먼저 확인하고, 왼쪽이 같은 돌이 아닐 때만 오른쪽 돌을 확인한다.
+        shift = self.height + 1
+        cols = []
+        for col in self.colList:
+            if col == 0 or col >= 6:
+                continue
+            cell = self.posAll[col] + self.posBottom[col]
+            if (cell >> shift) & pos:
+                if col > 1 and not ((cell >> (2 * shift)) | (cell << shift)) & self.mask:
+                    cols.append(col)
+            elif (cell << shift) & pos:
+                if col < 5 and not ((cell >> shift) | (cell << (2 * shift))) & self.mask:
+                    cols.append(col)
+        return cols
+
+    def centerCol(self, temp):
+        # rule7, rule7_1, rule8, rule8_1에서 후보 col이 여러 개일 경우 가운데에서 가까운 열을 리턴한다.
+        # 기존 방법과 같은 결과가 나오도록, 더 가까운 열이 나올 때마다 index를 1씩 늘린다. (가장 가까운 열의 index가 아닐 수 있다)
+        if len(temp) == 0:
+            return -1
+        index = -1
+        min = 100
+        for col in temp:
+            if abs(col - 3) < min:
+                min = abs(col - 3)
+                index += 1
+        return temp[index]
+
     def rule7(self):
         # 양 옆이 막히지 않는 3개의 연속된 돌을 만드는 경우의 수
         # | | | | | | | |
@@ -135,75 +201,14 @@ class Rule(Board):
         # 실제 게임에서 거의 나타나기 힘들다고 판단했기 때문에 제외하였다.
         # 또 이와 같은 경우의 col이 하나가 아닌 2개 이상이 나타날 수도 있기 때문에 이 경우에는
         # 가운데 열과 가장 가까운 열을 리턴하도록 하였다.
-        temp = []
-        for col in self.colList:
-            if col == 0 or col == 6: 
-            # 1열과 7열은 양 옆이 모두 막히지 않는 3개의 가로줄을 만들 수 없으므로 제외한다.
-                continue
-            if self.possible(col):
-                self.put(col)
-                dol = self.exists(col, self.getRow(col))
-                rowList = [self.exists(i, self.getRow(col)) for i in range(self.width)]
-                pattern = [-1, dol, dol, dol, -1]
-                # rowList는 직전에 put한 돌의 행의 상태를 나타낸다.
-                # pattern은 양옆이 막히지 않는 3개의 돌이 연속된 형태를 나타낸다. 
-                # pattern이 rowList에 속할 경우 col을 리턴한다.
-                for i in range(self.width - len(pattern) + 1):
-                    if pattern == rowList[i:(len(pattern) + i)]:
-                        if col >= i+1 and col <= i+3:
-                            temp.append(col)
-                self.undo()
-        if len(temp)==1:
-            return temp.pop()
-        elif len(temp) >= 2:
-            min = 100
-            index = -1
-            for i in temp:
-                i = i-3
-                if i < 0:
-                    i *= -1
-                if i < min:
-                    min = i
-                    index += 1
-            return temp.pop(index)
-        else:
-            return -1
+        # bit 연산으로 계산 : colList의 각 col에 AI의 돌을 놓았을 때 그 돌을 포함하는 openThree 패턴이 생기는지 확인한다 (openThreeCols)
+        return self.centerCol(self.openThreeCols(self.mask - self.posOX))
 
     def rule7_1(self):
         # 상대방이 양 옆이 막히지 않는 3개의 연속된 돌을 만드는 것을 막는 경우의 수
         # 상대방이 rule7에 의해서 둘 수 있는 경우를 사전에 차단하는 수이다.
-        temp = []
-        self.posReverse()
-        for col in self.colList:
-            if col == 0 or col == 6:
-                continue
-            if self.possible(col):
-                self.put(col)
-                dol = self.exists(col, self.getRow(col))
-                rowList = [self.exists(i, self.getRow(col)) for i in range(self.width)]
-                 # 플레이어가 선공이냐 후공이냐에 따라 pattern의 모양이 달라져야 할 것이다.
-                pattern = [-1, dol, dol, dol, -1]
-                for i in range(self.width - len(pattern) + 1):
-                    if pattern == rowList[i:(len(pattern) + i)]: 
-                        if col >= i+1 and col <= i+3:
-                            temp.append(col)
-                self.undo()
-        self.posReverse()
-        if len(temp)==1:
-            return temp.pop()
-        elif len(temp) >= 2:
-            min = 100
-            index = -1
-            for i in temp:
-                i = i-3
-                if i < 0:
-                    i *= -1
-                if i < min:
-                    min = i
-                    index += 1
-            return temp.pop(index)
-        else:
-            return -1
+        # rule7과 같은 방법으로 상대방의 돌(self.posOX)에 대해 계산한다.
+        return self.centerCol(self.openThreeCols(self.posOX))
 
     def rule8(self):
         # 내 돌이 가로로 2개가 연속되고 양 옆이 둘 다 비어있을 경우 그 위치에 두는 수
@@ -211,99 +216,33 @@ class Rule(Board):
         # 특히 4개의 연속된 돌을 만들기 위해서 마지막 한 수를 둘 때 
         # 적어도 보드판에 같은 종류의 돌이 최소 2개는 연속으로 두어져 있어야한다. 그러한 이유로 이러한 룰을 추가하였다.
         # 단 이 경우에는 중복되는 경우가 많아 중복이 있을 경우 가운데에서 가까운 열을 리턴하도록 하였다.
-        temp = []
-        for col in self.colList:
-            self.put(col)
-            row = self.getRow(col)
-            if col < 6 and col > 0:
-                if self.exists(col-1,row) == self.exists(col,row):
-                    if col > 1 and self.exists(col-2, row) == -1 and self.exists(col+1,row) == -1:
-                        temp.append(col)
-                    #return col
-                elif self.exists(col,row) == self.exists(col+1,row):
-                    if col < 5 and self.exists(col-1,row) == -1 and self.exists(col+2, row) == -1:
-                        temp.append(col)
-            self.undo()
-        # 중복되는 것이 없거나 아예 연속되는 2개의 열을 만들 수 없는 경우 각각 col과 -1을 리턴한다.
-        if len(temp) == 1:
-            return temp.pop()
-        elif len(temp) == 0:
-            return -1
-        # 그 외 중복이 발생할 경우 가운데에서 가장 가까운 열을 리턴하도록 한다.
-        else:
-            index = -1
-            min = 100
-            for col in temp:
-                col = col - 3
-                if col < 0:
-                    col *= -1
-                if col < min:
-                    min = col
-                    index += 1
-            return temp.pop(index)
-        '''for col in self.colList:
-            self.put(col)
-            if col < 6 and self.topStone(col+1) == self.topStone(col):
-                if (col < 5 and self.topStone(col+2)[0] < self.topStone(col+1)[0]) or (col > 0 and self.topStone(col-1) < self.topStone(col)):
-                    self.undo()
-                    return col
-            self.undo() '''
-        #return -1
+        # bit 연산으로 계산 : colList의 각 col에 AI의 돌을 놓았을 때 openTwo 패턴이 생기는지 확인한다 (openTwoCols)
+        return self.centerCol(self.openTwoCols(self.mask - self.posOX))
 
     def rule8_1(self):
         #rule8에 의해서 상대방이 양 옆이 비어있는 2개의 연속된 돌을 두는 것을 막는 수
-        temp = []
-        self.posReverse()
-        for col in self.colList:
-            self.put(col)
-            row = self.getRow(col)
-            if col < 6 and col > 0:
-                if self.exists(col-1,row) == self.exists(col,row):
-                    if col > 1 and self.exists(col-2, row) == -1 and self.exists(col+1,row) == -1:
-                        temp.append(col)
-                    #return col
-                elif self.exists(col+1,row) == self.exists(col,row):
-                    if col < 5 and self.exists(col-1,row) == -1 and self.exists(col+2, row) == -1:
-                        temp.append(col)
-            self.undo()
-        self.posReverse()
-        # 중복되는 것이 없거나 아예 연속되는 2개의 열을 만들 수 없는 경우 각각 col과 -1을 리턴한다.
-        if len(temp) == 1:
-            return temp.pop()
-        elif len(temp) == 0:
-            return -1
-        # 그 외 중복이 발생할 경우 가운데에서 가장 가까운 열을 리턴하도록 한다.
-        else:
-            index = -1
-            min = 100
-            for col in temp:
-                col = col - 3
-                if col < 0:
-                    col *= -1
-                if col < min:
-                    min = col
-                    index += 1
-            return temp.pop(index)
+        # rule8과 같은 방법으로 상대방의 돌(self.posOX)에 대해 계산한다.
+        return self.centerCol(self.openTwoCols(self.posOX))
 
     def rule9(self):
         # 선공한 상대방이 가운데 열에 두지 않았을 때 상대방이 둔 열에서 가운데 열 방향으로 한칸 이동해서 두는 수
         # 이 connect4게임에서 선공은 맨 처음에 가운데 열, 즉 4열에 돌을 두지 못한다.
         # 어떻게 보면 Rule 8의 연속이라고 볼 수 있다.
         # 이 경우 이길 확률이 높은 경우는 connect4.solver 사이트에서 참고하였다.
-        if len(self.log) == 1:
-            if self.log[0] < 3:
-                return self.log[0]+1
+        if self.moves == 1:
+            if self.log[-1] < 3:
+                return self.log[-1]+1
             else:
-                return self.log[0]-1
+                return self.log[-1]-1
         return -1
 
     def rule10(self):
         # 위 룰 중 아무 것도 해당 되지 않는 경우에는 상대방이 착수한 열 위에다 둔다.
         # 1. connect4게임을 AI 사이트와 계속 플레이해보면서 경험한 바로는 수비적으로 플레이할때는
         # 상대방이 두었던 돌 위에 둠으로써 상대방에게 먼저 수를 두도록 강요하는 것이 도움이 된다는 것을 느꼈기 때문이다.
-        if len(self.log) != 0:
+        if self.moves != 0:
             col = self.log[-1]
-            if self.possible(col) and col in self.colList:
+            if col >= 0 and self.possible(col) and col in self.colList:
                 return col
         return -1
     
@@ -312,7 +251,7 @@ class Rule(Board):
         # 두지 못할 경우 중앙에서 가장 가까운 열에 둔다.
         # 딱히 둘 곳이 없어 애매한 상황에서는 최대한 가운데에 가까운 열을 먼저 차지하는 것이
         # 유리하다는 생각에서 설정한 룰이다.
-        if len(self.log) != 0:
+        if self.moves != 0:
             for col in [3, 2, 4, 1, 5, 0, 6]:
                 if col in self.colList:
                     return col
@@ -322,8 +261,8 @@ class Rule(Board):
         # AI가 선공이라서 상대방이 둔 열 위에 두는 것이 불가능할 때 
         # 가운데를 제외한 나머지 3열 또는 5열에 두는 경우
         # 선공인 경우 4열을 제외하고는 3열과 5열이 승률이 가장 높기 때문에 두 곳 중 한 곳에 두도록 설정했다.
-        if len(self.log) == 0:
-            randint = random.choice([2,4])
+        if self.moves == 0:
+            randint = self.random.choice([2,4])
             return randint
         return -1
 
@@ -334,110 +273,100 @@ class Rule(Board):
         # 패배가 확실시 되므로 어느 곳에 두어도 상관이없다. 돌을 두는 것이 가능한 열들 중 한 곳에 둔다.
         if len(self.colList) == 0:
             while True:
-                col = random.choice([0,1,2,3,4,5,6])
+                col = self.random.choice([0,1,2,3,4,5,6])
                 if self.possible(col):
                     return col
         return -1
     
-    def solver(self):
+    def choose(self):
+        # solver와 같은 순서로 rule들을 적용하여 둘 col을 정한다. (출력하지 않는다)
         # 매 턴마다 colList를 초기화시켜줘야 한다. 그 이유는 rule1,2 등은 colList에 없는 수라 할 지라도
         # 무조건 둬야 하는 우선순위가 더 높은 룰인데, 이전의 룰들에 의해 colList에서 해당 col들이
         # 지워져있을 수도 있기 때문이다.
+        # 리턴값 : (col, 정한 rule의 이름, rule3/rule6에 의해 열이 제외된 경우 (rule 이름, 남은 colList)의 리스트)
         self.colList = []
         for col in range(self.width):
             if self.possible(col):
                 self.colList.append(col)
-        temp = self.colList.copy()
-        print()
-        col = self.rule1()
-        if col >= 0:
-            print("Rule1 : AI가 둠으로써 승리하는 수")
-            return col
-
-        col = self.rule2()
-        if col >= 0:
-            print("Rule2 : AI가 두지 않으면 다음 턴에 상대가 승리하는 것을 막는 수")
-            return col
-
-        self.rule3()
-        if self.colList != temp:
-            print('Rule3 : 상대방이 승리하게 되는 착수 점 바로 아래에 착수하지 않도록 열을 제외')
-            print("- 현재 착수 가능한 열 목록 : ", end="")
-            for col in self.colList:
-                # Rule3에 의해서 제외되지 않고 남은 col들을 표시한다.
-                print(str(col + 1), end = ' ') 
-            print()
-            temp = self.colList.copy()
-            if len(self.colList) == 1:
-                #만약 Rule3에 의해서 제외되고 남은 col이 하나 밖에 없을 경우 그 col을 리턴한다.
-                return self.colList[0]
-        
-        col = self.rule4()
-        if col >= 0:
-            print("Rule4 : AI가 착수했을 때 다음 턴에 이기는 경우의 수가 2가지가 나와 무조건 승리하게 되는 수")
-            return col
-
-        col = self.rule5()
-        if col >= 0:
-            print("Rule5 : AI가 두지 않을 경우 다음 턴에 상대방이 이기는 경우의 수가 2가지 나오는 것을 막는 수")
-            return col
+        excluded = []
+        for name in RULES:
+            if name in EXCLUDE_RULES:
+                temp = self.colList.copy()
+                getattr(self, name)()
+                if self.colList != temp:
+                    excluded.append((name, self.colList.copy()))
+                    if len(self.colList) == 1:
+                        # 만약 제외되고 남은 col이 하나 밖에 없을 경우 그 col을 리턴한다.
+                        return self.colList[0], name, excluded
+                continue
+            col = getattr(self, name)()
+            if col >= 0:
+                return col, name, excluded
+        return self.random.choice(self.colList), 'random', excluded
 
-        self.rule6()
-        if self.colList != temp:
-            print('Rule6 : AI가 이길 수 있는 수 바로 밑에 두지 않음으로써 상대방이 수비를 하지 못하도록 열을 제외')
+    def solver(self):
+        # choose 함수로 둘 col을 정하고, 적용된 rule들의 설명을 출력한다.
+        col, name, excluded = self.choose()
+        print()
+        for ruleName, colList in excluded:
+            print(MESSAGES[ruleName])
             print("- 현재 착수 가능한 열 목록 : ", end="")
-            for col in self.colList:
-                # Rule3에 의해서 제외되지 않고 남은 col들을 표시한다.
-                print(str(col + 1), end = ' ') 
+            for c in colList:
+                # 제외되지 않고 남은 col들을 표시한다.
+                print(str(c + 1), end = ' ') 
             print()
-            temp = self.colList.copy()
-            if len(self.colList) == 1:
-                #만약 Rule3에 의해서 제외되고 남은 col이 하나 밖에 없을 경우 그 col을 리턴한다.
-                return self.colList[0]
-        
-        col = self.rule7()
-        if col >= 0:
-            print("Rule7 : AI가 3개의 돌을 연속으로 둘 수 있는 수")
-            return col
-        
-        col = self.rule7_1()
-        if col >= 0:
-            print("Rule7_1 : 상대방이 연속으로 3개의 돌을 둘 수 없게 막는 수")
-            return col
-
-        col = self.rule8()
-        if col >= 0:
-            print("Rule8 : AI의 돌이 2개가 연속되고 양 옆이 둘 다 비어있게 되는 수")
-            return col
-
-        col = self.rule8_1()
-        if col >= 0:
-            print("Rule8_1 : 상대방의 돌이 2개가 연속되고 양 옆이 둘 다 비게되는 것을 막는 수")
-            return col
+        if name not in EXCLUDE_RULES and name in MESSAGES:
+            print(MESSAGES[name])
+        return col
 
-        col = self.rule9()
-        if col >= 0:
-            print("Rule9 : 선공한 상대방이 4열에 두지 않았을 경우 각 경우마다 가장 이길 확률이 높은 열에 두는 수")
-            return col
+def decide(position, lastCol = -1, rand = None):
+    # 보드판을 바꾸거나 출력하지 않고 position에서 solver가 둘 col과 rule의 이름을 리턴한다.
+    # position에서 둘 차례인 player를 AI로 계산하며, 호출할 때마다 새 Rule을 만들기 때문에 여러 thread에서 함께 사용할 수 있다.
+    # lastCol : 상대방이 마지막에 둔 열 (rule9, rule10에서 사용하며, 모르면 -1)
+    # rand : rule12, rule13에서 사용할 random.Random (None이면 random module)
+    rule = Rule.fromPosition(position, lastCol)
+    if rand is not None:
+        rule.random = rand
+    col, name, _ = rule.choose()
+    return col, name
 
-        col = self.rule10()
-        if col >= 0:
-            print("Rule10 : 상대방이 직전에 둔 열 위에 따라서 두는 수")
-            return col
+def decideBatch(positions, lastCols = None, rand = None):
+    # 여러 position에 대한 decide 함수의 결과 리스트
+    lastCols = lastCols if (lastCols is not None) else [-1] * len(positions)
+    return [decide(position, lastCol, rand) for position, lastCol in zip(positions, lastCols)]
 
-        col = self.rule11()
-        if col >= 0:
-            print("Rule11 : 상대방이 직전에 둔 열이 colList에 없어서 두지 못할 경우 가능한 열 중 중앙에서 가까운 열에 두는 수")
-            return col
+class RuleDecider:
+    # decide 함수의 결과를 LRU cache에 저장하여, 같은 position이 반복되는 경우 rule들을 다시 계산하지 않는다.
+    # cache의 key는 (position.key(), lastCol)이다.
+    # rule들은 후보 col이 여러 개이면 왼쪽 열부터 고르기 때문에, 좌우 대칭인 두 position의 결과가 대칭이 아닐 수 있다.
+    # 그래서 좌우 대칭인 두 position은 cache를 공유하지 않고 각각 따로 저장한다.
+    # random하게 정한 결과(rule12, rule13)는 저장하지 않는다.
+    def __init__(self, cacheSize = 65536):
+        self.cacheSize = cacheSize
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
 
-        col = self.rule12()
-        if col >= 0:
-            print("Rule12 : AI가 선공일 경우 3열 또는 5열에 두는 수")
-            return col
-        
-        col = self.rule13()
-        if col >= 0:
-            print("Rule13 : colList에 가능한 col이 없어 둘 곳이 없어 착수 가능한 열 중 아무 열이나 두는 수")
-            return col
+    def decide(self, position, lastCol = -1, rand = None):
+        # decide 함수와 같은 결과를 리턴한다.
+        cacheKey = (position.key(), lastCol)
+        with self.lock:
+            result = self.cache.get(cacheKey)
+            if result is not None:
+                self.cache.move_to_end(cacheKey)
+                self.hits += 1
+        if result is None:
+            result = decide(position, lastCol, rand)
+            with self.lock:
+                self.misses += 1
+                if result[1] not in RANDOM_RULES:
+                    self.cache[cacheKey] = result
+                    if len(self.cache) > self.cacheSize:
+                        self.cache.popitem(last = False)
+        return result
 
-        return random.choice(self.colList)
\ No newline at end of file
+    def decideBatch(self, positions, lastCols = None, rand = None):
+        # 여러 position에 대한 decide 함수의 결과 리스트
+        lastCols = lastCols if (lastCols is not None) else [-1] * len(positions)
+        return [self.decide(position, lastCol, rand) for position, lastCol in zip(positions, lastCols)]
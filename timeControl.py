@@ -0,0 +1,111 @@
+### GameTree가 한 수를 두는데 사용할 시간(node 수, depth)을 정하는 class ###
+
+## 지원하는 시간 제한 방식
+# 1. moveTime  : 한 수마다 정해진 시간 (GameTree의 timeLimit, 기본값 120초)
+# 2. totalTime : 게임 전체에 주어진 시간 (sudden death)
+#                increment가 있으면 한 수를 둘 때마다 increment만큼 시간이 추가된다 (Fischer increment)
+# 3. nodes     : 한 수마다 정해진 node 수까지만 탐색
+# 4. depth     : 한 수마다 정해진 depth까지만 탐색
+# 여러 방식을 함께 사용할 수도 있다 (ex. totalTime = 60, depth = 12)
+
+## totalTime 방식에서 한 수에 사용할 시간을 정하는 방법
+# 기본 시간 = 남은 시간 / AI가 앞으로 둘 수의 수 + increment
+# 1. 게임 초반(6수 이전)에는 기본 시간의 0.6배 (가능한 수가 적고, heuristic 차이가 작다)
+# 2. 게임 중반(30수 이전)에는 기본 시간의 1.4배 (결과가 가장 많이 갈리는 구간)
+# 3. 어느 한 쪽이라도 4줄을 완성할 수 있는 빈칸(threat)이 있다면 1.2배 (critical position)
+# 4. 둘 수 있는 column이 하나뿐이거나, 바로 이기는 수 또는 반드시 막아야 하는 수가 있다면 0.1배 (forced move)
+# 이렇게 구한 시간(soft limit)이 지나면 새로운 depth를 탐색하지 않고,
+# soft limit의 3배(hard limit, 남은 시간의 절반 이하)가 지나면 탐색 중이더라도 멈춘다
+
+from board import popcount
+
+class TimeControl:
+
+    # Initialization
+    # input : 한 수당 시간(초), 전체 시간(초), 한 수당 추가 시간(초), 한 수당 node 수, 한 수당 depth
+    def __init__(self, moveTime = None, totalTime = None, increment = 0, nodes = None, depth = None):
+        self.moveTime = moveTime
+        self.totalTime = totalTime
+        self.increment = increment
+        self.nodes = nodes
+        self.depth = depth
+
+        # 게임 전체 시간 중 남은 시간
+        self.remaining = totalTime
+
+        # 탐색 외의 작업(출력 등)을 위해 남겨두는 시간(초)
+        self.margin = 0.05
+
+    # 문자열로 시간 제한 방식을 입력받는다
+    # ex. '120' = 한 수에 120초, '300+2' = 전체 300초 + 한 수마다 2초, 'd10' = 10수 앞까지, 'n50000' = 한 수에 50000 node
+    # input : 시간 제한 방식을 나타내는 문자열
+    # output : TimeControl object
+    @classmethod
+    def parse(cls, text):
+        text = text.strip().lower()
+        if text.startswith('d'):
+            return cls(depth = int(text[1:]))
+        if text.startswith('n'):
+            return cls(nodes = int(text[1:]))
+        if '+' in text:
+            totalTime, increment = text.split('+')
+            return cls(totalTime = float(totalTime), increment = float(increment))
+        return cls(moveTime = float(text))
+
+    # 현재 상태에서 한 수를 두는데 사용할 시간을 계산한다
+    # input : GameTree object (현재 board)
+    # output : (soft limit, hard limit) 초 단위, 제한이 없으면 float('inf')
+    def allocate(self, tree):
+        # 1. 한 수당 시간이 정해진 경우
+        if self.moveTime is not None:
+            return self.moveTime, self.moveTime
+
+        # 2. 시간 제한이 없는 경우 (nodes, depth 방식)
+        if self.remaining is None:
+            return float('inf'), float('inf')
+
+        # 3. 전체 시간이 정해진 경우
+        available = max(self.remaining - self.margin, 0)
+        movesLeft = max((tree.width * tree.height - tree.moves + 1) // 2, 1)
+        base = available / movesLeft + self.increment * 0.9
+
+        if self.forced(tree):
+            factor = 0.1
+        else:
+            factor = 0.6 if (tree.moves < 6) else (1.4 if (tree.moves < 30) else 1.0)
+            if tree.winningCells(tree.posOX) | tree.winningCells(tree.mask - tree.posOX):
+                factor *= 1.2
+
+        softLimit = min(base * factor, available)
+        hardLimit = min(softLimit * 3, max(available * 0.5, softLimit))
+        return softLimit, hardLimit
+
+    # 현재 상태에서 둘 수 있는 수가 사실상 하나뿐인지 확인한다
+    # input : GameTree object (현재 board)
+    # output : 둘 수 있는 column이 하나뿐이거나, 바로 이기는 수 또는 반드시 막아야 하는 수가 하나뿐이면 True
+    def forced(self, tree):
+        playable = (tree.mask + tree.bottom) & tree.boardMask
+        if popcount(playable) <= 1:
+            return True
+        if tree.winningCells(tree.mask - tree.posOX) & playable:
+            return True
+        return popcount(tree.winningCells(tree.posOX) & playable) == 1
+
+    # 한 수를 둔 뒤 남은 시간을 갱신한다
+    # input : 한 수를 두는데 걸린 시간(초)
+    def update(self, elapsed):
+        if self.remaining is not None:
+            self.remaining = self.remaining - elapsed + self.increment
+
+    # output : 시간 제한 방식을 나타내는 문자열
+    def __str__(self):
+        items = []
+        if self.moveTime is not None:
+            items.append('한 수당 ' + str(self.moveTime) + '초')
+        if self.remaining is not None:
+            items.append('남은 시간 ' + str(round(self.remaining, 2)) + '초 (+' + str(self.increment) + '초)')
+        if self.nodes is not None:
+            items.append('한 수당 ' + str(self.nodes) + ' node')
+        if self.depth is not None:
+            items.append(str(self.depth) + '수 앞까지')
+        return ', '.join(items)
@@ -0,0 +1,235 @@
+### GameTree에서 탐색한 position들의 heuristic value를 저장하는 transposition table ###
+
+## dict 대신 고정된 크기의 array를 사용하는 이유
+# 1. dict는 게임이 끝날 때까지 계속 커지기 때문에 메모리 사용량을 예측할 수 없다
+# 2. 수백만 개의 int object가 만들어져 GC가 자주 일어난다
+# -> 메모리 한도(MB)를 입력받아 그 크기만큼의 array를 한 번만 만들고, 이후에는 값만 덮어쓴다
+
+## 저장 방식
+# - slot 2개가 하나의 bucket을 이룬다
+#   slot 0 : depth-preferred (더 깊게 탐색한 값이 들어오는 경우에만 교체)
+#   slot 1 : always-replace  (slot 0에 들어가지 못한 값은 항상 여기에 저장)
+# - bucket index = key % buckets (buckets는 소수)
+# - key 전체 대신 하위 32bit(partial key)만 저장한다
+#   key < buckets * 2^32 이면 (key % buckets, key의 하위 32bit)로 key가 유일하게 결정되므로 (중국인의 나머지 정리)
+#   7x6 board(key는 49bit)에서는 buckets > 2^17 이기만 하면 서로 다른 position을 혼동하지 않는다
+#   buckets가 이보다 작다면 (memory가 작은 경우, 큰 board) partial key 대신 key 전체를 저장한다 (slot 하나에 4byte 더 필요)
+# - depth는 (탐색한 depth + 1)을 저장하여 0은 빈 slot을 나타낸다
+# - alpha-beta pruning으로 구한 값은 정확한 값이 아닐 수 있으므로 값의 종류(flag)를 함께 저장한다
+#   EXACT : 정확한 값, LOWER : 실제 값 >= value (beta cutoff), UPPER : 실제 값 <= value (alpha cutoff)
+# - 가장 좋았던(또는 cutoff를 일으킨) column number + 1을 함께 저장한다 (0이면 없음)
+
+## SharedTranspositionTable
+# - 여러 process가 multiprocessing.shared_memory에 있는 하나의 table을 lock 없이 함께 사용한다
+# - slot 하나는 8byte word 2개 (check, data)로 이루어진다
+#   data  = (value + 32768) | (depth + 1) << 16 | flag << 24 | (move + 1) << 32
+#   check = key ^ data
+# - 다른 process가 같은 slot에 쓰는 도중에 읽더라도 check ^ data != key 이므로 잘못된 값을 사용하지 않는다 (XOR 검증)
+# - key 전체를 저장하므로 width * (height + 1) <= 64 인 board에서만 사용할 수 있다
+# - multiprocessing.shared_memory는 Python 3.8부터 있으므로, SharedTranspositionTable을 만들 때 import한다
+#   (GameTree만 사용하는 경우에는 Python 3.7에서도 이 file을 import할 수 있다)
+
+from array import array
+
+# 게임의 결과가 확실한 경우(1순위 heuristic value)에 사용하는 depth
+# 어떤 depth로 탐색하더라도 이 값을 그대로 사용할 수 있다
+PROVEN = 254
+
+# 저장된 값의 종류
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# input : 자연수 n
+# output : n 이하의 가장 큰 소수
+def primeBelow(n):
+    n = max(n, 2)
+    while True:
+        if all(n % d for d in range(2, int(n ** 0.5) + 1)):
+            return n
+        n -= 1
+
+class TranspositionTable:
+
+    # slot 하나에 필요한 byte 수 (key 4 + value 2 + depth 1 + flag 1 + move 1, key 전체를 저장하면 key 8)
+    slotBytes = 9
+
+    # Initialization
+    # input : 사용할 메모리 (MB 단위), key의 bit 수 (width * (height + 1))
+    def __init__(self, memory = 16, keyBits = 64):
+        self.buckets = primeBelow(int(memory * (1 << 20)) // (2 * self.slotBytes))
+
+        # key < buckets * 2^32 이 보장되지 않으면 partial key로는 position을 구분할 수 없으므로 key 전체를 저장한다
+        # (key mask가 -1이면 key & keyMask == key)
+        self.keyMask = 0xFFFFFFFF
+        if (1 << keyBits) > (self.buckets << 32):
+            self.slotBytes += 4
+            self.buckets = primeBelow(int(memory * (1 << 20)) // (2 * self.slotBytes))
+            self.keyMask = -1
+        self.slots = 2 * self.buckets
+
+        if self.keyMask == 0xFFFFFFFF:
+            self.keys = array('I', bytes(4 * self.slots))   # partial key (key의 하위 32bit)
+        elif keyBits <= 64:
+            self.keys = array('Q', bytes(8 * self.slots))   # key 전체
+        else:
+            self.keys = [0] * self.slots                    # key 전체 (64bit보다 큰 board)
+        self.values = array('h', bytes(2 * self.slots))     # heuristic value
+        self.depths = bytearray(self.slots)                 # 탐색한 depth + 1 (0이면 빈 slot)
+        self.flags = bytearray(self.slots)                  # 값의 종류 (EXACT, LOWER, UPPER)
+        self.moves = bytearray(self.slots)                  # best column number + 1 (0이면 없음)
+
+        # table의 상태를 확인하기 위한 counter
+        self.used = 0           # 사용 중인 slot의 수
+        self.probes = 0         # find 함수를 부른 횟수
+        self.hits = 0           # find 함수에서 값을 찾은 횟수
+        self.collisions = 0     # 다른 position의 값을 덮어쓴 횟수
+
+    # table에서 position이 저장된 slot을 찾는다
+    # 찾은 slot의 값은 values[slot], depths[slot] - 1, flags[slot], moves[slot] - 1로 읽는다
+    # input : position의 key
+    # output : slot number, 없으면 -1
+    def find(self, key):
+        self.probes += 1
+        i = (key % self.buckets) << 1
+        partKey = key & self.keyMask
+
+        # 두 slot 모두에 있다면 더 깊게 탐색한 slot을 사용한다
+        found = -1
+        for slot in (i, i + 1):
+            if self.keys[slot] == partKey and self.depths[slot] and (found < 0 or self.depths[slot] > self.depths[found]):
+                found = slot
+        if found >= 0:
+            self.hits += 1
+        return found
+
+    # table에 값을 저장한다
+    # input : position의 key, heuristic value, 탐색한 depth, 값의 종류, best column number
+    def store(self, key, value, depth, flag = EXACT, move = -1):
+        i = (key % self.buckets) << 1
+        partKey = key & self.keyMask
+        depth = min(max(depth, 0), PROVEN) + 1
+
+        # 1. slot 0에 같은 position이 더 깊게 탐색되어 저장되어 있다면 저장하지 않는다
+        # 2. 비어있거나, 같은 position이거나, 더 깊게 탐색한 값이라면 slot 0에 저장
+        # 3. 그 외에는 slot 1에 저장
+        if self.keys[i] == partKey and self.depths[i] > depth:
+            return
+        if not (self.depths[i] == 0 or self.keys[i] == partKey or depth >= self.depths[i]):
+            i += 1
+
+        if self.depths[i] == 0:
+            self.used += 1
+        elif self.keys[i] != partKey:
+            self.collisions += 1
+
+        self.keys[i] = partKey
+        self.values[i] = value
+        self.depths[i] = depth
+        self.flags[i] = flag
+        self.moves[i] = move + 1
+
+    # table에 저장된 모든 값을 지운다
+    def clear(self):
+        self.depths = bytearray(self.slots)
+        self.used = 0
+
+    # output : 전체 slot 중 사용 중인 slot의 비율
+    def fillRate(self):
+        return self.used / self.slots
+
+class SharedTranspositionTable(TranspositionTable):
+
+    # slot 하나에 필요한 byte 수 (check 8 + data 8)
+    slotBytes = 16
+
+    # Initialization
+    # input : 사용할 메모리 (MB 단위), 이미 만들어진 shared memory의 이름 (None이면 새로 만든다)
+    #         같은 table을 사용하는 process들은 같은 memory를 입력해야 한다
+    def __init__(self, memory = 16, name = None):
+        from multiprocessing import shared_memory
+        self.buckets = primeBelow(int(memory * (1 << 20)) // (2 * self.slotBytes))
+        self.slots = 2 * self.buckets
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create = True, size = self.slots * self.slotBytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name = name)
+        self.name = self.shm.name
+        self.words = self.shm.buf.cast('Q')     # words[2 * slot] = check, words[2 * slot + 1] = data
+
+        # find 함수가 찾은 값을 복사해 두는 process마다의 array (find 함수는 항상 0번 slot을 return)
+        # 복사해 두지 않으면 값을 읽는 도중에 다른 process가 같은 slot을 덮어쓸 수 있다
+        self.values = array('h', [0])
+        self.depths = bytearray(1)
+        self.flags = bytearray(1)
+        self.moves = bytearray(1)
+
+        # table의 상태를 확인하기 위한 counter (process마다 따로 센다)
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+
+    # table에서 position을 찾아 XOR 검증을 통과한 값을 self.values[0], self.depths[0], ...에 복사한다
+    # input : position의 key
+    # output : 찾았으면 0, 없으면 -1
+    def find(self, key):
+        self.probes += 1
+        i = (key % self.buckets) << 1
+        words = self.words
+
+        # 두 slot 모두에 있다면 더 깊게 탐색한 slot을 사용한다
+        found = 0
+        for slot in (i, i + 1):
+            data = words[2 * slot + 1]
+            if data and words[2 * slot] ^ data == key and ((data >> 16) & 0xFF) > ((found >> 16) & 0xFF):
+                found = data
+        if not found:
+            return -1
+
+        self.hits += 1
+        self.values[0] = (found & 0xFFFF) - 32768
+        self.depths[0] = (found >> 16) & 0xFF
+        self.flags[0] = (found >> 24) & 0xFF
+        self.moves[0] = (found >> 32) & 0xFF
+        return 0
+
+    # table에 값을 저장한다 (slot을 고르는 방법은 TranspositionTable과 같다)
+    # input : position의 key, heuristic value, 탐색한 depth, 값의 종류, best column number
+    def store(self, key, value, depth, flag = EXACT, move = -1):
+        i = (key % self.buckets) << 1
+        depth = min(max(depth, 0), PROVEN) + 1
+        data = (value + 32768) | (depth << 16) | (flag << 24) | ((move + 1) << 32)
+        words = self.words
+
+        old = words[2 * i + 1]
+        oldDepth = (old >> 16) & 0xFF
+        sameKey = old and (words[2 * i] ^ old == key)
+        if sameKey and oldDepth > depth:
+            return
+        if not (old == 0 or sameKey or depth >= oldDepth):
+            i += 1
+            old = words[2 * i + 1]
+
+        if old == 0:
+            self.used += 1
+        elif words[2 * i] ^ old != key:
+            self.collisions += 1
+
+        words[2 * i] = key ^ data
+        words[2 * i + 1] = data
+
+    # table에 저장된 모든 값을 지운다 (모든 process에서 지워진다)
+    def clear(self):
+        self.shm.buf[:] = bytes(len(self.shm.buf))
+        self.used = 0
+
+    # 현재 process에서 shared memory를 더 이상 사용하지 않는다
+    def close(self):
+        self.words.release()
+        self.shm.close()
+
+    # shared memory를 없앤다 (table을 만든 process에서 모든 process가 close한 뒤에 부른다)
+    def unlink(self):
+        self.shm.unlink()
@@ -0,0 +1,384 @@
+### 빠르게 바꾼 함수들이 원래의 방법과 같은 결과를 내는지 확인하는 script ###
+
+## 확인 항목
+# 1. Board.nonLosingCells가 put/win/undo로 직접 확인한 칸들과 같은지
+# 2. Rule.choose가 put/undo/posReverse, exists/getRow로 확인하던 원래의 rule들(ReferenceRule, rule1~rule8_1)과 같은 column, rule, 제외한 열을 고르는지
+# 3. put/undo에서 갱신한 Heuristic.evaluate가 board 전체를 다시 계산한 evaluateFull과 같은지
+# 4. window table과 popcount를 사용하는 Heuristic.evaluateFull이 칸을 하나씩 확인하여 계산한 heuristic value와 같은지
+# 5. Position의 play, possible, key, mirror, canonicalKey, win, 16byte 저장, pickle이 Board와 같은 결과를 내는지
+# 실행 방법 : python verify.py
+# 하나라도 다른 결과가 있으면 AssertionError를 발생시킨다 (exit code 1)
+
+from board import Board
+from heuristic import Heuristic
+from position import Position
+from rule import Rule
+import pickle
+import random
+import sys
+
+# put/undo/posReverse로 board를 직접 바꾸어 보며 확인하던 원래의 rule들
+# Rule의 bit 연산 rule들과 결과를 비교하기 위해 그대로 남겨 둔다
+class ReferenceRule(Rule):
+
+    def rule1(self):
+        for col in self.colList:
+            if self.possible(col):
+                self.put(col)
+                if self.win():
+                    self.undo()
+                    return col
+                self.undo()
+        return -1
+
+    def rule2(self):
+        self.posReverse()
+        for col in self.colList:
+            self.put(col)
+            if self.win():
+                self.undo()
+                self.posReverse()
+                return col
+            self.undo()
+        self.posReverse()
+        return -1
+
+    def rule3(self):
+        temp = self.colList.copy()
+        for col in temp:
+            self.put(col)
+            if self.possible(col):
+                self.put(col)
+                if self.win():
+                    self.colList.remove(col)
+                self.undo()
+            self.undo()
+
+    def rule4(self):
+        for col in self.colList:
+            count = 0
+            if self.possible(col):
+                self.put(col)
+                self.posReverse()
+                for col2 in range(self.width):
+                    if self.possible(col2):
+                        self.put(col2)
+                        if self.win():
+                            count += 1
+                        self.undo()
+                self.posReverse()
+                self.undo()
+                if count >= 2:
+                    return col
+        return -1
+
+    def rule5(self):
+        self.posReverse()
+        for col in self.colList:
+            count = 0
+            self.put(col)
+            for col2 in range(self.width):
+                if self.possible(col2):
+                    self.put(col2)
+                    if self.win():
+                        count += 1
+                    self.undo()
+            self.undo()
+            if count >= 2:
+                self.posReverse()
+                return col
+        self.posReverse()
+        return -1
+
+    def rule6(self):
+        temp = self.colList.copy()
+        for col in temp:
+            self.put(col)
+            self.posReverse()
+            if self.possible(col):
+                self.put(col)
+                if self.winWithoutVerticle():
+                    self.colList.remove(col)
+                self.undo()
+            self.posReverse()
+            self.undo()
+
+    def rule7(self):
+        temp = []
+        for col in self.colList:
+            if col == 0 or col == 6:
+                continue
+            if self.possible(col):
+                self.put(col)
+                dol = self.exists(col, self.getRow(col))
+                rowList = [self.exists(i, self.getRow(col)) for i in range(self.width)]
+                pattern = [-1, dol, dol, dol, -1]
+                for i in range(self.width - len(pattern) + 1):
+                    if pattern == rowList[i:(len(pattern) + i)]:
+                        if col >= i+1 and col <= i+3:
+                            temp.append(col)
+                self.undo()
+        if len(temp)==1:
+            return temp.pop()
+        elif len(temp) >= 2:
+            min = 100
+            index = -1
+            for i in temp:
+                i = i-3
+                if i < 0:
+                    i *= -1
+                if i < min:
+                    min = i
+                    index += 1
+            return temp.pop(index)
+        else:
+            return -1
+
+    def rule7_1(self):
+        temp = []
+        self.posReverse()
+        for col in self.colList:
+            if col == 0 or col == 6:
+                continue
+            if self.possible(col):
+                self.put(col)
+                dol = self.exists(col, self.getRow(col))
+                rowList = [self.exists(i, self.getRow(col)) for i in range(self.width)]
+                pattern = [-1, dol, dol, dol, -1]
+                for i in range(self.width - len(pattern) + 1):
+                    if pattern == rowList[i:(len(pattern) + i)]:
+                        if col >= i+1 and col <= i+3:
+                            temp.append(col)
+                self.undo()
+        self.posReverse()
+        if len(temp)==1:
+            return temp.pop()
+        elif len(temp) >= 2:
+            min = 100
+            index = -1
+            for i in temp:
+                i = i-3
+                if i < 0:
+                    i *= -1
+                if i < min:
+                    min = i
+                    index += 1
+            return temp.pop(index)
+        else:
+            return -1
+
+    def rule8(self):
+        temp = []
+        for col in self.colList:
+            self.put(col)
+            row = self.getRow(col)
+            if col < 6 and col > 0:
+                if self.exists(col-1,row) == self.exists(col,row):
+                    if col > 1 and self.exists(col-2, row) == -1 and self.exists(col+1,row) == -1:
+                        temp.append(col)
+                elif self.exists(col,row) == self.exists(col+1,row):
+                    if col < 5 and self.exists(col-1,row) == -1 and self.exists(col+2, row) == -1:
+                        temp.append(col)
+            self.undo()
+        if len(temp) == 1:
+            return temp.pop()
+        elif len(temp) == 0:
+            return -1
+        else:
+            index = -1
+            min = 100
+            for col in temp:
+                col = col - 3
+                if col < 0:
+                    col *= -1
+                if col < min:
+                    min = col
+                    index += 1
+            return temp.pop(index)
+
+    def rule8_1(self):
+        temp = []
+        self.posReverse()
+        for col in self.colList:
+            self.put(col)
+            row = self.getRow(col)
+            if col < 6 and col > 0:
+                if self.exists(col-1,row) == self.exists(col,row):
+                    if col > 1 and self.exists(col-2, row) == -1 and self.exists(col+1,row) == -1:
+                        temp.append(col)
+                elif self.exists(col+1,row) == self.exists(col,row):
+                    if col < 5 and self.exists(col-1,row) == -1 and self.exists(col+2, row) == -1:
+                        temp.append(col)
+            self.undo()
+        self.posReverse()
+        if len(temp) == 1:
+            return temp.pop()
+        elif len(temp) == 0:
+            return -1
+        else:
+            index = -1
+            min = 100
+            for col in temp:
+                col = col - 3
+                if col < 0:
+                    col *= -1
+                if col < min:
+                    min = col
+                    index += 1
+            return temp.pop(index)
+
+# random한 수순으로 게임이 끝나지 않은 position을 만든다
+# input : board object, 둘 수의 수, random
+# output : 게임이 끝나지 않은 position을 만들었다면 True
+def playRandom(board, moves, rand):
+    for _ in range(moves):
+        board.put(rand.choice([col for col in range(board.width) if board.possible(col)]))
+        if board.win():
+            return False
+    return board.moves < board.width * board.height
+
+# Board.nonLosingCells와 put/win/undo로 직접 확인한 칸들을 비교한다
+# 직접 확인하는 방법 : 둘 수 있는 column마다 두어 보고, 상대가 바로 다음 turn에 이길 수 없다면 지지 않는 칸이다
+# input : 확인할 position 수, random seed
+# output : 확인한 position 수
+def checkNonLosing(positions = 3000, seed = 0):
+    rand = random.Random(seed)
+    checked = 0
+    while checked < positions:
+        width, height = rand.choice([(7, 6), (5, 4), (8, 7)])
+        board = Board(0, width, height)
+        if not playRandom(board, rand.randint(0, width * height - 1), rand):
+            continue
+        expected = 0
+        for col in range(board.width):
+            if not board.possible(col):
+                continue
+            cell = board.posAll[col] + board.posBottom[col]
+            board.put(col)
+            losing = False
+            for col2 in range(board.width):
+                if board.possible(col2):
+                    board.put(col2)
+                    losing = losing or board.win()
+                    board.undo()
+            board.undo()
+            if not losing:
+                expected |= cell
+        assert board.nonLosingCells() == expected, 'nonLosingCells가 다릅니다 : ' + str(board.log) + ' (' + str(width) + 'x' + str(height) + ')'
+        checked += 1
+    return checked
+
+# Rule.choose와 ReferenceRule.choose가 같은 결과 (column, rule 이름, rule3/rule6로 제외한 열)를 리턴하는지 비교한다
+# rule12, rule13이 사용하는 random은 같은 seed로 맞춘다
+# input : 확인할 position 수, random seed
+# output : 확인한 position 수
+def checkRules(positions = 3000, seed = 0):
+    rand = random.Random(seed)
+    checked = 0
+    while checked < positions:
+        moves = rand.randint(0, 40)
+        rule, reference = Rule(moves % 2), ReferenceRule(moves % 2)
+        if not playRandom(rule, moves, rand):
+            continue
+        reference.puts(rule.log)
+        rule.random, reference.random = random.Random(checked), random.Random(checked)
+        result, expected = rule.choose(), reference.choose()
+        assert result == expected, 'Rule의 결과가 다릅니다 : ' + str(rule.log) + ' ' + str(result) + ' != ' + str(expected)
+        assert (rule.posOX, rule.mask, rule.log) == (reference.posOX, reference.mask, reference.log), 'rule이 board를 바꾸었습니다 : ' + str(rule.log)
+        checked += 1
+    return checked
+
+# random한 put/undo 수순의 모든 position에서 Heuristic.evaluate와 evaluateFull을 비교한다
+# input : 게임 수, random seed
+# output : 확인한 position 수
+def checkEvaluate(games = 300, seed = 0):
+    rand = random.Random(seed)
+    checked = 0
+    for game in range(games):
+        width, height = rand.choice([(7, 6), (5, 4), (8, 7)])
+        board = Heuristic(game % 2, width, height)
+        while board.moves < board.width * board.height and not board.win():
+            board.put(rand.choice([col for col in range(board.width) if board.possible(col)]))
+            while board.moves > 0 and rand.random() < 0.3:
+                board.undo()
+            assert board.evaluate() == board.evaluateFull(), 'evaluate와 evaluateFull이 다릅니다 : ' + str(board.log) + ' (' + str(width) + 'x' + str(height) + ', player ' + str(board.player) + ')'
+            checked += 1
+    return checked
+
+# 칸을 하나씩 확인하여 heuristic value를 계산한다 (window table, bit 연산을 사용하지 않는 방법)
+# 둔 순서(log)로 각 칸의 stone이 AI의 것인지 Human의 것인지 정하고, 가로, 세로, 대각선 방향의 모든 4칸을 센다
+# input : Heuristic object
+# output : heuristic value
+def referenceValue(board):
+    owner = dict()
+    heights = [0] * board.width
+    for i, col in enumerate(board.log):
+        owner[(col, heights[col])] = 'AI' if (i % 2 == board.player) else 'Human'
+        heights[col] += 1
+
+    value = 0
+    for dx, dy in [(1, 0), (0, 1), (1, 1), (1, -1)]:
+        for col in range(board.width):
+            for row in range(board.height):
+                cells = [(col + i * dx, row + i * dy) for i in range(4)]
+                if not all(0 <= x < board.width and 0 <= y < board.height for x, y in cells):
+                    continue
+                stones = [owner.get(cell) for cell in cells]
+                ai, human = stones.count('AI'), stones.count('Human')
+                if human == 0 and 0 < ai < 4:
+                    value += board.scoreO[ai]
+                elif ai == 0 and 0 < human < 4:
+                    value -= board.scoreX[human]
+    return value
+
+# random한 게임의 모든 position에서 Heuristic.evaluateFull과 referenceValue를 비교한다
+# input : 게임 수, random seed
+# output : 확인한 position 수
+def checkWindows(games = 200, seed = 0):
+    rand = random.Random(seed)
+    checked = 0
+    for game in range(games):
+        width, height = rand.choice([(7, 6), (5, 4), (8, 7), (4, 4), (9, 7)])
+        board = Heuristic(game % 2, width, height)
+        while board.moves < board.width * board.height and not board.win():
+            board.put(rand.choice([col for col in range(board.width) if board.possible(col)]))
+            assert board.evaluateFull() == referenceValue(board), 'evaluateFull이 다릅니다 : ' + str(board.log) + ' (' + str(width) + 'x' + str(height) + ', player ' + str(board.player) + ')'
+            checked += 1
+    return checked
+
+# random한 게임의 모든 position에서 Position과 Board를 비교한다
+# input : 게임 수, random seed
+# output : 확인한 position 수
+def checkPosition(games = 300, seed = 0):
+    rand = random.Random(seed)
+    checked = 0
+    for game in range(games):
+        width, height = rand.choice([(7, 6), (5, 4), (8, 7)])
+        board, position = Board(0, width, height), Position(width = width, height = height)
+        while True:
+            message = 'Position이 Board와 다릅니다 : ' + str(board.log) + ' (' + str(width) + 'x' + str(height) + ')'
+            assert (position.posOX, position.mask, position.moves) == (board.posOX, board.mask, board.moves), message
+            assert [position.possible(col) for col in range(width)] == [board.possible(col) for col in range(width)], message
+            assert position.key() == board.posCurrent() and position.mirror().key() == board.posMirror(), message
+            assert position.canonicalKey() == board.canonicalKey() and position.win() == board.win(), message
+            assert Position.fromBoard(board) == position and hash(Position.fromBoard(board)) == hash(position), message
+            assert Position.fromBytes(position.toBytes(), width, height) == position, message
+            copied = pickle.loads(pickle.dumps(position))
+            assert copied == position and copied.moves == position.moves, message
+            checked += 1
+            if board.win() or board.moves == width * height:
+                break
+            col = rand.choice([col for col in range(width) if board.possible(col)])
+            board.put(col)
+            position = position.play(col)
+    return checked
+
+if __name__ == '__main__':
+    failed = False
+    for name, check in [('nonLosingCells', checkNonLosing), ('Rule', checkRules), ('evaluate', checkEvaluate), ('evaluateFull', checkWindows), ('Position', checkPosition)]:
+        try:
+            print(name + ' : ' + str(check()) + '개의 position 확인')
+        except AssertionError as error:
+            print(name + ' : 실패 - ' + str(error))
+            failed = True
+    sys.exit(1 if failed else 0)
\ No newline at end of file